@@ -0,0 +1,28 @@
+"""Provide the pytest fixtures shared by the Logic Simulator tests."""
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from scanner import Scanner
+from parse import Parser
+
+
+@pytest.fixture
+def parse_file():
+    """Return a function which parses a definition file.
+
+    The function returns [names, devices, network, monitors] for the file
+    at the path given, and fails the test if the file does not parse.
+    """
+    def parse(path):
+        names = Names()
+        devices = Devices(names)
+        network = Network(names, devices)
+        monitors = Monitors(names, devices, network)
+        scanner = Scanner(path, names)
+        parser = Parser(names, devices, network, monitors, scanner)
+        assert parser.parse_network()
+        return [names, devices, network, monitors]
+    return parse
@@ -41,6 +41,12 @@ class Device:
         self.clock_counter = None
         self.switch_state = None
         self.dtype_memory = None
+        # Propagation delay in timed simulation, None for the default of
+        # the device kind
+        self.delay = None
+        # True for switches held at a constant level, e.g. gates folded by
+        # netlist.fold_constants(), which set_switch() cannot change
+        self.fixed = False
 
 
 class Devices:
@@ -57,7 +63,8 @@ class Devices:
     Public methods
     --------------
     get_device(self, device_id): Returns the Device object corresponding
-                                 to the device ID.
+                                 to the device ID, or to the device it is
+                                 an alias of.
 
     find_devices(self, device_kind=None): Returns a list of device_ids of
                                           the specified device_kind.
@@ -65,6 +72,9 @@ class Devices:
     add_device(self, device_id, device_kind): Adds the specified device to the
                                               network.
 
+    add_alias(self, alias_id, device_id): Makes alias_id another name for
+                                          the specified device.
+
     add_input(self, device_id, input_id): Adds the specified input to the
                                           specified device.
 
@@ -100,10 +110,18 @@ class Devices:
     reset_devices(self): Resets all devices with an initial state.
                          Currently, only RC devices are affected.
 
-    cold_startup(self): Simulates cold start-up of D-types and clocks.
+    cold_startup(self, seed=None): Simulates cold start-up of D-types and
+                                   clocks.
 
     make_device(self, device_id, device_kind, device_property=None): Creates
                        the specified device and returns errors if unsuccessful.
+
+    set_delay(self, device_id, delay): Sets the propagation delay of the
+                                       specified device.
+
+    set_qualifier(self, device_id, qualifier): Changes the half period of a
+                                               clock, the highcount of an RC
+                                               or the state of a switch.
     """
 
     def __init__(self, names):
@@ -113,14 +131,24 @@ class Devices:
 
         self.devices_list = []
 
+        # aliases dictionary stores {alias_id: device_id} for names which
+        # refer to another device, e.g. after merging duplicate gates
+        self.aliases = {}
+
+        # Seed for cold start-up, see cold_startup(). If None, the global
+        # random module is used.
+        self.seed = None
+
         gate_strings = ["AND", "OR", "NAND", "NOR", "XOR", "NOT"]
         device_strings = ["CLOCK", "SWITCH", "DTYPE", "RC"]
         dtype_inputs = ["CLK", "SET", "CLEAR", "DATA"]
         dtype_outputs = ["Q", "QBAR"]
 
+        error_names = ["NO_ERROR", "INVALID_QUALIFIER", "NO_QUALIFIER",
+                       "BAD_DEVICE", "QUALIFIER_PRESENT", "DEVICE_PRESENT"]
         [self.NO_ERROR, self.INVALID_QUALIFIER, self.NO_QUALIFIER,
          self.BAD_DEVICE, self.QUALIFIER_PRESENT,
-         self.DEVICE_PRESENT] = self.names.unique_error_codes(6)
+         self.DEVICE_PRESENT] = self.names.unique_error_codes(6, error_names)
 
         self.signal_types = [self.LOW, self.HIGH, self.RISING,
                              self.FALLING, self.BLANK] = range(5)
@@ -137,6 +165,7 @@ class Devices:
 
     def get_device(self, device_id):
         """Return the Device object corresponding to device_id."""
+        device_id = self.aliases.get(device_id, device_id)
         for device in self.devices_list:
             if device.device_id == device_id:
                 return device
@@ -162,6 +191,17 @@ class Devices:
         new_device.device_kind = device_kind
         self.devices_list.append(new_device)
 
+    def add_alias(self, alias_id, device_id):
+        """Make alias_id another name for the specified device.
+
+        Return True if successful.
+        """
+        if self.get_device(alias_id) is not None or \
+           self.get_device(device_id) is None:
+            return False
+        self.aliases[alias_id] = device_id
+        return True
+
     def add_input(self, device_id, input_id):
         """Add the specified input to the specified device.
 
@@ -222,12 +262,12 @@ class Devices:
     def set_switch(self, device_id, signal):
         """Set the switch state of the specified device to signal.
 
-        Return True if successful.
+        Return True if successful. Fixed switches cannot be set.
         """
         device = self.get_device(device_id)
         if device is None:
             return False
-        elif device.device_kind != self.SWITCH:
+        elif device.device_kind != self.SWITCH or device.fixed:
             return False
         else:
             device.switch_state = signal
@@ -269,23 +309,33 @@ class Devices:
             self.add_output(device_id, output_id)
         self.cold_startup()  # D-type initialised to a random state
 
-    def cold_startup(self):
+    def cold_startup(self, seed=None):
         """Simulate cold start-up of D-types and clocks.
 
         Set the memory of the D-types to a random state and make the clocks
-        begin from a random point in their cycles.
+        begin from a random point in their cycles. If seed is given, it is
+        stored in self.seed. While self.seed is set, every cold start draws
+        from a new random.Random(self.seed), so that it can be repeated
+        exactly.
         """
+        if seed is not None:
+            self.seed = seed
+        if self.seed is None:
+            generator = random
+        else:
+            generator = random.Random(self.seed)
+
         for device in self.devices_list:
             if device.device_kind == self.D_TYPE:
-                device.dtype_memory = random.choice([self.LOW, self.HIGH])
+                device.dtype_memory = generator.choice([self.LOW, self.HIGH])
 
             elif device.device_kind == self.CLOCK:
-                clock_signal = random.choice([self.LOW, self.HIGH])
+                clock_signal = generator.choice([self.LOW, self.HIGH])
                 self.add_output(device.device_id, output_id=None,
                                 signal=clock_signal)
                 # Initialise it to a random point in its cycle.
                 device.clock_counter = \
-                    random.randrange(device.clock_half_period)
+                    generator.randrange(device.clock_half_period)
 
     def make_rc(self, device_id, highcount):
         """
@@ -397,3 +447,47 @@ class Devices:
             error_type = self.BAD_DEVICE
 
         return error_type
+
+    def set_delay(self, device_id, delay):
+        """Set the propagation delay of the specified device.
+
+        The delay is only used in timed simulation, see
+        network.Network.enable_timed(), and must be a positive integer.
+        Return self.NO_ERROR if successful. Return corresponding error if not.
+        """
+        device = self.get_device(device_id)
+        if device is None:
+            return self.BAD_DEVICE
+        elif delay < 1:
+            return self.INVALID_QUALIFIER
+        device.delay = delay
+        return self.NO_ERROR
+
+    def set_qualifier(self, device_id, qualifier):
+        """Change the qualifier of an existing clock, RC or switch.
+
+        This sets the half period of a clock, the highcount of an RC or the
+        state of a switch, with the same checks as make_device(), without
+        making the device again. Return self.NO_ERROR if successful,
+        self.BAD_DEVICE if the device does not exist or is of another kind,
+        or self.INVALID_QUALIFIER if the qualifier is out of range.
+        """
+        device = self.get_device(device_id)
+        if device is None:
+            return self.BAD_DEVICE
+        elif device.device_kind == self.CLOCK:
+            if qualifier <= 0:
+                return self.INVALID_QUALIFIER
+            device.clock_half_period = qualifier
+            device.clock_counter %= qualifier
+        elif device.device_kind == self.RC:
+            if qualifier <= 0:
+                return self.INVALID_QUALIFIER
+            device.highcount = qualifier
+        elif device.device_kind == self.SWITCH:
+            if qualifier not in [0, 1]:
+                return self.INVALID_QUALIFIER
+            self.set_switch(device_id, qualifier)
+        else:
+            return self.BAD_DEVICE
+        return self.NO_ERROR
@@ -6,6 +6,7 @@ or adjust the network properties.
 Classes:
 --------
 MyGLCanvas - handles all canvas drawing operations.
+SignalListCtrl - shows a long list of signal names with checkboxes.
 Gui - configures the main window and all the widgets.
 """
 import wx
@@ -18,8 +19,13 @@ from network import Network
 from monitors import Monitors
 from scanner import Scanner
 from parse import Parser
+from waveform import Waveform, get_visible_range, get_tick_spacing
+from signalindex import SignalIndex
 import os
 import locale
+import random
+import threading
+import time
 
 
 import builtins
@@ -51,13 +57,26 @@ class MyGLCanvas(wxcanvas.GLCanvas):
 
     render_text(self, text, x_pos, y_pos): Handles text drawing operations.
 
-    draw_signal(self, signal_list, x_start, x_step, y_low, y_high):
-    Draws one signal onto the canvas.
+    draw_signal(self, signal_list, x_start, x_step, y_low, y_high, key=None,
+                cycles=None):
+    Draws one signal onto the canvas from its vertex buffers.
+
+    upload_level(self, key, level): Uploads the changed blocks of one level
+                                    of detail of a signal.
+
+    delete_buffers(self, keep_keys=()): Deletes the vertex buffers of signals
+                                        whose key is not kept.
+
+    update_layout(self): Sorts the monitors and measures the traces again at
+                         the next draw.
+
+    update_trace_length(self): Measures the traces again, without sorting
+                               the monitors.
 
     def draw_all_signals(self): Draws all signals, together with their labels,
                                 axes, and other decorations.
 
-    draw_time_axis(self, max_sig_len, x_step, init_orig):
+    draw_time_axis(self, max_sig_len, x_step, init_orig, cycles=None):
     Draws a time axis above the first signal.
 
     """
@@ -86,6 +105,22 @@ class MyGLCanvas(wxcanvas.GLCanvas):
         # Initialise variables for zooming
         self.zoom = 1
 
+        # Vertices of each drawn signal, and the vertex buffers each level of
+        # detail is uploaded to, as {key: Waveform} and
+        # {key: {level: [line_buffer, band_buffer, capacity in blocks]}}
+        self.waveforms = {}
+        self.buffers = {}
+
+        # First of the display lists drawing each character, see
+        # render_text()
+        self.font_base = None
+
+        # [(key, name)] of the monitors sorted by name, and the length of
+        # the longest trace, or None to find them at the next draw. See
+        # update_layout().
+        self.layout = None
+        self.max_sig_len = 0
+
         # Bind events to the canvas
         self.Bind(wx.EVT_PAINT, self.on_paint)
         self.Bind(wx.EVT_SIZE, self.on_size)
@@ -106,7 +141,8 @@ class MyGLCanvas(wxcanvas.GLCanvas):
         GL.glTranslated(self.pan_x, self.pan_y, 0.0)
         GL.glScaled(self.zoom, self.zoom, self.zoom)
 
-    def draw_signal(self, signal_list, x_start, x_step, y_low, y_high):
+    def draw_signal(self, signal_list, x_start, x_step, y_low, y_high,
+                    key=None, cycles=None):
         """
         Draws one signal onto the canvas.
 
@@ -118,38 +154,92 @@ class MyGLCanvas(wxcanvas.GLCanvas):
                 of the kth cycle.
         y_low: y-coordinate of a LOW level signal.
         y_high: y-coordinate of a HIGH level signal.
+        key: The monitor the signal belongs to, e.g.
+             (device_id, output_id).
+        cycles: [first, stop] of the cycles to draw, or None to draw
+                them all.
+
+        The vertices of each key are kept in a waveform.Waveform(), and
+        uploaded to vertex buffers as cycles are recorded. The level of
+        detail drawn is chosen from the zoom, so that about one block of
+        cycles is drawn per pixel, with blocks in which the signal changes
+        faster than that drawn as filled bands.
         """
+        if key not in self.waveforms:
+            self.waveforms[key] = Waveform(self.devices)
+            self.buffers[key] = {}
+        waveform = self.waveforms[key]
+        waveform.update(signal_list)
+        if not waveform.blocks:
+            return
+        level = waveform.get_level(1 / (x_step * self.zoom))
+        if cycles is None:
+            cycles = [0, len(signal_list)]
+        [first_block, stop_block] = waveform.get_blocks(level, *cycles)
+        if first_block == stop_block:
+            return
+        self.upload_level(key, level)
+        [line_buffer, band_buffer, capacity] = self.buffers[key][level]
+
         GL.glColor3f(0.0, 0.0, 1.0)  # Blue
-        GL.glBegin(GL.GL_LINE_STRIP)
-        prev_sig_blank = False
-        x = x_start
-        for signal in signal_list:
-            if signal == self.devices.BLANK:
-                if not prev_sig_blank:
-                    GL.glEnd()
-                    prev_sig_blank = True
-            else:
-                if prev_sig_blank:
-                    GL.glBegin(GL.GL_LINE_STRIP)
-                    prev_sig_blank = False
-
-                if signal == self.devices.HIGH:
-                    y = y_next = y_high
-                elif signal == self.devices.LOW:
-                    y = y_next = y_low
-                elif signal == self.devices.RISING:
-                    y = y_low
-                    y_next = y_high
-                elif signal == self.devices.FALLING:
-                    y = y_high
-                    y_next = y_low
-
-                GL.glVertex2f(x, y)
-                GL.glVertex2f(x + x_step, y_next)
-            x += x_step
-
-        if not prev_sig_blank:
-            GL.glEnd()
+        GL.glPushMatrix()
+        GL.glTranslatef(x_start, y_low, 0.0)
+        GL.glScalef(x_step, y_high - y_low, 1.0)
+        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, line_buffer)
+        GL.glVertexPointer(2, GL.GL_FLOAT, 0, None)
+        GL.glDrawArrays(GL.GL_LINES, first_block * waveform.LINE_VERTICES,
+                        (stop_block - first_block) * waveform.LINE_VERTICES)
+        if level > 0:
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, band_buffer)
+            GL.glVertexPointer(2, GL.GL_FLOAT, 0, None)
+            GL.glDrawArrays(GL.GL_TRIANGLES,
+                            first_block * waveform.BAND_VERTICES,
+                            (stop_block - first_block) *
+                            waveform.BAND_VERTICES)
+        GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        GL.glPopMatrix()
+
+    def upload_level(self, key, level):
+        """Upload the blocks of a level changed since it was last drawn."""
+        waveform = self.waveforms[key]
+        block_count = len(waveform.blocks[level])
+        first_block = waveform.first_changed[level]
+        if level not in self.buffers[key]:
+            self.buffers[key][level] = list(GL.glGenBuffers(2)) + [0]
+        [line_buffer, band_buffer, capacity] = self.buffers[key][level]
+        if block_count > capacity:
+            # Make room for twice as many blocks and upload them all again
+            capacity = 2 * block_count
+            self.buffers[key][level][2] = capacity
+            first_block = 0
+
+        [lines, bands] = waveform.get_vertices(level)
+        for buffer_id, vertices, vertex_count in [
+                (line_buffer, lines, waveform.LINE_VERTICES),
+                (band_buffer, bands, waveform.BAND_VERTICES)]:
+            block_bytes = 2 * vertex_count * vertices.itemsize
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, buffer_id)
+            if first_block == 0:
+                GL.glBufferData(GL.GL_ARRAY_BUFFER, capacity * block_bytes,
+                                None, GL.GL_DYNAMIC_DRAW)
+            new_vertices = \
+                vertices[2 * vertex_count * first_block:].tobytes()
+            GL.glBufferSubData(GL.GL_ARRAY_BUFFER, first_block * block_bytes,
+                               len(new_vertices), new_vertices)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        waveform.first_changed[level] = block_count
+
+    def delete_buffers(self, keep_keys=()):
+        """Delete the vertex buffers of signals whose key is not kept."""
+        for key in list(self.waveforms):
+            if key not in keep_keys:
+                for [line_buffer, band_buffer, capacity] in \
+                        self.buffers[key].values():
+                    GL.glDeleteBuffers(2, [line_buffer, band_buffer])
+                del self.waveforms[key]
+                del self.buffers[key]
 
     def draw_all_signals(self):
         """
@@ -162,18 +252,20 @@ class MyGLCanvas(wxcanvas.GLCanvas):
         self.debug_dict is defined, then it will use that as
         the monitors dictionary, and use device_id and output_id
         in the labels.
+
+        Only the monitors and cycles on screen are drawn. The monitors are
+        sorted by name, and the traces measured, only after update_layout()
+        is called, so drawing a frame takes no time per monitor.
         """
         # The window would still be roughly 600 tall if a smaller height
         # was requested, or roughly 800 tall (subject to monitor size
         # differences) if a taller height was requested.
         winsize_y = min(800, max(600, self.windowsize[1]))
         init_orig = {'x': 30, 'y': winsize_y - 180}
-        current_orig = init_orig.copy()
         x_step = 20
         y_sig_sep = -75
         y_high_low_diff = 25
-
-        max_sig_len = 0
+        y_label = -18  # offset of the monitor name below the LOW level
 
         if not hasattr(self, 'debug_dict'):
             mon_dict = self.monitors.monitors_dictionary
@@ -189,29 +281,71 @@ class MyGLCanvas(wxcanvas.GLCanvas):
             (device_id, output_id) = entry_tuple
             return get_signal_name(device_id, output_id)
 
-        for (device_id, output_id) in sorted(mon_dict, key=mon_dict_sorter):
-            monitor_name = get_signal_name(device_id, output_id)
+        if self.layout is None:
+            self.layout = [(key, get_signal_name(*key)) for key in
+                           sorted(mon_dict, key=mon_dict_sorter)]
+            self.max_sig_len = max([len(x) for x in mon_dict.values()],
+                                   default=0)
+            # Free the buffers of zapped monitors
+            self.delete_buffers(mon_dict)
+        max_sig_len = self.max_sig_len
+
+        # Find the part of the drawing on screen
+        size = self.GetClientSize()
+        view_x = [-self.pan_x / self.zoom,
+                  (size.width - self.pan_x) / self.zoom]
+        view_y = [-self.pan_y / self.zoom,
+                  (size.height - self.pan_y) / self.zoom]
+        cycles = get_visible_range(init_orig['x'], x_step, 0, x_step,
+                                   view_x[0], view_x[1], max_sig_len)
+        [first_row, stop_row] = get_visible_range(
+            init_orig['y'], y_sig_sep, y_label, y_high_low_diff,
+            view_y[0], view_y[1], len(self.layout))
+
+        for row in range(first_row, stop_row):
+            [(device_id, output_id), monitor_name] = self.layout[row]
             signal_list = mon_dict[(device_id, output_id)]
-            max_sig_len = max(max_sig_len, len(signal_list))
 
-            x = current_orig['x']
-            y_low = current_orig['y']
+            x = init_orig['x']
+            y_low = init_orig['y'] + row * y_sig_sep
             y_high = y_low + y_high_low_diff
 
             # Label monitor name and signal levels
             self.render_text('hi', x - 20, y_high - 3)
             self.render_text('lo', x - 20, y_low - 3)
-            self.render_text(monitor_name, x, y_low - 18)
+            self.render_text(monitor_name, x, y_low + y_label)
 
             # Then draw signal traces
-            self.draw_signal(signal_list, x, x_step, y_low, y_high)
-            current_orig['y'] += y_sig_sep
+            self.draw_signal(signal_list, x, x_step, y_low, y_high,
+                             (device_id, output_id), cycles)
 
         # Now draw a time axis on top
         if max_sig_len != 0:
-            self.draw_time_axis(max_sig_len, x_step, init_orig)
+            self.draw_time_axis(max_sig_len, x_step, init_orig, cycles)
+
+    def update_layout(self):
+        """Sort the monitors and measure the traces again at the next draw.
+
+        Call this when monitors are made or zapped, or the traces change
+        length.
+        """
+        self.layout = None
+
+    def update_trace_length(self):
+        """Measure the traces again, keeping the order of the monitors.
 
-    def draw_time_axis(self, max_sig_len, x_step, init_orig):
+        Call this when the traces grow during a run, in which the monitors
+        cannot change.
+        """
+        if hasattr(self, 'debug_dict'):
+            mon_dict = self.debug_dict
+        else:
+            mon_dict = self.monitors.monitors_dictionary
+        self.max_sig_len = max([len(x) for x in mon_dict.values()],
+                               default=0)
+
+    def draw_time_axis(self, max_sig_len, x_step, init_orig,
+                       cycles=None):
         """
         Draws a time axis above the first signal.
 
@@ -222,14 +356,18 @@ class MyGLCanvas(wxcanvas.GLCanvas):
         init_orig: a dictionary with 'x' and 'y' as keys, whose values
                    are the x- and y- coordinates of the origin of
                    the first signal.
+        cycles: [first, stop] of the cycles on screen, or None if they
+                all are. Ticks are only drawn for these cycles.
 
-        Within this function, a constant, `tick_sep', is used to
-        control the separation between ticks on the axis.
+        Within this function, `tick_sep' controls the separation between
+        ticks on the axis. It is chosen from the zoom, so that the labels
+        stay at least `min_tick_pixels' apart on screen.
         """
-        # tick_sep: Seperation between ticks on the axis.
+        # tick_sep: Seperation between ticks on the axis, in cycles.
         # A possible extension is to allow user input for this
         # value in the UI.
-        tick_sep = 2
+        min_tick_pixels = 40
+        tick_sep = get_tick_spacing(x_step * self.zoom, min_tick_pixels)
 
         GL.glColor3f(0, 0, 0)
         arrow_start = {
@@ -257,7 +395,10 @@ class MyGLCanvas(wxcanvas.GLCanvas):
         GL.glVertex2f(arrow_end['x'] - 5, arrow_end['y'] - 3)
         GL.glEnd()
         # Draw ticks every tick_sep cycles
-        for i in range(0, arrow_len + 1, tick_sep):
+        if cycles is None:
+            cycles = [0, arrow_len]
+        first_tick = cycles[0] - cycles[0] % tick_sep
+        for i in range(first_tick, min(cycles[1], arrow_len) + 1, tick_sep):
             tick_xpos = init_orig['x'] + i * x_step
             GL.glBegin(GL.GL_LINE_STRIP)
             GL.glVertex2f(tick_xpos, arrow_start['y'] - 3)
@@ -341,17 +482,93 @@ class MyGLCanvas(wxcanvas.GLCanvas):
         self.Refresh()  # Triggers the paint event
 
     def render_text(self, text, x_pos, y_pos):
-        """Handle text drawing operations."""
+        """Handle text drawing operations.
+
+        Each character of the font is compiled into a display list the
+        first time text is drawn, so every line of text then takes a
+        single glCallLists call. The font only has Latin-1 characters.
+        """
+        if self.font_base is None:
+            font = GLUT.GLUT_BITMAP_HELVETICA_12
+            self.font_base = GL.glGenLists(256)
+            for code in range(256):
+                GL.glNewList(self.font_base + code, GL.GL_COMPILE)
+                GLUT.glutBitmapCharacter(font, code)
+                GL.glEndList()
+
         GL.glColor3f(0.0, 0.0, 0.0)  # Text is black
-        GL.glRasterPos2f(x_pos, y_pos)
-        font = GLUT.GLUT_BITMAP_HELVETICA_12
+        GL.glListBase(self.font_base)
+        for line in text.split('\n'):
+            GL.glRasterPos2f(x_pos, y_pos)
+            if line:
+                GL.glCallLists(line.encode('latin-1', 'replace'))
+            y_pos = y_pos - 20
 
-        for character in text:
-            if character == '\n':
-                y_pos = y_pos - 20
-                GL.glRasterPos2f(x_pos, y_pos)
-            else:
-                GLUT.glutBitmapCharacter(font, ord(character))
+
+class SignalListCtrl(wx.ListCtrl):
+    """Show a long list of signal names with checkboxes.
+
+    This is a virtual list: rows are only created for the names on
+    screen, so it stays fast with thousands of signals. It shows the names
+    of a signalindex.SignalIndex() starting with the filter text.
+
+    Parameters
+    ----------
+    parent: parent window.
+    index: instance of the signalindex.SignalIndex() class.
+    checked: list of whether each name in index.names is checked.
+    on_toggle: function called as on_toggle(name, checked) when the user
+               checks or unchecks a name. The change is kept only if it
+               returns True.
+
+    Public methods
+    --------------
+    set_filter(self, text): Shows only the names starting with text.
+
+    OnGetItemText(self, item, column): Returns the name shown in a row.
+
+    OnGetItemIsChecked(self, item): Returns whether a row is checked.
+
+    on_checked(self, event): Handles the user checking or unchecking a row.
+    """
+
+    def __init__(self, parent, index, checked, on_toggle, size):
+        """Initialise the list with every name shown."""
+        super().__init__(parent, wx.ID_ANY, size=size,
+                         style=wx.LC_REPORT | wx.LC_VIRTUAL |
+                         wx.LC_NO_HEADER | wx.LC_SINGLE_SEL)
+        self.index = index
+        self.checked = list(checked)
+        self.on_toggle = on_toggle
+        self.rows = []  # positions in index.names of the rows shown
+
+        self.InsertColumn(0, "", width=size.width - 30)
+        self.EnableCheckBoxes()
+        self.set_filter("")
+        self.Bind(wx.EVT_LIST_ITEM_CHECKED, self.on_checked)
+        self.Bind(wx.EVT_LIST_ITEM_UNCHECKED, self.on_checked)
+
+    def set_filter(self, text):
+        """Show only the names starting with text, ignoring case."""
+        self.rows = self.index.search(text)
+        self.SetItemCount(len(self.rows))
+        self.Refresh()
+
+    def OnGetItemText(self, item, column):
+        """Return the name shown in row item."""
+        return self.index.names[self.rows[item]]
+
+    def OnGetItemIsChecked(self, item):
+        """Return whether row item is checked."""
+        return self.checked[self.rows[item]]
+
+    def on_checked(self, event):
+        """Handle the user checking or unchecking a row."""
+        position = self.rows[event.GetIndex()]
+        checked = not self.checked[position]
+        if self.on_toggle(self.index.names[position], checked):
+            self.checked[position] = checked
+        self.RefreshItem(event.GetIndex())
 
 
 class Gui(wx.Frame):
@@ -376,17 +593,37 @@ class Gui(wx.Frame):
     on_restart(self, event): Event handler for when the user clicks the
                              continue button.
 
-    on_checkbox(self,event): Event handler for when the user checks or unchecks
-                             a checkbox.
+    on_switch_toggled(self, switch_name, checked): Handler for when the user
+                                        checks or unchecks a switch.
+
+    on_monitor_toggled(self, device_string, checked): Handler for when the
+                                        user checks or unchecks an output.
 
-    on_checklist(self,event): Event handler for when the user checks or
-                              unchecksan element of the checkboxlist.
+    on_monitors_search(self, event): Event handler for when the user types
+                                     in the monitors search box.
+
+    on_switches_search(self, event): Event handler for when the user types
+                                     in the switches search box.
 
     on_retrieve(self,event): Event handler for when the user clicks the
                              retrieve button.
 
-    run_network(self, cycles): Function running the network for the specified
-                               number of simulation cycles.
+    on_cancel(self, event): Event handler for when the user clicks the
+                            cancel button.
+
+    on_close(self, event): Event handler for when the window is closed.
+
+    run_network(self, cycles, message): Starts running the network for the
+                                        specified number of simulation
+                                        cycles in a worker thread.
+
+    simulate(self, cycles): Runs the network in the worker thread.
+
+    on_progress(self, worker, cycles_done, cycles): Redraws the canvas
+                                                    during a run.
+
+    on_run_finished(self, worker, cycles_done, cycles, error): Updates the
+                                        widgets when a run has finished.
 
     """
 
@@ -408,6 +645,16 @@ class Gui(wx.Frame):
         self.network = network
         self.cycles_completed = 0
 
+        # Thread running the simulation, or None if it is not running
+        self.worker = None
+        self.cancel_event = threading.Event()
+        self.refresh_interval = 0.1  # seconds between redraws during a run
+        self.run_message = ""  # message to show when the run has finished
+        # Cold start seed used for every run, as given by logsim.py -r, or
+        # None to pick a new seed for each run
+        self.seed = devices.seed
+        self.last_seed = None  # cold start seed of the last run
+
         # Create and setup the file menu
         menuBar = wx.MenuBar()
         fileMenu = wx.Menu()
@@ -426,11 +673,14 @@ class Gui(wx.Frame):
         self.continue_button = wx.Button(self, wx.ID_ANY, _("Continue"))
         self.restart_button = wx.Button(self, wx.ID_ANY, _("Restart"),
                                         size=wx.Size(110, 30))
+        self.cancel_button = wx.Button(self, wx.ID_ANY, _("Cancel"),
+                                       size=wx.Size(110, 30))
         self.switches_text = wx.StaticText(self, wx.ID_ANY, _("Switches"))
         self.monitors_text = wx.StaticText(self, wx.ID_ANY,
                                            _("Monitored Outputs"))
 
         self.continue_button.Disable()              # Init of continue button
+        self.cancel_button.Disable()                # Enabled during runs
 
         self.canvas = MyGLCanvas(self, devices, monitors, windowsize)
 
@@ -449,76 +699,47 @@ class Gui(wx.Frame):
         buttons_sizer.Add(self.run_button, 1, wx.ALL, 5)
         buttons_sizer.Add(self.continue_button, 1, wx.ALL, 5)
         side_sizer.Add(self.restart_button, 1, wx.ALL, 5)
+        side_sizer.Add(self.cancel_button, 1, wx.ALL, 5)
         side_sizer.Add(self.switches_text, 1, wx.TOP, 5)
         side_sizer.Add(switches_sizer, 1, wx.TOP, 5)
         side_sizer.Add(self.monitors_text, 1, wx.TOP, 5)
 
         # Starting monitors UI
-        # Retrieve and create names list of showed/hidden monitors.
+        # Retrieve the names of the showed/hidden monitors, sorted so that
+        # e.g. "a10" comes after "a2". The list only creates the rows on
+        # screen, and the search box filters it by name prefix.
         [monitored_name_list, non_monitored_name_list] \
             = self.monitors.get_signal_names()
-        monitors_list = []
-        for mon_name in monitored_name_list:
-            monitors_list.append([mon_name, True])
-        for mon_name in non_monitored_name_list:
-            monitors_list.append([mon_name, False])
-
-        # Sort the monitors list.
-        # Using LooseVersion to sort the list makes sure that
-        # e.g. "a10" gets sorted after "a2", which is not true
-        # if sorted simply as strings.
-        # Note that semantically it may be better to use natsort
-        # instead of LooseVersion, but natsort is not in the
-        # standard library while distutils.version is.
-        from distutils.version import LooseVersion
-        monitors_list = sorted(monitors_list, key=lambda mon_status:
-                               LooseVersion(mon_status[0]))
-        choices_list = [x for [x, y] in monitors_list]
-
-        # Setup parameters and create monitors CheckListBox
-        # Estimate length, width and create size of CheckListBox
-        length_checklistbox = min(len(choices_list)*21, 250)
-        width_checklistbox = min((max([len(i) for i in choices_list])*9+120),
-                                 300)
-        size_checklistbox = wx.Size(width_checklistbox, length_checklistbox)
-        self.monitors_checklistbox = wx.CheckListBox(
-                                     self, choices=choices_list,
-                                     size=size_checklistbox)
-        side_sizer.Add(self.monitors_checklistbox, 1, wx.TOP, 5)
-
-        # Setting which monitors are checked
-        checked_strings = [x[0] for x in monitors_list if x[1]]
-        self.monitors_checklistbox.SetCheckedStrings(checked_strings)
+        monitors_index = SignalIndex(monitored_name_list +
+                                     non_monitored_name_list)
+        monitored_names = set(monitored_name_list)
+        self.monitors_search = wx.SearchCtrl(self, wx.ID_ANY,
+                                             size=wx.Size(200, -1))
+        self.monitors_list = SignalListCtrl(
+            self, monitors_index,
+            [x in monitored_names for x in monitors_index.names],
+            self.on_monitor_toggled, size=wx.Size(200, 250))
+        side_sizer.Add(self.monitors_search, 0, wx.TOP, 5)
+        side_sizer.Add(self.monitors_list, 1, wx.TOP, 5)
 
         # Starting switches UI
-        # Preparing switches name list and other parameters.
+        # Switches are shown in the same way, checked when closed.
+        # Fixed switches cannot be set, so they are not shown
         switches_list = [x for x in self.devices.devices_list
-                         if x.device_kind == self.devices.SWITCH]
-        switches_state_list = []
-        for switch in switches_list:
-            switch_state = switch.switch_state
-            switches_state_list.append([switch,
-                                        switch_state != self.devices.LOW])
-        switches_list = sorted(switches_list, key=lambda sw:
-                               self.names.get_name_string(sw.device_id))
-        choices_list = [x for [x, y] in switches_state_list]
-        column_number = 0  # Counter for column index of switch checkbox
-        column_range = 4  # Parameter limiting the nr of checkboxes in a line
-        row_sizer = wx.BoxSizer(wx.HORIZONTAL)
-
-        # Setup checkboxes for switches
-        for s in range(len(switches_state_list)):
-            column_number = column_number + 1
-            label = self.names.get_name_string(choices_list[s].device_id)
-            self.checkbox = wx.CheckBox(self, label=label, name=label)
-            self.checkbox.SetValue(switches_state_list[s][1])
-            row_sizer.Add(self.checkbox, 0, wx.TOP, 0)
-            if column_number == column_range and \
-               s != len(switches_state_list) - 1:
-                column_number = 0
-                switches_sizer.Add(row_sizer)
-                row_sizer = wx.BoxSizer(wx.HORIZONTAL)
-        switches_sizer.Add(row_sizer)
+                         if x.device_kind == self.devices.SWITCH and
+                         not x.fixed]
+        switch_states = {
+            self.names.get_name_string(x.device_id):
+            x.switch_state != self.devices.LOW for x in switches_list}
+        switches_index = SignalIndex(list(switch_states))
+        self.switches_search = wx.SearchCtrl(self, wx.ID_ANY,
+                                             size=wx.Size(200, -1))
+        self.switches_list = SignalListCtrl(
+            self, switches_index,
+            [switch_states[x] for x in switches_index.names],
+            self.on_switch_toggled, size=wx.Size(200, 150))
+        switches_sizer.Add(self.switches_search, 0, wx.TOP, 0)
+        switches_sizer.Add(self.switches_list, 1, wx.TOP, 5)
 
         # Starting retrieve button UI
         self.retrieve_button = wx.Button(self, -1, _("Open definition file"),
@@ -537,48 +758,44 @@ class Gui(wx.Frame):
         side_sizer.Add(self.usrmsg, 1, wx.TOP, 5)
 
         # Setting events handling
-        self.Bind(wx.EVT_CHECKBOX, self.on_checkbox)
-        self.Bind(wx.EVT_CHECKLISTBOX, self.on_checklist)
+        self.monitors_search.Bind(wx.EVT_TEXT, self.on_monitors_search)
+        self.switches_search.Bind(wx.EVT_TEXT, self.on_switches_search)
         self.run_button.Bind(wx.EVT_BUTTON, self.on_run)
         self.continue_button.Bind(wx.EVT_BUTTON, self.on_continue)
         self.restart_button.Bind(wx.EVT_BUTTON, self.on_restart)
+        self.cancel_button.Bind(wx.EVT_BUTTON, self.on_cancel)
+        self.Bind(wx.EVT_CLOSE, self.on_close)
         self.retrieve_button.Bind(wx.EVT_BUTTON, self.on_retrieve)
 
         self.SetSizeHints(600, 600)
         self.SetSizer(main_sizer)
 
-    def on_checkbox(self, event):
-        """Handle the event when the user checks or unchecks a checkbox.
+    def on_switch_toggled(self, switch_name, checked):
+        """Handle the user checking or unchecking a switch in the list.
 
-        The event will set the selected switch on the opened/closed state."""
-        # Retrieving name and ID of the checkbox checked/unchecked.
-        clicked = event.GetEventObject()
-        switch_name = clicked.GetName()
+        The switch is set to the closed state if checked, otherwise the
+        open state. Return True if successful.
+        """
         switch_id = self.names.query(switch_name)
 
         # Setting switch state using the devices method.
-        switch_state = (self.devices.LOW if event.IsChecked() is False
-                        else self.devices.HIGH)
+        switch_state = self.devices.HIGH if checked else self.devices.LOW
         if self.devices.set_switch(switch_id, switch_state):
             self.canvas.render()
             self.usrmsg.SetValue(_("Successfully set switch on \n") + (
-                               _("open") if event.IsChecked() is False
-                               else _("closed")))
+                               _("closed") if checked else _("open")))
+            return True
         else:
             self.canvas.render()
             self.usrmsg.SetValue(_("Error! Invalid switch."))
+            return False
 
-    def on_checklist(self, event):
-        """
-        Handle the event when the user checks/unchecks an element of the
-        checkboxlist.
-
-        The event will show or hide an output from the monitor."""
+    def on_monitor_toggled(self, device_string, checked):
+        """Handle the user checking or unchecking an output in the list.
 
-        # Retrieving name of the list element checked/unchecked
-        clicked = event.GetEventObject()
-        device_string = event.GetString()
-        index = event.GetInt()
+        The output is monitored if checked, otherwise its monitor is
+        removed. Return True if successful.
+        """
         [device, port] = device_string.split(".") if "." in device_string \
             else (device_string, "")
 
@@ -587,65 +804,164 @@ class Gui(wx.Frame):
         port_id = self.names.query(port)
 
         # Monitor operations and methods
-        if (clicked.IsChecked(index)):
+        if checked:
             monitor_error = self.monitors.make_monitor(device_id, port_id,
                                                        self.cycles_completed)
             if monitor_error == self.monitors.NO_ERROR:
+                self.canvas.update_layout()
                 self.canvas.render()
                 self.usrmsg.SetValue(_("Successfully made monitor."))
+                return True
             else:
                 self.canvas.render()
                 self.usrmsg.SetValue(_("Error! Could not make monitor."))
+                return False
         else:
             if self.monitors.remove_monitor(device_id, port_id):
+                self.canvas.update_layout()
                 self.canvas.render()
                 self.usrmsg.SetValue(_("Successfully zapped monitor."))
+                return True
             else:
                 self.canvas.render()
                 self.usrmsg.SetValue(_("Error! Could not zap monitor."))
+                return False
+
+    def on_monitors_search(self, event):
+        """Handle the event when the user types in the monitors search."""
+        self.monitors_list.set_filter(self.monitors_search.GetValue())
 
-    def run_network(self, cycles):
-        """Run the network for the specified number of simulation cycles.
+    def on_switches_search(self, event):
+        """Handle the event when the user types in the switches search."""
+        self.switches_list.set_filter(self.switches_search.GetValue())
 
-        Return True if successful.
+    def run_network(self, cycles, message):
+        """Start running the network for the specified number of cycles.
+
+        The network runs in a worker thread, so the window stays responsive
+        and the run can be cancelled. While it runs, the widgets which
+        change the devices or monitors are disabled. message is shown with
+        the number of cycles completed when the run has finished.
         """
-        for elements in range(cycles):
-            if self.network.execute_network():
-                self.monitors.record_signals()
-            else:
-                self.canvas.render()
-                self.usrmsg.SetValue(_("Error! Network oscillating."))
-                return False
-        return True
+        self.run_message = message
+        for widget in [self.run_button, self.continue_button,
+                       self.restart_button, self.retrieve_button,
+                       self.monitors_search, self.monitors_list,
+                       self.switches_search, self.switches_list]:
+            widget.Disable()
+        self.cancel_button.Enable()
+        self.canvas.update_layout()  # the monitors may have been reset
+        self.cancel_event.clear()
+        self.worker = threading.Thread(target=self.simulate, args=(cycles,),
+                                       daemon=True)
+        self.worker.start()
+
+    def simulate(self, cycles):
+        """Run the network in the worker thread.
+
+        Monitored signals are only appended to, so the canvas can draw them
+        while the run continues. The canvas is redrawn at most once every
+        self.refresh_interval seconds, through wx.CallAfter().
+        """
+        worker = threading.current_thread()
+        last_refresh = time.monotonic()
+        for cycle in range(cycles):
+            if self.cancel_event.is_set():
+                wx.CallAfter(self.on_run_finished, worker, cycle, cycles,
+                             None)
+                return
+            if not self.network.execute_network():
+                wx.CallAfter(self.on_run_finished, worker, cycle, cycles,
+                             _("Error! Network oscillating."))
+                return
+            self.monitors.record_signals()
+            if time.monotonic() - last_refresh >= self.refresh_interval:
+                last_refresh = time.monotonic()
+                wx.CallAfter(self.on_progress, worker, cycle + 1, cycles)
+        wx.CallAfter(self.on_run_finished, worker, cycles, cycles, None)
+
+    def on_progress(self, worker, cycles_done, cycles):
+        """Redraw the canvas and show the progress of a run."""
+        if worker is not self.worker:
+            return  # the run has already finished
+        self.canvas.update_trace_length()
+        self.canvas.render()
+        self.usrmsg.SetValue(_("Running: ") + str(cycles_done) + " / " +
+                             str(cycles) + _(" cycles."))
+
+    def on_run_finished(self, worker, cycles_done, cycles, error):
+        """Update the widgets when a run has finished or stopped.
+
+        error is None unless the network failed to settle.
+        """
+        if worker is not self.worker:
+            return  # the window is closing
+        self.worker = None
+        self.cycles_completed += cycles_done
+        for widget in [self.run_button, self.continue_button,
+                       self.restart_button, self.retrieve_button,
+                       self.monitors_search, self.monitors_list,
+                       self.switches_search, self.switches_list]:
+            widget.Enable()
+        self.cancel_button.Disable()
+        self.canvas.update_layout()
+        self.canvas.render()
+
+        if error is not None:
+            oscillating_names = [
+                self.names.get_name_string(device_id)
+                for device_id in self.network.oscillating_devices]
+            message = error + "\n" + ", ".join(oscillating_names)
+        elif cycles_done < cycles:
+            message = (_("Cancelled after ") + str(cycles_done) +
+                       _(" cycles.\nTotal: ") + str(self.cycles_completed))
+        else:
+            message = (self.run_message + str(cycles_done) +
+                       _(" cycles.\nTotal: ") + str(self.cycles_completed))
+        if self.last_seed is not None:
+            # The seed lets the run be repeated with logsim.py -r
+            message += "\n" + _("Cold start seed: ") + str(self.last_seed)
+        self.usrmsg.SetValue(message)
 
     def on_run(self, event):
         """Handle the event when the user clicks the run button."""
         self.cycles_completed = 0
         cycles = self.spin.GetValue()
         if cycles is not None:
-            # Handling gui interactions
-            self.continue_button.Enable()
-
             # Reset output, print new running network and update nr cycles.
             self.monitors.reset_monitors()
             self.devices.reset_devices()
-            self.devices.cold_startup()
-            if self.run_network(cycles):
-                self.cycles_completed += cycles
-                self.canvas.render()
-                self.usrmsg.SetValue(_("Ran for ")+str(cycles)+_(" cycles."))
+            seed = self.seed
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            self.last_seed = seed
+            self.devices.cold_startup(seed)
+            if self.network.timed:
+                self.network.reset_timed()
+            self.run_network(cycles, _("Ran for "))
 
     def on_continue(self, event):
         """Handle the event when the user clicks the continue button."""
         # Print continued network and update nr of cycles if successful.
         cycles = self.spin.GetValue()
         if cycles is not None:
-            if self.run_network(cycles):
-                self.cycles_completed += cycles
-                self.canvas.render()
-                self.usrmsg.SetValue(_("Continued for ") + str(cycles) +
-                                     _(" cycles.\nTotal: ") +
-                                     str(self.cycles_completed))
+            self.run_network(cycles, _("Continued for "))
+
+    def on_cancel(self, event):
+        """Handle the event when the user clicks the cancel button."""
+        self.cancel_event.set()
+
+    def on_close(self, event):
+        """Handle the event when the window is closed.
+
+        A running simulation is stopped before the window is destroyed.
+        """
+        worker = self.worker
+        if worker is not None:
+            self.worker = None
+            self.cancel_event.set()
+            worker.join()
+        event.Skip()
 
     def on_restart(self, event):
         """Handle the event when the user clicks the restart button."""
@@ -656,12 +972,14 @@ class Gui(wx.Frame):
         self.monitors.reset_monitors()
         self.devices.reset_devices()
         self.cycles_completed = 0
+        self.last_seed = None
         self.spin.SetValue(10)
 
         # Force canvas to re-init positions etc.
         self.canvas.init = False
         self.canvas.pan_x = self.canvas.pan_y = 0
         self.canvas.zoom = 1
+        self.canvas.update_layout()
         self.canvas.render()
         self.usrmsg.SetValue(_("Restarted"))
 
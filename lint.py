@@ -0,0 +1,103 @@
+"""Validate many circuit definition files in parallel.
+
+Used in the Logic Simulator project to check large numbers of definition
+files in one process pool, without printing parser errors or exiting on the
+first bad file.
+
+Functions
+---------
+find_circuit_files - expands files and directories into definition files.
+lint_file - parses one definition file and returns its diagnostics.
+lint_files - parses many definition files in a process pool.
+"""
+import concurrent.futures
+import os
+import time
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from scanner import Scanner
+from parse import Parser
+
+
+def find_circuit_files(paths, extension=".circuit"):
+    """Return a sorted list of definition files found in paths.
+
+    Each path may be a file, which is included as given, or a directory,
+    which is searched recursively for files ending in extension.
+    """
+    file_list = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dir_path, dir_names, file_names in os.walk(path):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    if file_name.endswith(extension):
+                        file_list.append(os.path.join(dir_path, file_name))
+        else:
+            file_list.append(path)
+    return file_list
+
+
+def lint_file(path):
+    """Parse the definition file at path and return a result dictionary.
+
+    The dictionary has keys 'path', 'ok', 'diagnostics' (see
+    parse.Parser.diagnostics) and 'seconds', the wall-clock time taken.
+    Each file is parsed with its own Names, Devices, Network and Monitors.
+    """
+    start_time = time.perf_counter()
+    try:
+        open(path, mode='rt').close()
+    except IOError:
+        # Scanner would exit the process, so report the failure instead
+        diagnostic = {'code': None, 'name': None,
+                      'message': "FileError: Failed to open file",
+                      'line': None, 'column': None, 'source': None}
+        return {'path': path, 'ok': False, 'diagnostics': [diagnostic],
+                'seconds': time.perf_counter() - start_time}
+
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    scanner = Scanner(path, names)
+    parser = Parser(names, devices, network, monitors, scanner,
+                    collect_errors=True)
+    [success, diagnostics] = parser.parse_network()
+    return {'path': path, 'ok': success, 'diagnostics': diagnostics,
+            'seconds': time.perf_counter() - start_time}
+
+
+def lint_files(paths, max_workers=None):
+    """Parse every definition file found in paths using a process pool.
+
+    max_workers is passed to concurrent.futures.ProcessPoolExecutor; it
+    defaults to the number of processors. Return a report dictionary with
+    keys 'files' (a list of lint_file() results, in file order),
+    'total_files', 'failed_files' and 'seconds'.
+    """
+    start_time = time.perf_counter()
+    file_list = find_circuit_files(paths)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    # Hand out files in chunks so that the per-task overhead of the pool
+    # stays small compared with parsing, while keeping all workers busy.
+    chunksize = max(1, len(file_list) // (4 * max_workers))
+
+    if max_workers == 1 or len(file_list) <= 1:
+        results = [lint_file(path) for path in file_list]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+            results = list(executor.map(lint_file, file_list,
+                                        chunksize=chunksize))
+
+    return {
+        'files': results,
+        'total_files': len(results),
+        'failed_files': len([x for x in results if not x['ok']]),
+        'seconds': time.perf_counter() - start_time
+    }
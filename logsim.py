@@ -7,14 +7,26 @@ runs either the command line user interface or the graphical user interface.
 Usage
 -----
 Show help: logsim.py -h
-Command line user interface: logsim.py -c <file path>
-Graphical user interface: logsim.py <file path>
+Command line user interface:
+    logsim.py -c <file path> [-O <passes> [-F <switches>]] [-p] [-f]
+              [-i <limit>] [-s]
+              [-t [-e]] [-w] [-v <VCD file>] [-x] [-r <seed>]
+              [-b <script>] [-q] [-d <JSON file>]
+Graphical user interface: logsim.py [-r <seed>] <file path>
+Check definition files: logsim.py -l [-j <jobs>] <file or directory> ...
+Benchmark partitioned simulation:
+    logsim.py -k <worker counts> [-n <cycles>] <file path>
+Compare random cold starts:
+    logsim.py -M <runs> [-n <cycles>] [-j <jobs>] <file path>
+Sweep qualifiers: logsim.py -S <sweep> [-n <cycles>] [-r <seed>] [-j <jobs>]
+                  <file path>
+Draw the traces: logsim.py -P <PNG file> [-n <cycles>] [-r <seed>] <file path>
 """
 import getopt
+import json
+import os
 import sys
 
-import wx
-
 from names import Names
 from devices import Devices
 from network import Network
@@ -22,7 +34,10 @@ from monitors import Monitors
 from scanner import Scanner
 from parse import Parser
 from userint import UserInterface
-from gui import Gui
+
+# The modules used by only one mode, such as the graphical user interface or
+# the process pools, are imported in that mode so that the other modes start
+# quickly. See startup.py for timing this.
 
 
 def main(arg_list):
@@ -33,10 +48,55 @@ def main(arg_list):
     """
     usage_message = ("Usage:\n"
                      "Show help: logsim.py -h\n"
-                     "Command line user interface: logsim.py -c <file path>\n"
-                     "Graphical user interface: logsim.py <file path>")
+                     "Command line user interface: "
+                     "logsim.py -c <file path> [-O <passes> "
+                     "[-F <switches>]] [-p] [-f] "
+                     "[-i <limit>] [-s] [-t [-e]] [-w] "
+                     "[-v <VCD file>] [-x] [-r <seed>] [-b <script>] "
+                     "[-q] [-d <JSON file>]\n"
+                     "Graphical user interface: "
+                     "logsim.py [-r <seed>] <file path>\n"
+                     "Check definition files: "
+                     "logsim.py -l [-j <jobs>] <file or directory> ...\n"
+                     "Benchmark partitioned simulation: "
+                     "logsim.py -k <worker counts> [-n <cycles>] "
+                     "<file path>\n"
+                     "Compare random cold starts: "
+                     "logsim.py -M <runs> [-n <cycles>] [-j <jobs>] "
+                     "<file path>\n"
+                     "Sweep qualifiers: "
+                     "logsim.py -S <sweep> [-n <cycles>] [-r <seed>] "
+                     "[-j <jobs>] <file path>\n"
+                     "Draw the traces: "
+                     "logsim.py -P <PNG file> [-n <cycles>] [-r <seed>] "
+                     "<file path>\n"
+                     "Sweeps look like ck=1,2,4;rc=1:8 (ranges include "
+                     "the end)\n"
+                     "Netlist passes (comma-separated): "
+                     "validate, dead, fold, levelize, strash\n"
+                     "-F: switches (comma-separated) fixed at their initial "
+                     "level, which the fold pass may fold into the logic\n"
+                     "-p: simulate only the logic feeding the monitors\n"
+                     "-f: freeze switches until one is set\n"
+                     "-i: settle iteration limit (default: from logic depth)\n"
+                     "-s: two-phase synchronous evaluation (no combinational "
+                     "loops)\n"
+                     "-t: two-state signals, without RISING or FALLING\n"
+                     "-e: show two-state changes as edges in the traces\n"
+                     "-w: timed simulation with device delays\n"
+                     "-v: write the traces to a VCD file on quitting\n"
+                     "-x: settle unconnected sub-circuits separately, "
+                     "skipping unmonitored ones\n"
+                     "-r: cold start seed used for every run\n"
+                     "-b: run the commands in a script (- for standard "
+                     "input) without prompts, showing the traces at the "
+                     "end and messages on standard error\n"
+                     "-q: do not show the traces\n"
+                     "-d: write the traces and results as JSON (- for "
+                     "standard output)")
     try:
-        options, arguments = getopt.getopt(arg_list, "hc:")
+        options, arguments = getopt.getopt(
+            arg_list, "hc:lj:O:pfi:stewv:k:n:xr:M:S:P:b:qd:F:")
     except getopt.GetoptError:
         print("Error: invalid command line arguments\n")
         print(usage_message)
@@ -48,6 +108,149 @@ def main(arg_list):
     network = Network(names, devices)
     monitors = Monitors(names, devices, network)
 
+    option_dict = dict(options)
+    if "-l" in option_dict:  # check definition files and print a report
+        if not arguments:
+            print("Error: at least one file or directory required\n")
+            print(usage_message)
+            sys.exit()
+        max_workers = None
+        if "-j" in option_dict:
+            try:
+                max_workers = int(option_dict["-j"])
+            except ValueError:
+                max_workers = 0
+            if max_workers < 1:
+                print("Error: number of jobs must be a positive integer\n")
+                print(usage_message)
+                sys.exit()
+        from lint import lint_files
+        report = lint_files(arguments, max_workers)
+        print(json.dumps(report, indent=2))
+        sys.exit(1 if report['failed_files'] else 0)
+
+    if "-k" in option_dict:  # compare partitioned and single-process runs
+        if len(arguments) != 1:
+            print("Error: one file path required\n")
+            print(usage_message)
+            sys.exit()
+        try:
+            worker_counts = [int(x) for x in option_dict["-k"].split(",")]
+            cycles = int(option_dict.get("-n", 100))
+        except ValueError:
+            worker_counts = [0]
+            cycles = 0
+        if min(worker_counts) < 1 or cycles < 1:
+            print("Error: worker counts and cycles must be positive "
+                  "integers\n")
+            print(usage_message)
+            sys.exit()
+        scanner = Scanner(arguments[0], names)
+        parser = Parser(names, devices, network, monitors, scanner)
+        if not parser.parse_network():
+            sys.exit(1)
+        from partition import benchmark_partitioned
+        report = benchmark_partitioned(network, monitors, cycles,
+                                       worker_counts)
+        if report is None:
+            print("Error: partitioned simulation needs a network without "
+                  "combinational loops")
+            sys.exit(1)
+        print(json.dumps(report, indent=2))
+        sys.exit(0 if all(run['matches'] for run in report['runs']) else 1)
+
+    if "-M" in option_dict:  # run from many cold starts and compare them
+        if len(arguments) != 1:
+            print("Error: one file path required\n")
+            print(usage_message)
+            sys.exit()
+        try:
+            runs = int(option_dict["-M"])
+            cycles = int(option_dict.get("-n", 100))
+            max_workers = int(option_dict.get("-j", os.cpu_count() or 1))
+        except ValueError:
+            runs = 0
+            cycles = 0
+            max_workers = 0
+        if runs < 1 or cycles < 1 or max_workers < 1:
+            print("Error: runs, cycles and jobs must be positive "
+                  "integers\n")
+            print(usage_message)
+            sys.exit()
+        scanner = Scanner(arguments[0], names)
+        parser = Parser(names, devices, network, monitors, scanner)
+        if not parser.parse_network():
+            sys.exit(1)
+        from montecarlo import run_seeds
+        report = run_seeds(network, monitors, range(runs), cycles,
+                           max_workers=max_workers)
+        print(json.dumps(report, indent=2))
+        sys.exit(1 if report['diverged_seeds'] or report['failed_seeds']
+                 else 0)
+
+    if "-S" in option_dict:  # simulate a grid of qualifier values
+        if len(arguments) != 1:
+            print("Error: one file path required\n")
+            print(usage_message)
+            sys.exit()
+        from sweep import parse_sweep, sweep, format_table
+        try:
+            axes = parse_sweep(option_dict["-S"])
+            cycles = int(option_dict.get("-n", 100))
+            seed = int(option_dict.get("-r", 0))
+            max_workers = int(option_dict.get("-j", os.cpu_count() or 1))
+        except ValueError as error:
+            print("Error:", error, "\n")
+            print(usage_message)
+            sys.exit()
+        if cycles < 1 or max_workers < 1:
+            print("Error: cycles and jobs must be positive integers\n")
+            print(usage_message)
+            sys.exit()
+        scanner = Scanner(arguments[0], names)
+        parser = Parser(names, devices, network, monitors, scanner)
+        if not parser.parse_network():
+            sys.exit(1)
+        try:
+            report = sweep(network, monitors, axes, cycles, seed,
+                           max_workers)
+        except ValueError as error:
+            print("Error:", error)
+            sys.exit(1)
+        print(format_table(report))
+        sys.exit(0)
+
+    if "-P" in option_dict:  # run and draw the traces without the GUI
+        if len(arguments) != 1:
+            print("Error: one file path required\n")
+            print(usage_message)
+            sys.exit()
+        try:
+            cycles = int(option_dict.get("-n", 100))
+            if "-r" in option_dict:
+                devices.seed = int(option_dict["-r"])
+        except ValueError:
+            cycles = 0
+        if cycles < 1:
+            print("Error: cycles and seed must be integers, with cycles "
+                  "positive\n")
+            print(usage_message)
+            sys.exit()
+        scanner = Scanner(arguments[0], names)
+        parser = Parser(names, devices, network, monitors, scanner)
+        if not parser.parse_network():
+            sys.exit(1)
+        devices.cold_startup()
+        for cycle in range(cycles):
+            if not network.execute_network():
+                print("Error! Network oscillating.")
+                sys.exit(1)
+            monitors.record_signals()
+        from raster import render_traces
+        with open(option_dict["-P"], "wb") as png_file:
+            png_file.write(render_traces(devices, monitors).to_png())
+        sys.exit(0)
+
     for option, path in options:
         if option == "-h":  # print the usage message
             print(usage_message)
@@ -56,18 +259,145 @@ def main(arg_list):
             scanner = Scanner(path, names)
             parser = Parser(names, devices, network, monitors, scanner)
             if parser.parse_network():
+                # In batch mode, standard output only carries the traces
+                # and the results, so send the messages to standard error
+                message_file = sys.stderr if "-b" in option_dict else None
+                if "-O" in option_dict:
+                    # Transform the design before simulating it
+                    pass_names = option_dict["-O"].split(",")
+                    from netlist import (build_netlist, lower_netlist,
+                                         make_pass_manager)
+                    try:
+                        pass_manager = make_pass_manager(pass_names)
+                    except ValueError as error:
+                        print("Error:", error)
+                        sys.exit()
+                    fixed_switches = []
+                    if "-F" in option_dict:
+                        for switch_name in option_dict["-F"].split(","):
+                            switch_id = names.query(switch_name)
+                            device = devices.get_device(switch_id)
+                            if device is None or \
+                               device.device_kind != devices.SWITCH:
+                                print("Error: unknown switch", switch_name)
+                                sys.exit()
+                            fixed_switches.append(switch_id)
+                    netlist = build_netlist(devices, monitors,
+                                            fixed_switches)
+                    if not pass_manager.run(netlist):
+                        print("Error: netlist pass failed")
+                        sys.exit()
+                    for pass_name, seconds in pass_manager.timings:
+                        print("Pass %s: %.3f ms" % (pass_name,
+                                                    seconds * 1000),
+                              file=message_file)
+                    [devices, network, monitors] = lower_netlist(netlist)
+                for loop in network.find_combinational_loops():
+                    loop_names = [names.get_name_string(device_id)
+                                  for device_id in loop]
+                    print("Warning: combinational loop through",
+                          ", ".join(sorted(loop_names)), file=message_file)
+                if "-p" in option_dict:
+                    network.enable_pruning(monitors.monitors_dictionary)
+                if "-f" in option_dict:
+                    network.freeze_switches()
+                if "-x" in option_dict:
+                    network.enable_split(monitors.monitors_dictionary)
+                if "-i" in option_dict:
+                    try:
+                        iteration_limit = int(option_dict["-i"])
+                    except ValueError:
+                        iteration_limit = 0
+                    if iteration_limit < 1:
+                        print("Error: iteration limit must be a positive "
+                              "integer")
+                        sys.exit()
+                    network.set_iteration_limit(iteration_limit)
+                if "-s" in option_dict:
+                    if not network.enable_two_phase():
+                        print("Error: two-phase evaluation needs a network "
+                              "without combinational loops")
+                        sys.exit()
+                if "-t" in option_dict:
+                    network.enable_two_state()
+                    monitors.show_edges = "-e" in option_dict
+                if "-w" in option_dict:
+                    if not network.enable_timed():
+                        print("Error: timed simulation needs every input "
+                              "connected")
+                        sys.exit()
+                if "-r" in option_dict:
+                    try:
+                        devices.seed = int(option_dict["-r"])
+                    except ValueError:
+                        print("Error: seed must be an integer")
+                        sys.exit()
                 # Initialise an instance of the userint.UserInterface() class
-                userint = UserInterface(names, devices, network, monitors)
-                userint.command_interface()
+                show_traces = "-q" not in option_dict
+                failed_commands = []
+                if "-b" in option_dict:
+                    # Run the script, showing the traces once at the end
+                    # unless the results are written to standard output
+                    userint = UserInterface(names, devices, network,
+                                            monitors, show_traces=False,
+                                            message_file=message_file)
+                    script_path = option_dict["-b"]
+                    try:
+                        if script_path == "-":
+                            failed_commands = userint.run_script(sys.stdin)
+                        else:
+                            with open(script_path) as script_file:
+                                failed_commands = userint.run_script(
+                                    script_file)
+                    except IOError:
+                        print("Error: could not read script", script_path,
+                              file=message_file)
+                        sys.exit(1)
+                    if show_traces and userint.cycles_completed and \
+                            option_dict.get("-d") != "-":
+                        monitors.display_signals()
+                    for line_number, line in failed_commands:
+                        print("Error: command failed on line %d: %s"
+                              % (line_number, line), file=message_file)
+                else:
+                    userint = UserInterface(names, devices, network,
+                                            monitors, show_traces)
+                    userint.command_interface()
+                if "-d" in option_dict:
+                    results = userint.get_results()
+                    results['failed_commands'] = failed_commands
+                    if option_dict["-d"] == "-":
+                        print(json.dumps(results))
+                    else:
+                        with open(option_dict["-d"], "w") as json_file:
+                            json.dump(results, json_file)
+                if "-v" in option_dict:
+                    with open(option_dict["-v"], "w") as vcd_file:
+                        monitors.write_vcd(vcd_file)
+                if failed_commands:
+                    sys.exit(1)
 
-    if not options:  # no option given, use the graphical user interface
+    # With no option other than a seed, use the graphical user interface
+    if set(option_dict) <= {"-r"}:
 
         if len(arguments) != 1:  # wrong number of arguments
             print("Error: one file path required\n")
             print(usage_message)
             sys.exit()
+        seed = None
+        if "-r" in option_dict:
+            try:
+                seed = int(option_dict["-r"])
+            except ValueError:
+                print("Error: seed must be an integer")
+                sys.exit()
+
+        # Only the graphical user interface needs wxPython
+        import wx
+        from gui import Gui
 
         [path] = arguments
+        devices.seed = seed
         scanner = Scanner(path, names)
         parser = Parser(names, devices, network, monitors, scanner)
         if parser.parse_network():
@@ -87,6 +417,7 @@ def main(arg_list):
                 # Re-initialise everything
                 names = Names()
                 devices = Devices(names)
+                devices.seed = seed
                 network = Network(names, devices)
                 monitors = Monitors(names, devices, network)
                 scanner = Scanner(path, names)
@@ -44,7 +44,13 @@ class Monitors:
 
     get_margin(self): Returns the length of the longest monitor's name.
 
+    get_edge_trace(self, signal_list): Returns a copy of a signal trace with
+                                       changes shown as RISING or FALLING.
+
     display_signals(self): Displays signal trace(s) in the text console.
+
+    write_vcd(self, vcd_file, timescale="1 ns"): Writes the signal traces to
+                                               a value change dump file.
     """
 
     def __init__(self, names, devices, network):
@@ -57,8 +63,18 @@ class Monitors:
         # {(device_id, output_id): [signal_list]}
         self.monitors_dictionary = collections.OrderedDict()
 
+        error_names = ["NO_ERROR", "NOT_OUTPUT", "MONITOR_PRESENT"]
         [self.NO_ERROR, self.NOT_OUTPUT,
-         self.MONITOR_PRESENT] = self.names.unique_error_codes(3)
+         self.MONITOR_PRESENT] = self.names.unique_error_codes(3, error_names)
+
+        # events_dictionary stores {(device_id, output_id): [(time, signal)]}
+        # for every change recorded in timed simulation, see
+        # network.Network.enable_timed()
+        self.events_dictionary = collections.OrderedDict()
+
+        # If True, display_signals() shows changes as RISING or FALLING,
+        # for traces recorded in two-state mode
+        self.show_edges = False
 
     def make_monitor(self, device_id, output_id, cycles_completed=0):
         """Add the specified signal to the monitors dictionary.
@@ -79,6 +95,8 @@ class Monitors:
             # list.
             self.monitors_dictionary[(device_id, output_id)] = [
                 self.devices.BLANK] * cycles_completed
+            # The network may be pruned to the logic feeding the monitors
+            self.network.update_cone(self.monitors_dictionary)
             return self.NO_ERROR
 
     def remove_monitor(self, device_id, output_id):
@@ -90,6 +108,8 @@ class Monitors:
             return False
         else:
             del self.monitors_dictionary[(device_id, output_id)]
+            self.events_dictionary.pop((device_id, output_id), None)
+            self.network.update_cone(self.monitors_dictionary)
             return True
 
     def get_monitor_signal(self, device_id, output_id):
@@ -105,12 +125,43 @@ class Monitors:
     def record_signals(self):
         """Record the current signal level for every monitor.
 
-        This function is called at every simulation cycle.
+        This function is called at every simulation cycle. In timed
+        simulation, the changes made during the cycle are also recorded.
         """
         for device_id, output_id in self.monitors_dictionary:
             signal_level = self.get_monitor_signal(device_id, output_id)
             self.monitors_dictionary[(device_id,
                                       output_id)].append(signal_level)
+        if self.network.timed:
+            self._record_events()
+
+    def _record_events(self):
+        """Record the network events of the last cycle for every monitor."""
+        # Monitors may name an alias, so match events by the real device
+        monitored = {}  # {(device_id, output_id): [monitor keys]}
+        for device_id, output_id in self.monitors_dictionary:
+            device = self.devices.get_device(device_id)
+            monitored.setdefault((device.device_id, output_id), []).append(
+                (device_id, output_id))
+            self.events_dictionary.setdefault((device_id, output_id), [])
+
+        cycle_start = self.network.time - self.network.cycle_time
+        new_events = collections.defaultdict(list)
+        for time, device_id, output_id, signal in self.network.events:
+            for key in monitored.get((device_id, output_id), []):
+                new_events[key].append((time, signal))
+
+        for key, event_list in self.events_dictionary.items():
+            if not event_list:
+                # Record the level at the start of the first cycle, unless
+                # it changed right at the start
+                if not new_events[key]:
+                    event_list.append((cycle_start,
+                                       self.monitors_dictionary[key][-1]))
+                elif new_events[key][0][0] != cycle_start:
+                    event_list.append((cycle_start, self.network.invert_signal(
+                        new_events[key][0][1])))
+            event_list.extend(new_events[key])
 
     def get_signal_names(self):
         """Return two signal name lists: monitored and not monitored."""
@@ -120,12 +171,22 @@ class Monitors:
             monitor_name = self.devices.get_signal_name(device_id, output_id)
             monitored_signal_list.append(monitor_name)
 
-        for device_id in self.devices.find_devices():
-            device = self.devices.get_device(device_id)
+        # Aliases name the same outputs as the devices they refer to. Look
+        # devices up by ID once, as get_device() searches the whole list.
+        device_dict = {device.device_id: device
+                       for device in self.devices.devices_list}
+        get_name_string = self.devices.names.get_name_string
+        for device_id in list(device_dict) + list(self.devices.aliases):
+            device = device_dict[self.devices.aliases.get(device_id,
+                                                          device_id)]
+            device_name = get_name_string(device_id)
             for output_id in device.outputs:
                 if (device_id, output_id) not in self.monitors_dictionary:
-                    signal_name = self.devices.get_signal_name(device_id,
-                                                               output_id)
+                    if output_id is None:
+                        signal_name = device_name
+                    else:
+                        signal_name = ".".join([device_name,
+                                                get_name_string(output_id)])
                     non_monitored_signal_list.append(signal_name)
 
         return [monitored_signal_list, non_monitored_signal_list]
@@ -137,6 +198,7 @@ class Monitors:
         """
         for device_id, output_id in self.monitors_dictionary:
             self.monitors_dictionary[(device_id, output_id)] = []
+        self.events_dictionary.clear()
 
     def get_margin(self):
         """Return the length of the longest monitor's name.
@@ -155,6 +217,26 @@ class Monitors:
         else:
             return None
 
+    def get_edge_trace(self, signal_list):
+        """Return a copy of signal_list with changes shown as edges.
+
+        A HIGH following a LOW becomes RISING and a LOW following a HIGH
+        becomes FALLING. The recorded trace is not changed.
+        """
+        edge_list = []
+        previous_signal = None
+        for signal in signal_list:
+            if signal == self.devices.HIGH and \
+               previous_signal == self.devices.LOW:
+                edge_list.append(self.devices.RISING)
+            elif signal == self.devices.LOW and \
+                    previous_signal == self.devices.HIGH:
+                edge_list.append(self.devices.FALLING)
+            else:
+                edge_list.append(signal)
+            previous_signal = signal
+        return edge_list
+
     def display_signals(self):
         """Display the signal trace(s) in the text console."""
         margin = self.get_margin()
@@ -162,6 +244,8 @@ class Monitors:
             monitor_name = self.devices.get_signal_name(device_id, output_id)
             name_length = len(monitor_name)
             signal_list = self.monitors_dictionary[(device_id, output_id)]
+            if self.show_edges:
+                signal_list = self.get_edge_trace(signal_list)
             print(monitor_name + (margin - name_length) * " ", end=": ")
             for signal in signal_list:
                 if signal == self.devices.HIGH:
@@ -175,3 +259,51 @@ class Monitors:
                 if signal == self.devices.BLANK:
                     print(" ", end="")
             print("\n", end="")
+
+    def write_vcd(self, vcd_file, timescale="1 ns"):
+        """Write the signal traces to vcd_file as a value change dump.
+
+        In timed simulation, every recorded change is written at its time.
+        Otherwise, each simulation cycle is one time unit. BLANK signals
+        are written as unknown.
+        """
+        vcd_file.write("$timescale %s $end\n" % timescale)
+        vcd_file.write("$scope module logsim $end\n")
+        identifiers = {}
+        for i, (device_id, output_id) in enumerate(self.monitors_dictionary):
+            # Identifiers are short strings of printable characters
+            identifier = ""
+            i += 1
+            while i:
+                i, remainder = divmod(i - 1, 94)
+                identifier += chr(33 + remainder)
+            identifiers[(device_id, output_id)] = identifier
+            monitor_name = self.devices.get_signal_name(device_id, output_id)
+            vcd_file.write("$var wire 1 %s %s $end\n" % (identifier,
+                                                         monitor_name))
+        vcd_file.write("$upscope $end\n$enddefinitions $end\n")
+
+        changes = []  # [(time, identifier, value)]
+        for key, identifier in identifiers.items():
+            if self.events_dictionary.get(key):
+                event_list = self.events_dictionary[key]
+            else:
+                event_list = list(enumerate(self.monitors_dictionary[key]))
+            last_value = None
+            for time, signal in event_list:
+                if signal in [self.devices.HIGH, self.devices.RISING]:
+                    value = "1"
+                elif signal in [self.devices.LOW, self.devices.FALLING]:
+                    value = "0"
+                else:
+                    value = "x"
+                if value != last_value:
+                    changes.append((time, identifier, value))
+                    last_value = value
+
+        last_time = None
+        for time, identifier, value in sorted(changes, key=lambda x: x[0]):
+            if time != last_time:
+                vcd_file.write("#%d\n" % time)
+                last_time = time
+            vcd_file.write(value + identifier + "\n")
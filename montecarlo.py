@@ -0,0 +1,114 @@
+"""Run a circuit from many random cold starts in parallel.
+
+Used in the Logic Simulator project to check that sequential circuits
+reach the same behaviour whatever state their D-types and clocks start in.
+Each run starts from a cold start seeded with its own seed (see
+devices.Devices.cold_startup()), so any run can be repeated exactly.
+
+Functions
+---------
+run_seed - simulates the network from the cold start given by one seed.
+run_seeds - simulates many seeds in a process pool and summarises the
+            traces of every monitor.
+"""
+import collections
+import concurrent.futures
+import copy
+import os
+import time
+
+
+def run_seed(network, monitors, seed, cycles, switch_changes=None):
+    """Simulate the network from the cold start given by seed.
+
+    The network and monitors are not changed. switch_changes stores
+    {cycle: [(switch_id, switch_state)]}, applied before that cycle. Return
+    the traces {(device_id, output_id): [signals]}, or None if the network
+    does not settle.
+    """
+    if switch_changes is None:
+        switch_changes = {}
+    [network, monitors] = copy.deepcopy([network, monitors])
+    devices = network.devices
+    devices.reset_devices()
+    devices.cold_startup(seed)
+    if network.timed:
+        network.reset_timed()
+    for cycle in range(cycles):
+        for switch_id, switch_state in switch_changes.get(cycle, []):
+            devices.set_switch(switch_id, switch_state)
+        if not network.execute_network():
+            return None
+        monitors.record_signals()
+    return dict(monitors.monitors_dictionary)
+
+
+def run_seeds(network, monitors, seeds, cycles, switch_changes=None,
+              max_workers=None):
+    """Simulate the network from the cold start of every seed.
+
+    Runs are shared out over a process pool; max_workers defaults to the
+    number of processors. Return a report dictionary with keys 'seeds',
+    'cycles', 'seconds', 'failed_seeds' (seeds which did not settle),
+    'diverged_seeds' (seeds whose trace of any monitor differs from the
+    most common one) and 'monitors', which maps each monitor name to a
+    dictionary with keys:
+
+    'high_counts': for each cycle, the number of runs in which it is HIGH.
+    'diverged_seeds': the seeds whose trace differs from the most common.
+    'agreement_cycle': the first cycle from which every run agrees, or None.
+    """
+    start_time = time.perf_counter()
+    seeds = list(seeds)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers == 1 or len(seeds) <= 1:
+        results = [run_seed(network, monitors, seed, cycles, switch_changes)
+                   for seed in seeds]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+            futures = [executor.submit(run_seed, network, monitors, seed,
+                                       cycles, switch_changes)
+                       for seed in seeds]
+            results = [future.result() for future in futures]
+
+    failed_seeds = [seed for seed, traces in zip(seeds, results)
+                    if traces is None]
+    runs = [(seed, traces) for seed, traces in zip(seeds, results)
+            if traces is not None]
+    diverged_seeds = set()
+    monitor_reports = collections.OrderedDict()
+    devices = network.devices
+    for key in monitors.monitors_dictionary:
+        traces = [(seed, traces[key]) for seed, traces in runs]
+        counts = collections.Counter(tuple(trace) for seed, trace in traces)
+        common_trace = list(counts.most_common(1)[0][0]) if traces else []
+        diverged = [seed for seed, trace in traces if trace != common_trace]
+        diverged_seeds.update(diverged)
+
+        # Runs agree from the first cycle after the last disagreement
+        agreement_cycle = 0
+        for cycle in range(cycles):
+            if len(set(trace[cycle] for seed, trace in traces)) > 1:
+                agreement_cycle = cycle + 1
+        if agreement_cycle == cycles and cycles:
+            agreement_cycle = None
+
+        monitor_name = devices.get_signal_name(*key)
+        monitor_reports[monitor_name] = {
+            'high_counts': [
+                len([seed for seed, trace in traces
+                     if trace[cycle] == devices.HIGH])
+                for cycle in range(cycles)],
+            'diverged_seeds': diverged,
+            'agreement_cycle': agreement_cycle,
+        }
+
+    return {
+        'seeds': seeds,
+        'cycles': cycles,
+        'seconds': time.perf_counter() - start_time,
+        'failed_seeds': failed_seeds,
+        'diverged_seeds': [seed for seed in seeds if seed in diverged_seeds],
+        'monitors': monitor_reports,
+    }
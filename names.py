@@ -25,8 +25,13 @@ class Names:
 
     Public methods
     -------------
-    unique_error_codes(self, num_error_codes): Returns a list of unique integer
-                                               error codes.
+    unique_error_codes(self, num_error_codes, error_names=None): Returns a
+                        list of unique integer error codes. If error_names
+                        is given, the codes are recorded in the error code
+                        table under those names.
+
+    get_error_name(self, error_code): Returns the name recorded for the
+                        error code. Returns None if no name was recorded.
 
     query(self, name_string): Returns the corresponding name ID for the
                         name string. Returns None if the string is not present.
@@ -42,16 +47,34 @@ class Names:
         """Initialise names list."""
         self.error_code_count = 0  # how many error codes have been declared
         self.names=[]# initialising the names_list
+        # error code table stores {error_code: error_name}
+        self.error_code_table = {}
+
+    def unique_error_codes(self, num_error_codes, error_names=None):
+        """Return a list of unique integer error codes.
 
-    def unique_error_codes(self, num_error_codes):
-        """Return a list of unique integer error codes."""
+        If error_names is given, it must be a list of num_error_codes strings,
+        which are recorded against the new codes in the error code table.
+        """
         if not isinstance(num_error_codes, int):
             raise TypeError("Expected num_error_codes to be an integer.")
+        if error_names is not None and len(error_names) != num_error_codes:
+            raise ValueError("Expected one error name per error code.")
         self.error_code_count += num_error_codes
 
+        error_codes = range(self.error_code_count - num_error_codes,
+                            self.error_code_count)
+        if error_names is not None:
+            for error_code, error_name in zip(error_codes, error_names):
+                self.error_code_table[error_code] = error_name
+        return error_codes
 
-        return range(self.error_code_count - num_error_codes,
-                     self.error_code_count)
+    def get_error_name(self, error_code):
+        """Return the name recorded for error_code.
+
+        If no name has been recorded for the error code, return None.
+        """
+        return self.error_code_table.get(error_code)
 
     def query(self, name_string):
         """Return the corresponding name ID for name_string.
@@ -0,0 +1,575 @@
+"""Represent a parsed logic network as a netlist and transform it.
+
+Used in the Logic Simulator project to hold the design between parsing and
+simulation, so that optimisation passes can transform it before it is
+lowered into the Devices, Network and Monitors classes.
+
+Classes
+-------
+Node - stores a device in the netlist.
+Net - stores an output and all the inputs connected to it.
+Netlist - stores the nodes, nets and monitored outputs of a design.
+PassManager - runs transformation passes over a netlist and times them.
+
+Functions
+---------
+make_pass_manager - returns a pass manager running the named passes.
+build_netlist - builds a netlist from parsed devices and monitors.
+lower_netlist - builds new devices, network and monitors from a netlist.
+validate_netlist - checks that every input of every node is connected.
+remove_dead_logic - removes nodes that do not feed any monitored output.
+fold_constants - replaces gates driven only by fixed switches with fixed
+                 switches.
+levelize - orders nodes by their combinational depth.
+merge_duplicate_gates - merges gates of the same kind with the same inputs.
+"""
+import time
+
+from devices import Devices
+from network import Network
+from monitors import Monitors
+
+
+class Node:
+
+    """Store a device in the netlist.
+
+    Parameters
+    ----------
+    node_id: node ID, unique and stable within the netlist.
+    device_id: name ID of the device.
+    device_kind: device kind, as defined in devices.Devices().
+    qualifier: the qualifier passed to Devices.make_device(), or None.
+
+    Public methods
+    --------------
+    No public methods.
+    """
+
+    def __init__(self, node_id, device_id, device_kind, qualifier):
+        """Initialise node properties."""
+        self.node_id = node_id
+        self.device_id = device_id
+        self.device_kind = device_kind
+        self.qualifier = qualifier
+
+        # inputs dictionary stores {input_id: net_id}, None if unconnected
+        self.inputs = {}
+        # outputs dictionary stores {output_id: net_id}
+        self.outputs = {}
+
+        self.level = None  # combinational depth, set by levelize()
+        self.delay = None  # propagation delay, see Devices.set_delay()
+        self.fixed = False  # switch held at its level, see Device.fixed
+
+
+class Net:
+
+    """Store an output and all the inputs connected to it.
+
+    Parameters
+    ----------
+    net_id: net ID, unique and stable within the netlist.
+    driver: (node_id, output_id) of the output driving the net.
+
+    Public methods
+    --------------
+    No public methods.
+    """
+
+    def __init__(self, net_id, driver):
+        """Initialise net properties."""
+        self.net_id = net_id
+        self.driver = driver
+        self.sinks = []  # list of (node_id, input_id)
+
+
+class Netlist:
+
+    """Store the nodes, nets and monitored outputs of a design.
+
+    Parameters
+    ----------
+    names: instance of the names.Names() class.
+    devices: instance of the devices.Devices() class, used for its device
+             kind and port constants.
+
+    Public methods
+    --------------
+    add_node(self, device_id, device_kind, qualifier, input_ids,
+             output_ids): Adds a node and returns its node ID.
+
+    get_node(self, device_id): Returns the node of the named device, or of
+                               the device it is an alias of.
+
+    connect(self, driver, sink): Connects the output driver to the input
+                                 sink, both given as (node_id, port_id).
+
+    get_driver(self, node_id, input_id): Returns (node_id, output_id) of the
+                                         output connected to the input.
+
+    get_fanin(self, node_id): Returns the node IDs driving the node.
+
+    get_fanout(self, node_id): Returns the node IDs driven by the node.
+
+    remove_node(self, node_id): Removes the node and its connections.
+
+    merge_node(self, node_id, into_node_id): Moves the connections of one
+                        node onto another, and makes its name an alias.
+    """
+
+    def __init__(self, names, devices):
+        """Initialise the node, net and monitor containers."""
+        self.names = names
+        self.devices = devices
+
+        self.nodes = {}  # {node_id: Node}, in creation or level order
+        self.nets = {}  # {net_id: Net}
+        self.monitors = []  # list of (device_id, output_id)
+        # aliases dictionary stores {alias device_id: device_id} for devices
+        # merged into another device
+        self.aliases = {}
+
+        self._node_ids = {}  # {device_id: node_id}
+        self._next_node_id = 0
+        self._next_net_id = 0
+
+    def add_node(self, device_id, device_kind, qualifier, input_ids,
+                 output_ids):
+        """Add a node with the given ports and return its node ID."""
+        node = Node(self._next_node_id, device_id, device_kind, qualifier)
+        self._next_node_id += 1
+        for input_id in input_ids:
+            node.inputs[input_id] = None
+        for output_id in output_ids:
+            node.outputs[output_id] = None
+        self.nodes[node.node_id] = node
+        self._node_ids[device_id] = node.node_id
+        return node.node_id
+
+    def get_node(self, device_id):
+        """Return the node of the named device, or None if absent."""
+        device_id = self.aliases.get(device_id, device_id)
+        node_id = self._node_ids.get(device_id)
+        if node_id is None:
+            return None
+        return self.nodes.get(node_id)
+
+    def connect(self, driver, sink):
+        """Connect the output driver to the input sink.
+
+        Both are (node_id, port_id) pairs. Return the net ID.
+        """
+        (driver_node_id, output_id) = driver
+        (sink_node_id, input_id) = sink
+        driver_node = self.nodes[driver_node_id]
+        net_id = driver_node.outputs[output_id]
+        if net_id is None:
+            net_id = self._next_net_id
+            self._next_net_id += 1
+            self.nets[net_id] = Net(net_id, driver)
+            driver_node.outputs[output_id] = net_id
+        self.nets[net_id].sinks.append(sink)
+        self.nodes[sink_node_id].inputs[input_id] = net_id
+        return net_id
+
+    def get_driver(self, node_id, input_id):
+        """Return the output connected to the input, or None."""
+        net_id = self.nodes[node_id].inputs.get(input_id)
+        if net_id is None:
+            return None
+        return self.nets[net_id].driver
+
+    def get_fanin(self, node_id):
+        """Return a list of the node IDs driving the node."""
+        fanin = []
+        for net_id in self.nodes[node_id].inputs.values():
+            if net_id is not None:
+                driver_node_id = self.nets[net_id].driver[0]
+                if driver_node_id not in fanin:
+                    fanin.append(driver_node_id)
+        return fanin
+
+    def get_fanout(self, node_id):
+        """Return a list of the node IDs driven by the node."""
+        fanout = []
+        for net_id in self.nodes[node_id].outputs.values():
+            if net_id is not None:
+                for (sink_node_id, input_id) in self.nets[net_id].sinks:
+                    if sink_node_id not in fanout:
+                        fanout.append(sink_node_id)
+        return fanout
+
+    def remove_node(self, node_id):
+        """Remove the node, its output nets and its input connections."""
+        node = self.nodes.pop(node_id)
+        del self._node_ids[node.device_id]
+        for input_id, net_id in node.inputs.items():
+            if net_id is not None:
+                self.nets[net_id].sinks.remove((node_id, input_id))
+        for output_id, net_id in node.outputs.items():
+            if net_id is not None:
+                for (sink_node_id, input_id) in self.nets[net_id].sinks:
+                    self.nodes[sink_node_id].inputs[input_id] = None
+                del self.nets[net_id]
+        removed_ids = [node.device_id] + [
+            x for x in self.aliases if self.aliases[x] == node.device_id]
+        for device_id in removed_ids[1:]:
+            del self.aliases[device_id]
+        self.monitors = [x for x in self.monitors if x[0] not in removed_ids]
+
+    def merge_node(self, node_id, into_node_id):
+        """Replace the node by into_node_id, which has the same outputs.
+
+        Every input driven by the node is reconnected to the same output of
+        into_node_id, the node is removed, and its device name becomes an
+        alias of into_node_id's device, so that monitors keep working.
+        """
+        node = self.nodes[node_id]
+        into_node = self.nodes[into_node_id]
+        for output_id, net_id in node.outputs.items():
+            if net_id is None:
+                continue
+            for sink in list(self.nets[net_id].sinks):
+                self.nets[net_id].sinks.remove(sink)
+                self.nodes[sink[0]].inputs[sink[1]] = None
+                self.connect((into_node_id, output_id), sink)
+
+        # Keep the aliases and monitors of the removed node
+        monitors = self.monitors
+        aliases = [x for x in self.aliases if self.aliases[x] ==
+                   node.device_id]
+        self.remove_node(node_id)
+        self.monitors = monitors
+        for device_id in aliases + [node.device_id]:
+            self.aliases[device_id] = into_node.device_id
+
+
+class PassManager:
+
+    """Run transformation passes over a netlist and time them.
+
+    A pass is a function which takes a netlist, transforms it in place, and
+    returns True if successful.
+
+    Parameters
+    ----------
+    No parameters.
+
+    Public methods
+    --------------
+    add_pass(self, pass_name, pass_function): Appends a pass to the pipeline.
+
+    run(self, netlist): Runs every pass in order, stopping at the first
+                        failure. Returns True if all passes succeeded.
+
+    Public attributes
+    -----------------
+    timings: A list of (pass_name, seconds) for the passes run by run().
+    """
+
+    def __init__(self):
+        """Initialise the pass pipeline."""
+        self.passes = []  # list of (pass_name, pass_function)
+        self.timings = []
+
+    def add_pass(self, pass_name, pass_function):
+        """Append pass_function to the pipeline under pass_name."""
+        self.passes.append((pass_name, pass_function))
+
+    def run(self, netlist):
+        """Run every pass over netlist in order.
+
+        Return True if all passes succeeded. Stop at the first pass that
+        fails.
+        """
+        self.timings = []
+        for pass_name, pass_function in self.passes:
+            start_time = time.perf_counter()
+            success = pass_function(netlist)
+            self.timings.append((pass_name, time.perf_counter() - start_time))
+            if not success:
+                return False
+        return True
+
+
+def make_pass_manager(pass_names):
+    """Return a PassManager running the named passes in order.
+
+    Valid pass names are the keys of PASSES. Raise ValueError for an unknown
+    pass name.
+    """
+    pass_manager = PassManager()
+    for pass_name in pass_names:
+        if pass_name not in PASSES:
+            raise ValueError("Unknown pass: %s" % pass_name)
+        pass_manager.add_pass(pass_name, PASSES[pass_name])
+    return pass_manager
+
+
+def build_netlist(devices, monitors, fixed_switches=()):
+    """Return a netlist of the devices and monitors built by the parser.
+
+    The switches with device IDs in fixed_switches, and those already
+    fixed, are marked as fixed, so that fold_constants() may fold them.
+    """
+    netlist = Netlist(devices.names, devices)
+
+    for device in devices.devices_list:
+        if device.device_kind == devices.SWITCH:
+            qualifier = device.switch_state
+        elif device.device_kind == devices.CLOCK:
+            qualifier = device.clock_half_period
+        elif device.device_kind == devices.RC:
+            qualifier = device.highcount
+        elif device.device_kind in [devices.AND, devices.OR, devices.NAND,
+                                    devices.NOR]:
+            qualifier = len(device.inputs)
+        else:  # XOR and DTYPE do not take a qualifier
+            qualifier = None
+        node_id = netlist.add_node(device.device_id, device.device_kind,
+                                   qualifier, list(device.inputs),
+                                   list(device.outputs))
+        netlist.nodes[node_id].delay = device.delay
+        netlist.nodes[node_id].fixed = device.device_kind == \
+            devices.SWITCH and (device.fixed or
+                                device.device_id in fixed_switches)
+
+    for device in devices.devices_list:
+        sink_node = netlist.get_node(device.device_id)
+        for input_id, connected_output in device.inputs.items():
+            if connected_output is not None:
+                (output_device_id, output_id) = connected_output
+                driver_node = netlist.get_node(output_device_id)
+                netlist.connect((driver_node.node_id, output_id),
+                                (sink_node.node_id, input_id))
+
+    for (device_id, output_id) in monitors.monitors_dictionary:
+        netlist.monitors.append((device_id, output_id))
+    return netlist
+
+
+def lower_netlist(netlist):
+    """Build new devices, network and monitors from the netlist.
+
+    Devices are created in the order of netlist.nodes. Return
+    [devices, network, monitors].
+    """
+    names = netlist.names
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+
+    for node in netlist.nodes.values():
+        devices.make_device(node.device_id, node.device_kind, node.qualifier)
+        if node.delay is not None:
+            devices.set_delay(node.device_id, node.delay)
+        devices.get_device(node.device_id).fixed = node.fixed
+
+    for net in netlist.nets.values():
+        (driver_node_id, output_id) = net.driver
+        driver_node = netlist.nodes[driver_node_id]
+        for (sink_node_id, input_id) in net.sinks:
+            sink_node = netlist.nodes[sink_node_id]
+            network.make_connection(driver_node.device_id, output_id,
+                                    sink_node.device_id, input_id)
+
+    for alias_id, device_id in netlist.aliases.items():
+        devices.add_alias(alias_id, device_id)
+    network.finalise_network()
+
+    for (device_id, output_id) in netlist.monitors:
+        monitors.make_monitor(device_id, output_id)
+    return [devices, network, monitors]
+
+
+def validate_netlist(netlist):
+    """Return True if every input of every node is connected."""
+    for node in netlist.nodes.values():
+        for net_id in node.inputs.values():
+            if net_id is None:
+                return False
+    return True
+
+
+def remove_dead_logic(netlist):
+    """Remove every node that does not feed a monitored output.
+
+    Switches are kept, since the user may still set them. Return True.
+    """
+    live_nodes = set()
+    stack = [netlist.get_node(device_id).node_id
+             for (device_id, output_id) in netlist.monitors]
+    while stack:
+        node_id = stack.pop()
+        if node_id not in live_nodes:
+            live_nodes.add(node_id)
+            stack.extend(netlist.get_fanin(node_id))
+
+    for node_id, node in list(netlist.nodes.items()):
+        if node_id not in live_nodes and \
+           node.device_kind != netlist.devices.SWITCH:
+            netlist.remove_node(node_id)
+    return True
+
+
+def fold_constants(netlist):
+    """Replace gates whose output is set by fixed switches with switches.
+
+    Only switches marked as fixed (see build_netlist()) are treated as
+    constants, since the user can set any other switch while simulating.
+    A gate output is set if all of its inputs are driven by fixed switches,
+    or if any of them is at the gate's controlling level (LOW for AND and
+    NAND, HIGH for OR and NOR). Each replaced gate becomes a fixed switch,
+    so folding is repeated until no more gates can be replaced. Return
+    True.
+    """
+    devices = netlist.devices
+    # {device_kind: (controlling input, output when controlled)}
+    controlling = {devices.AND: (devices.LOW, devices.LOW),
+                   devices.NAND: (devices.LOW, devices.HIGH),
+                   devices.OR: (devices.HIGH, devices.HIGH),
+                   devices.NOR: (devices.HIGH, devices.LOW)}
+
+    changed = True
+    while changed:
+        changed = False
+        for node in list(netlist.nodes.values()):
+            if node.device_kind not in controlling and \
+               node.device_kind != devices.XOR:
+                continue
+            input_levels = []
+            for input_id in node.inputs:
+                driver = netlist.get_driver(node.node_id, input_id)
+                if driver is None:
+                    input_levels.append(None)
+                    continue
+                driver_node = netlist.nodes[driver[0]]
+                if driver_node.device_kind == devices.SWITCH and \
+                   driver_node.fixed:
+                    input_levels.append(driver_node.qualifier)
+                else:
+                    input_levels.append(None)
+
+            output_level = None
+            if node.device_kind == devices.XOR:
+                if None not in input_levels:
+                    output_level = (devices.HIGH if input_levels[0] !=
+                                    input_levels[1] else devices.LOW)
+            else:
+                [control_level, controlled_output] = \
+                    controlling[node.device_kind]
+                if control_level in input_levels:
+                    output_level = controlled_output
+                elif None not in input_levels:
+                    # all inputs are at the non-controlling level
+                    output_level = devices.HIGH if controlled_output == \
+                        devices.LOW else devices.LOW
+
+            if output_level is not None:
+                for input_id, net_id in node.inputs.items():
+                    if net_id is not None:
+                        netlist.nets[net_id].sinks.remove((node.node_id,
+                                                           input_id))
+                node.inputs = {}
+                node.device_kind = devices.SWITCH
+                node.qualifier = output_level
+                node.fixed = True
+                changed = True
+    return True
+
+
+def levelize(netlist):
+    """Order nodes by combinational depth and record it in node.level.
+
+    Switches, clocks, RC devices and D-types start at level 0, since their
+    outputs do not change combinationally with their inputs. Each gate is
+    one level above its deepest input. Gates in combinational loops are
+    placed after all the others. netlist.nodes is reordered by level, so
+    that lowering creates shallower devices first. Return True.
+    """
+    gate_kinds = netlist.devices.gate_types
+    remaining_inputs = {}  # {node_id: number of unlevelled gate inputs}
+    ready = []
+    for node in netlist.nodes.values():
+        node.level = None
+        if node.device_kind in gate_kinds:
+            remaining_inputs[node.node_id] = len(
+                [x for x in node.inputs.values() if x is not None])
+        else:
+            node.level = 0
+            ready.append(node.node_id)
+
+    # Kahn's algorithm, ignoring edges into non-gate nodes
+    while ready:
+        node_id = ready.pop()
+        for sink_node_id in netlist.get_fanout(node_id):
+            if sink_node_id not in remaining_inputs:
+                continue
+            level = netlist.nodes[node_id].level + 1
+            sink_node = netlist.nodes[sink_node_id]
+            if sink_node.level is None or sink_node.level < level:
+                sink_node.level = level
+            for net_id in sink_node.inputs.values():
+                if net_id is not None and \
+                   netlist.nets[net_id].driver[0] == node_id:
+                    remaining_inputs[sink_node_id] -= 1
+            if remaining_inputs[sink_node_id] == 0:
+                ready.append(sink_node_id)
+
+    max_level = max([node.level for node in netlist.nodes.values()
+                     if node.level is not None] + [0])
+    for node_id, count in remaining_inputs.items():
+        if count != 0:  # part of, or fed by, a combinational loop
+            netlist.nodes[node_id].level = max_level + 1
+
+    ordered = sorted(netlist.nodes.values(),
+                     key=lambda node: (node.level, node.node_id))
+    netlist.nodes = {node.node_id: node for node in ordered}
+    return True
+
+
+def merge_duplicate_gates(netlist):
+    """Merge gates of the same kind which are driven by the same outputs.
+
+    Inputs are compared regardless of their order, since all gates are
+    symmetric in their inputs. The names of merged gates become aliases of
+    the gate that is kept. Merging is repeated until no duplicates remain,
+    since merging gates can make the gates they drive identical. Return
+    True.
+    """
+    gate_kinds = netlist.devices.gate_types
+    changed = True
+    while changed:
+        changed = False
+        gate_table = {}  # {(device_kind, delay, drivers): node_id}
+        for node in list(netlist.nodes.values()):
+            if node.device_kind not in gate_kinds:
+                continue
+            drivers = []
+            for input_id in node.inputs:
+                driver = netlist.get_driver(node.node_id, input_id)
+                if driver is None:  # unconnected gates are never merged
+                    break
+                (driver_node_id, output_id) = driver
+                # output_id may be None, which cannot be sorted with IDs
+                drivers.append((driver_node_id,
+                                -1 if output_id is None else output_id))
+            else:
+                key = (node.device_kind, node.delay, tuple(sorted(drivers)))
+                if key in gate_table:
+                    netlist.merge_node(node.node_id, gate_table[key])
+                    changed = True
+                else:
+                    gate_table[key] = node.node_id
+    return True
+
+
+# Passes available to make_pass_manager(), by name
+PASSES = {
+    'validate': validate_netlist,
+    'dead': remove_dead_logic,
+    'fold': fold_constants,
+    'levelize': levelize,
+    'strash': merge_duplicate_gates
+}
@@ -6,6 +6,8 @@ Classes
 --------
 Network - builds and executes the network.
 """
+import collections
+import math
 
 
 class Network:
@@ -62,6 +64,67 @@ class Network:
 
     execute_network(self): Executes all the devices in the network for one
                            simulation cycle.
+
+    get_cone(self, outputs): Returns the set of device IDs in the fan-in cone
+                             of the given (device_id, output_id) outputs.
+
+    enable_pruning(self, outputs): Simulates only the logic feeding the given
+                                   outputs.
+
+    disable_pruning(self): Simulates every device again.
+
+    update_cone(self, outputs): Recomputes the cone for a new set of outputs
+                                if pruning is enabled.
+
+    resync_devices(self, device_ids): Brings the outputs of the specified
+                                      devices up to date with their inputs.
+
+    freeze_switches(self): Treats the current switch states as constants and
+                           stops simulating the devices they determine.
+
+    unfreeze_switches(self): Simulates the frozen devices again.
+
+    find_combinational_loops(self): Returns the groups of devices forming
+                                    loops which do not pass through a D-type.
+
+    get_logic_depth(self): Returns the number of devices on the longest path
+                           in the network.
+
+    finalise_network(self): Derives the settle iteration limit from the
+                            logic depth.
+
+    set_iteration_limit(self, iteration_limit=None): Overrides the settle
+                                                     iteration limit.
+
+    get_iteration_limit(self): Returns the settle iteration limit in use.
+
+    enable_two_phase(self, device_ids=None): Switches to the two-phase
+                                             synchronous evaluation mode.
+
+    disable_two_phase(self): Switches back to the default evaluation mode.
+
+    enable_two_state(self): Makes signals change directly between LOW and
+                            HIGH, without RISING or FALLING.
+
+    disable_two_state(self): Restores the RISING and FALLING transitions.
+
+    enable_timed(self, kind_delays=None, cycle_time=None): Switches to
+                 delay-accurate simulation on a timing wheel.
+
+    reset_timed(self): Restarts timed simulation from the current outputs.
+
+    disable_timed(self): Switches back to zero-delay simulation.
+
+    partition_devices(self, k): Splits the gates and D-types into k regions
+                                joined by few nets.
+
+    get_connected_components(self): Returns the groups of devices which are
+                                    not connected to each other.
+
+    enable_split(self, outputs): Settles each connected component feeding
+                                 outputs on its own, skipping the rest.
+
+    disable_split(self): Settles the whole network together again.
     """
 
     def __init__(self, names, devices):
@@ -69,11 +132,76 @@ class Network:
         self.names = names
         self.devices = devices
 
+        error_names = ["NO_ERROR", "INPUT_TO_INPUT", "OUTPUT_TO_OUTPUT",
+                       "INPUT_CONNECTED", "PORT_ABSENT", "DEVICE_ABSENT"]
         [self.NO_ERROR, self.INPUT_TO_INPUT, self.OUTPUT_TO_OUTPUT,
          self.INPUT_CONNECTED, self.PORT_ABSENT,
-         self.DEVICE_ABSENT] = self.names.unique_error_codes(6)
+         self.DEVICE_ABSENT] = self.names.unique_error_codes(6, error_names)
         self.steady_state = True  # for checking if signals have settled
 
+        # Set of gate and D-type device IDs to simulate, or None to simulate
+        # every device. Clocks, switches and RC devices are always executed
+        # so that they keep time while outside the cone.
+        self.cone = None
+
+        # Set of device IDs whose outputs are fixed by frozen switches, or
+        # None if switches are not frozen. _frozen_switch_states stores
+        # {switch_id: switch_state} at the time of freezing.
+        self.frozen = None
+        self._frozen_switch_states = {}
+
+        # List of device IDs whose outputs were still changing when
+        # execute_network() last failed to settle
+        self.oscillating_devices = []
+
+        # Settle iteration limits: iteration_limit is the user override,
+        # derived_iteration_limit is set by finalise_network() from the
+        # logic depth, and default_iteration_limit is used otherwise
+        self.iteration_limit = None
+        self.derived_iteration_limit = None
+        self.default_iteration_limit = 20
+        self.logic_depth = None
+        # Number of settle iterations taken by each execute_network() call
+        self.iteration_counts = []
+
+        # Two-phase synchronous evaluation mode, see enable_two_phase()
+        self.two_phase = False
+        # When only part of the network is evaluated here, boundary_exchange
+        # is called as boundary_exchange(changed) at every synchronisation
+        # point of a two-phase cycle. It must share this part's outputs with
+        # the other parts, fetch theirs, and return True if any part changed
+        # a shared output or was called with changed=True.
+        self.boundary_exchange = None
+
+        # connected_components lists the groups of connected device IDs,
+        # found by finalise_network(). In split mode, split lists the
+        # indices of the components which are simulated, and
+        # unsteady_components those which did not settle in the last cycle.
+        self.connected_components = []
+        self.split = None
+        self.unsteady_components = []
+
+        # Two-state mode, see enable_two_state(). _clock_levels stores the
+        # last clock level seen by each D-type and _data_levels the DATA
+        # levels at the start of the cycle, {device_id: signal}.
+        self.two_state = False
+        self._clock_levels = {}
+        self._data_levels = None
+
+        # Timed mode, see enable_timed(). events stores
+        # [(time, device_id, output_id, signal)] for the last cycle.
+        self.timed = False
+        self.time = 0
+        self.cycle_time = None
+        self.events = []
+
+        # {device_kind: (x, y)}, see execute_gate()
+        self._gate_rules = {
+            self.devices.AND: (self.devices.HIGH, self.devices.HIGH),
+            self.devices.OR: (self.devices.LOW, self.devices.LOW),
+            self.devices.NAND: (self.devices.HIGH, self.devices.LOW),
+            self.devices.NOR: (self.devices.LOW, self.devices.HIGH)}
+
     def get_connected_output(self, device_id, input_id):
         """Return the output connected to the given input.
 
@@ -171,8 +299,15 @@ class Network:
         """Update the signal in the direction of the target.
 
         Return updated signal, and set steady_state to false if the new signal
-        is different from the old signal.
+        is different from the old signal. In two-state mode, the signal is set
+        to the target directly.
         """
+        if self.two_state:
+            if signal not in [self.devices.LOW, self.devices.HIGH]:
+                return None
+            if signal != target:
+                self.steady_state = False
+            return target
         if signal in [self.devices.LOW, self.devices.FALLING]:
             if target == self.devices.LOW:
                 new_signal = self.devices.LOW
@@ -278,7 +413,17 @@ class Network:
                 set_signal = input_signal
 
         # Set D-type memory depending on the input signal
-        if clock_signal == self.devices.RISING:
+        if self.two_state:
+            # The clock has risen if it was LOW when last seen
+            last_clock_level = self._clock_levels.get(device_id, clock_signal)
+            self._clock_levels[device_id] = clock_signal
+            if last_clock_level == self.devices.LOW and \
+               clock_signal == self.devices.HIGH:
+                if self._data_levels is not None:
+                    # Sample DATA as it was before this cycle's changes
+                    data_signal = self._data_levels[device_id]
+                device.dtype_memory = data_signal
+        elif clock_signal == self.devices.RISING:
             if data_signal in [self.devices.HIGH, self.devices.FALLING]:
                 device.dtype_memory = self.devices.HIGH
             elif data_signal in [self.devices.LOW, self.devices.RISING]:
@@ -364,17 +509,982 @@ class Network:
                 device.clock_counter = 0
                 output_signal = self.get_output_signal(device_id,
                                                        output_id=None)
-                if output_signal == self.devices.HIGH:
+                if self.two_state:
+                    device.outputs[None] = self.invert_signal(output_signal)
+                elif output_signal == self.devices.HIGH:
                     device.outputs[None] = self.devices.FALLING
                 elif output_signal == self.devices.LOW:
                     device.outputs[None] = self.devices.RISING
             device.clock_counter += 1
 
+    def _execute_device(self, device_id):
+        """Execute one gate or D-type device. Return True if successful."""
+        device = self.devices.get_device(device_id)
+        if device.device_kind == self.devices.D_TYPE:
+            return self.execute_d_type(device_id)
+        elif device.device_kind == self.devices.AND:
+            return self.execute_gate(device_id, self.devices.HIGH,
+                                     self.devices.HIGH)
+        elif device.device_kind == self.devices.OR:
+            return self.execute_gate(device_id, self.devices.LOW,
+                                     self.devices.LOW)
+        elif device.device_kind == self.devices.NAND:
+            return self.execute_gate(device_id, self.devices.HIGH,
+                                     self.devices.LOW)
+        elif device.device_kind == self.devices.NOR:
+            return self.execute_gate(device_id, self.devices.LOW,
+                                     self.devices.HIGH)
+        elif device.device_kind == self.devices.XOR:
+            return self.execute_gate(device_id, None, None)
+        return False
+
+    def get_cone(self, outputs):
+        """Return the set of device IDs in the fan-in cone of outputs.
+
+        outputs is an iterable of (device_id, output_id) pairs. The cone is
+        found by walking backwards through each device's inputs.
+        """
+        cone = set()
+        stack = [device_id for (device_id, output_id) in outputs]
+        while stack:
+            device_id = stack.pop()
+            if device_id in cone:
+                continue
+            device = self.devices.get_device(device_id)
+            if device is None:
+                continue
+            # device_id may be an alias, but the device itself is simulated
+            cone.add(device.device_id)
+            for connected_output in device.inputs.values():
+                if connected_output is not None:
+                    stack.append(connected_output[0])
+        return cone
+
+    def enable_pruning(self, outputs):
+        """Simulate only the gates and D-types feeding outputs.
+
+        outputs is an iterable of (device_id, output_id) pairs, usually the
+        keys of Monitors.monitors_dictionary.
+        """
+        self.cone = self.get_cone(outputs)
+
+    def disable_pruning(self):
+        """Simulate every device again, bringing stale outputs up to date."""
+        if self.cone is not None:
+            stale = [x for x in self.devices.find_devices()
+                     if x not in self.cone]
+            self.cone = None
+            self.resync_devices(stale)
+
+    def update_cone(self, outputs):
+        """Recompute the cone and split components for outputs.
+
+        This only has an effect if pruning or split mode is enabled. Devices
+        which join the simulated set have not been simulated, so their
+        outputs are brought up to date. Return True if they settle.
+        """
+        added = []
+        if self.cone is not None:
+            new_cone = self.get_cone(outputs)
+            added = [x for x in self.devices.find_devices()
+                     if x in new_cone and x not in self.cone]
+            self.cone = new_cone
+        if self.split is not None:
+            new_split = self._get_monitored_components(outputs)
+            for index in new_split:
+                if index not in self.split:
+                    added.extend(self.connected_components[index])
+            self.split = new_split
+        return self.resync_devices(added)
+
+    def get_connected_components(self):
+        """Return the groups of devices which are not connected to each other.
+
+        Return a list of lists of device IDs, with devices and components in
+        the order the devices were made.
+        """
+        device_dict = self._get_device_dict()
+        neighbours = {}  # {device_id: [connected device_ids]}
+        for device in self.devices.devices_list:
+            neighbours.setdefault(device.device_id, [])
+            for connected_output in device.inputs.values():
+                if connected_output is not None:
+                    driver_id = device_dict[connected_output[0]].device_id
+                    neighbours[device.device_id].append(driver_id)
+                    neighbours.setdefault(driver_id, []).append(
+                        device.device_id)
+
+        component_of = {}  # {device_id: component index}
+        component_count = 0
+        for device in self.devices.devices_list:
+            if device.device_id in component_of:
+                continue
+            component_of[device.device_id] = component_count
+            stack = [device.device_id]
+            while stack:
+                device_id = stack.pop()
+                for neighbour_id in neighbours[device_id]:
+                    if neighbour_id not in component_of:
+                        component_of[neighbour_id] = component_count
+                        stack.append(neighbour_id)
+            component_count += 1
+
+        components = [[] for _ in range(component_count)]
+        for device in self.devices.devices_list:
+            components[component_of[device.device_id]].append(
+                device.device_id)
+        return components
+
+    def _get_monitored_components(self, outputs):
+        """Return the sorted indices of the components driving outputs."""
+        component_of = {}  # {device_id: component index}
+        for index, component in enumerate(self.connected_components):
+            for device_id in component:
+                component_of[device_id] = index
+        indices = set()
+        for device_id, output_id in outputs:
+            real_id = self.devices.get_device(device_id).device_id
+            indices.add(component_of[real_id])
+        return sorted(indices)
+
+    def enable_split(self, outputs):
+        """Settle each connected component feeding outputs on its own.
+
+        outputs is an iterable of (device_id, output_id) pairs, usually the
+        keys of Monitors.monitors_dictionary. Components which feed none of
+        them are not simulated at all, apart from completing clock edges,
+        and a component which does not settle no longer keeps the others
+        iterating. execute_network() still returns False if any simulated
+        component does not settle, and lists them in unsteady_components.
+        """
+        self.connected_components = self.get_connected_components()
+        self.split = self._get_monitored_components(outputs)
+
+    def disable_split(self):
+        """Settle the whole network together again.
+
+        Devices in skipped components are brought up to date.
+        """
+        if self.split is not None:
+            stale = []
+            for index, component in enumerate(self.connected_components):
+                if index not in self.split:
+                    stale.extend(component)
+            self.split = None
+            self.resync_devices(stale)
+
+    def resync_devices(self, device_ids):
+        """Bring the outputs of the specified devices up to date.
+
+        Gates and D-types in device_ids are executed until they settle, and
+        their outputs are then set to HIGH or LOW, so that no spurious
+        RISING or FALLING signal is recorded. D-types keep their memory.
+        Return True if the devices settle.
+        """
+        gate_and_d_type_kinds = self.devices.gate_types + [self.devices.D_TYPE]
+        device_ids = [x for x in device_ids if self.devices.get_device(
+            x).device_kind in gate_and_d_type_kinds]
+        iteration_limit = self.get_iteration_limit()
+
+        iterations = 0
+        self.steady_state = False
+        while iterations < iteration_limit and not self.steady_state:
+            iterations += 1
+            self.steady_state = True
+            for device_id in device_ids:
+                if not self._execute_device(device_id):
+                    return False
+
+        for device_id in device_ids:
+            device = self.devices.get_device(device_id)
+            for output_id, signal in device.outputs.items():
+                if signal == self.devices.RISING:
+                    device.outputs[output_id] = self.devices.HIGH
+                elif signal == self.devices.FALLING:
+                    device.outputs[output_id] = self.devices.LOW
+        return self.steady_state
+
+    def _get_constant_outputs(self, device_id, constants):
+        """Return the outputs of the device that are fixed by constants.
+
+        constants stores {(device_id, output_id): signal} for outputs known
+        to be constant. Return a dictionary {(device_id, output_id): signal}
+        if all outputs of the device are fixed, or None otherwise.
+        """
+        device = self.devices.get_device(device_id)
+        # {device_kind: (controlling input, output when controlled)}
+        controlling = {
+            self.devices.AND: (self.devices.LOW, self.devices.LOW),
+            self.devices.NAND: (self.devices.LOW, self.devices.HIGH),
+            self.devices.OR: (self.devices.HIGH, self.devices.HIGH),
+            self.devices.NOR: (self.devices.HIGH, self.devices.LOW)}
+        input_signals = {}
+        for input_id, connected_output in device.inputs.items():
+            input_signals[input_id] = constants.get(connected_output)
+
+        if device.device_kind == self.devices.XOR:
+            [first, second] = list(input_signals.values())
+            if first is None or second is None:
+                return None
+            output_signal = self.devices.LOW if first == second \
+                else self.devices.HIGH
+            return {(device_id, None): output_signal}
+
+        elif device.device_kind in controlling:
+            [control_signal, controlled_output] = \
+                controlling[device.device_kind]
+            signal_list = list(input_signals.values())
+            if control_signal in signal_list:
+                return {(device_id, None): controlled_output}
+            elif None not in signal_list:
+                # all inputs are at the non-controlling level
+                return {(device_id, None):
+                        self.invert_signal(controlled_output)}
+            return None
+
+        elif device.device_kind == self.devices.D_TYPE:
+            set_signal = input_signals[self.devices.SET_ID]
+            clear_signal = input_signals[self.devices.CLEAR_ID]
+            # CLEAR takes priority over SET, as in execute_d_type
+            if clear_signal == self.devices.HIGH:
+                memory = self.devices.LOW
+            elif set_signal == self.devices.HIGH and \
+                    clear_signal == self.devices.LOW:
+                memory = self.devices.HIGH
+            else:
+                return None
+            return {(device_id, self.devices.Q_ID): memory,
+                    (device_id, self.devices.QBAR_ID):
+                    self.invert_signal(memory)}
+        return None
+
+    def freeze_switches(self):
+        """Treat the current switch states as constants.
+
+        The switch levels are propagated through the gates, and through the
+        SET and CLEAR inputs of D-types. Every device whose outputs are then
+        fully determined has its outputs set to their constant levels and is
+        no longer executed. The network is unfrozen automatically by
+        execute_network() as soon as a switch state changes. Return the
+        number of frozen devices.
+        """
+        # fanout dictionary stores {device_id: [connected input device_ids]}
+        fanout = {}
+        for device in self.devices.devices_list:
+            for connected_output in device.inputs.values():
+                if connected_output is not None:
+                    fanout.setdefault(connected_output[0], []).append(
+                        device.device_id)
+
+        constants = {}
+        frozen = set()
+        self._frozen_switch_states = {}
+        worklist = []
+        for device_id in self.devices.find_devices(self.devices.SWITCH):
+            switch_state = self.devices.get_device(device_id).switch_state
+            self._frozen_switch_states[device_id] = switch_state
+            constants[(device_id, None)] = switch_state
+            frozen.add(device_id)
+            worklist.extend(fanout.get(device_id, []))
+
+        gate_and_d_type_kinds = self.devices.gate_types + [self.devices.D_TYPE]
+        while worklist:
+            device_id = worklist.pop()
+            device = self.devices.get_device(device_id)
+            if device_id in frozen or \
+               device.device_kind not in gate_and_d_type_kinds:
+                continue
+            outputs = self._get_constant_outputs(device_id, constants)
+            if outputs is not None:
+                constants.update(outputs)
+                frozen.add(device_id)
+                worklist.extend(fanout.get(device_id, []))
+
+        for (device_id, output_id), signal in constants.items():
+            device = self.devices.get_device(device_id)
+            device.outputs[output_id] = signal
+            if device.device_kind == self.devices.D_TYPE and \
+               output_id == self.devices.Q_ID:
+                device.dtype_memory = signal
+        self.frozen = frozen
+        return len(frozen)
+
+    def unfreeze_switches(self):
+        """Simulate the devices frozen by freeze_switches() again."""
+        self.frozen = None
+        self._frozen_switch_states = {}
+
+    def _get_components(self, break_at_d_types, break_at_data=False):
+        """Return the strongly connected components of the device graph.
+
+        The graph has an edge from each device to every device whose input
+        it drives. If break_at_d_types is True, edges into D-types are
+        ignored. If break_at_data is True, only edges into the DATA inputs
+        of D-types are ignored. Return [components, fanout], where
+        components is a list of lists of device IDs in reverse topological
+        order (a component only drives components listed before it), and
+        fanout stores {device_id: [driven device_ids]}. Tarjan's algorithm
+        is used, so the run time is linear in the number of devices and
+        connections.
+        """
+        device_dict = {}  # {device_id: Device}, to avoid linear lookups
+        for device in self.devices.devices_list:
+            device_dict[device.device_id] = device
+        # fanout dictionary stores {device_id: [connected device_ids]}
+        fanout = {}
+        for device in self.devices.devices_list:
+            if break_at_d_types and \
+               device.device_kind == self.devices.D_TYPE:
+                continue
+            for input_id, connected_output in device.inputs.items():
+                if break_at_data and input_id == self.devices.DATA_ID and \
+                   device.device_kind == self.devices.D_TYPE:
+                    continue
+                if connected_output is not None:
+                    driver = device_dict.get(connected_output[0])
+                    if driver is None:  # output named by an alias
+                        driver = self.devices.get_device(connected_output[0])
+                    fanout.setdefault(driver.device_id, []).append(
+                        device.device_id)
+
+        index = {}  # {device_id: discovery index}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root_id in device_dict:
+            if root_id in index:
+                continue
+            # Iterative depth-first search: (device_id, next fanout position)
+            work = [(root_id, 0)]
+            while work:
+                (device_id, position) = work.pop()
+                if position == 0:
+                    index[device_id] = lowlink[device_id] = len(index)
+                    stack.append(device_id)
+                    on_stack.add(device_id)
+                sinks = fanout.get(device_id, [])
+                if position < len(sinks):
+                    work.append((device_id, position + 1))
+                    sink_id = sinks[position]
+                    if sink_id not in index:
+                        work.append((sink_id, 0))
+                    elif sink_id in on_stack:
+                        lowlink[device_id] = min(lowlink[device_id],
+                                                 index[sink_id])
+                    continue
+                # All sinks visited: pass the lowlink up to the caller
+                if work:
+                    caller_id = work[-1][0]
+                    lowlink[caller_id] = min(lowlink[caller_id],
+                                             lowlink[device_id])
+                if lowlink[device_id] == index[device_id]:
+                    component = []
+                    while True:
+                        member_id = stack.pop()
+                        on_stack.remove(member_id)
+                        component.append(member_id)
+                        if member_id == device_id:
+                            break
+                    components.append(component)
+        return [components, fanout]
+
+    def find_combinational_loops(self):
+        """Return the groups of devices forming combinational loops.
+
+        Connections into D-types are ignored, since D-types break loops.
+        Each group is a list of device IDs that are all reachable from each
+        other; a single device is only reported if it is connected to
+        itself. The run time is linear in the number of devices and
+        connections.
+        """
+        [components, fanout] = self._get_components(break_at_d_types=True)
+        loops = []
+        for component in components:
+            if len(component) > 1 or \
+               component[0] in fanout.get(component[0], []):
+                loops.append(component)
+        return loops
+
+    def get_logic_depth(self):
+        """Return the number of devices on the longest path in the network.
+
+        Connections into the CLK, SET and CLEAR inputs of D-types are
+        followed, since D-types clocked by other devices can change within
+        a cycle. DATA inputs end a path, as DATA is only sampled at a clock
+        edge, so the feedback of a state machine through its D-types is not
+        counted as logic depth. A loop counts as many devices as it contains.
+        """
+        [components, fanout] = self._get_components(break_at_d_types=False,
+                                                    break_at_data=True)
+        component_ids = {}  # {device_id: component index}
+        for i, component in enumerate(components):
+            for device_id in component:
+                component_ids[device_id] = i
+
+        # Components only drive earlier components, so the longest path
+        # starting at each component can be found in list order
+        depths = []
+        for i, component in enumerate(components):
+            deepest = 0
+            for device_id in component:
+                for sink_id in fanout.get(device_id, []):
+                    sink_component = component_ids[sink_id]
+                    if sink_component != i:
+                        deepest = max(deepest, depths[sink_component])
+            depths.append(len(component) + deepest)
+        return max(depths + [0])
+
+    def finalise_network(self):
+        """Derive the settle iteration limit from the logic depth.
+
+        This should be called once all devices and connections are made.
+        Each device on the longest path may need two iterations to settle,
+        one to start RISING or FALLING and one to reach HIGH or LOW. Return
+        the derived limit.
+        """
+        self.logic_depth = self.get_logic_depth()
+        self.derived_iteration_limit = 2 * self.logic_depth + 2
+        self.connected_components = self.get_connected_components()
+        return self.derived_iteration_limit
+
+    def set_iteration_limit(self, iteration_limit=None):
+        """Override the settle iteration limit.
+
+        If iteration_limit is None, the derived limit is used again.
+        """
+        self.iteration_limit = iteration_limit
+
+    def get_iteration_limit(self):
+        """Return the settle iteration limit currently in use.
+
+        The user override is used if set, otherwise the limit derived by
+        finalise_network(), otherwise default_iteration_limit.
+        """
+        if self.iteration_limit is not None:
+            return self.iteration_limit
+        elif self.derived_iteration_limit is not None:
+            return self.derived_iteration_limit
+        return self.default_iteration_limit
+
+    def enable_two_phase(self, device_ids=None):
+        """Switch to the two-phase synchronous evaluation mode.
+
+        In this mode, each cycle first updates the D-types clocked by a
+        rising edge, then settles all gates once, in order of logic depth,
+        then updates any D-type whose clock, SET or CLEAR input changed as a
+        result, repeating the last two phases until the D-types are stable.
+        All D-types in a phase are updated simultaneously. Signals are only
+        ever HIGH or LOW, and pruning and frozen switches are ignored.
+
+        If device_ids is given, only those gates and D-types are evaluated,
+        and the other outputs are set through boundary_exchange.
+
+        Return False, leaving the mode unchanged, if the network has
+        combinational loops or unconnected inputs.
+        """
+        if self.find_combinational_loops():
+            return False
+        [components, fanout] = self._get_components(break_at_d_types=True)
+        device_dict = self._get_device_dict()
+
+        # _two_phase_gates and _two_phase_d_types store
+        # (Device, {input_id: (connected Device, output_id)})
+        self._two_phase_gates = []
+        self._two_phase_d_types = []
+        # Components are in reverse topological order
+        for component in reversed(components):
+            device = device_dict[component[0]]
+            if device_ids is not None and device.device_id not in device_ids:
+                continue
+            drivers = {}
+            for input_id, connected_output in device.inputs.items():
+                if connected_output is None:
+                    return False
+                drivers[input_id] = (device_dict[connected_output[0]],
+                                     connected_output[1])
+            if device.device_kind in self.devices.gate_types:
+                self._two_phase_gates.append((device, drivers))
+            elif device.device_kind == self.devices.D_TYPE:
+                self._two_phase_d_types.append((device, drivers))
+
+        self._two_phase_sources = [
+            x for x in self.devices.devices_list if x.device_kind in
+            [self.devices.CLOCK, self.devices.SWITCH, self.devices.RC]]
+        self.two_phase = True
+        return True
+
+    def disable_two_phase(self):
+        """Switch back to the default evaluation mode."""
+        self.two_phase = False
+
+    def enable_two_state(self):
+        """Make signals change directly between LOW and HIGH.
+
+        Without the RISING and FALLING transitions, a change propagates
+        through one device per settle iteration instead of needing two.
+        D-types detect a rising clock edge by comparing the clock with the
+        level they last saw. Any RISING or FALLING output is settled first.
+        """
+        for device in self.devices.devices_list:
+            for output_id, signal in device.outputs.items():
+                device.outputs[output_id] = self._get_level(signal)
+        self._clock_levels = {}
+        self.two_state = True
+
+    def disable_two_state(self):
+        """Restore the RISING and FALLING transitions."""
+        self.two_state = False
+
+    def _get_level(self, signal):
+        """Return HIGH or LOW, the level a signal is settling towards."""
+        if signal in [self.devices.HIGH, self.devices.RISING]:
+            return self.devices.HIGH
+        return self.devices.LOW
+
+    def _get_device_dict(self):
+        """Return {device_id: Device} for all devices and aliases."""
+        device_dict = {}
+        for device in self.devices.devices_list:
+            device_dict[device.device_id] = device
+        for alias_id in self.devices.aliases:
+            device_dict[alias_id] = self.devices.get_device(alias_id)
+        return device_dict
+
+    def _get_gate_output(self, device_kind, levels):
+        """Return the output of a gate with the given input levels."""
+        if device_kind == self.devices.XOR:
+            if levels[0] != levels[1]:
+                return self.devices.HIGH
+            return self.devices.LOW
+        [x, y] = self._gate_rules[device_kind]
+        if levels.count(x) == len(levels):
+            return y
+        return self.invert_signal(y)
+
+    def _settle_gates(self):
+        """Evaluate every gate once, in order of logic depth."""
+        for device, drivers in self._two_phase_gates:
+            levels = [self._get_level(connected_device.outputs[output_id])
+                      for (connected_device, output_id) in drivers.values()]
+            device.outputs[None] = self._get_gate_output(device.device_kind,
+                                                         levels)
+
+    def _update_d_types(self, last_clock_levels, data_levels=None):
+        """Update all D-types simultaneously.
+
+        A D-type samples DATA if its clock level has risen since the level
+        in last_clock_levels, which is then updated. SET and CLEAR are then
+        applied. If data_levels is given, DATA levels are taken from it
+        instead of the connected outputs. Return True if any D-type output
+        changed.
+        """
+        new_memories = []
+        for device, drivers in self._two_phase_d_types:
+            levels = {}
+            for input_id, (connected_device, output_id) in drivers.items():
+                levels[input_id] = self._get_level(
+                    connected_device.outputs[output_id])
+            memory = device.dtype_memory
+            clock_level = levels[self.devices.CLK_ID]
+            if last_clock_levels[device.device_id] == self.devices.LOW and \
+               clock_level == self.devices.HIGH:
+                if data_levels is None:
+                    memory = levels[self.devices.DATA_ID]
+                else:
+                    memory = data_levels[device.device_id]
+            last_clock_levels[device.device_id] = clock_level
+            if levels[self.devices.SET_ID] == self.devices.HIGH:
+                memory = self.devices.HIGH
+            if levels[self.devices.CLEAR_ID] == self.devices.HIGH:
+                memory = self.devices.LOW
+            new_memories.append((device, memory))
+
+        changed = False
+        for device, memory in new_memories:
+            device.dtype_memory = memory
+            if device.outputs[self.devices.Q_ID] != memory or \
+               device.outputs[self.devices.QBAR_ID] != \
+               self.invert_signal(memory):
+                device.outputs[self.devices.Q_ID] = memory
+                device.outputs[self.devices.QBAR_ID] = \
+                    self.invert_signal(memory)
+                changed = True
+        return changed
+
+    def _execute_two_phase(self):
+        """Execute one cycle in the two-phase synchronous mode.
+
+        Return True if the D-types become stable within the iteration limit.
+        """
+        self.update_clocks()
+        # Clock levels before this cycle (a RISING clock was LOW), and the
+        # settled DATA levels of the previous cycle
+        last_clock_levels = {}
+        data_levels = {}
+        for device, drivers in self._two_phase_d_types:
+            (connected_device, output_id) = drivers[self.devices.CLK_ID]
+            signal = connected_device.outputs[output_id]
+            if signal in [self.devices.LOW, self.devices.RISING]:
+                last_clock_levels[device.device_id] = self.devices.LOW
+            else:
+                last_clock_levels[device.device_id] = self.devices.HIGH
+            (connected_device, output_id) = drivers[self.devices.DATA_ID]
+            data_levels[device.device_id] = self._get_level(
+                connected_device.outputs[output_id])
+
+        for device in self._two_phase_sources:
+            if device.device_kind == self.devices.CLOCK:
+                device.outputs[None] = self._get_level(device.outputs[None])
+            elif device.device_kind == self.devices.SWITCH:
+                device.outputs[None] = device.switch_state
+
+        # D-types clocked directly by a clock sample the previous DATA. As in
+        # execute_network(), they see the new switch levels but the previous
+        # RC levels on SET and CLEAR.
+        self._update_d_types(last_clock_levels, data_levels)
+        if self.boundary_exchange is not None:
+            self.boundary_exchange(False)
+
+        for device in self._two_phase_sources:
+            if device.device_kind == self.devices.RC:
+                if device.current_count == 0:
+                    device.outputs[None] = self.devices.HIGH
+                elif device.current_count == device.highcount:
+                    device.outputs[None] = self.devices.LOW
+
+        iteration_limit = self.get_iteration_limit()
+        iterations = 0
+        self.steady_state = False
+        while iterations < iteration_limit:
+            iterations += 1
+            self._settle_gates()
+            if self.boundary_exchange is not None:
+                # Settle again until no shared gate output changes
+                while self.boundary_exchange(False):
+                    self._settle_gates()
+            changed = self._update_d_types(last_clock_levels)
+            if self.boundary_exchange is not None:
+                changed = self.boundary_exchange(changed)
+            if not changed:
+                self.steady_state = True
+                break
+
+        for device in self._two_phase_sources:
+            if device.device_kind == self.devices.RC:
+                device.current_count += 1
+        self.iteration_counts.append(iterations)
+        self.oscillating_devices = []
+        if not self.steady_state:
+            self.oscillating_devices = [
+                device.device_id for device, drivers in
+                self._two_phase_d_types]
+        return self.steady_state
+
+    def enable_timed(self, kind_delays=None, cycle_time=None):
+        """Switch to delay-accurate simulation on a timing wheel.
+
+        Each gate and D-type changes its outputs a number of time units
+        after its inputs change: its own delay (see Devices.set_delay()) if
+        set, else kind_delays[device_kind], else 1. Clocks, switches and RC
+        devices change at the start of each cycle, which lasts cycle_time
+        time units; by default, long enough for a change to pass along the
+        longest path. Every output change is recorded in self.events, so
+        hazards and glitches are visible. Changes still pending at the end
+        of a cycle are carried into the next, but execute_network() then
+        returns False.
+
+        Return False, leaving the mode unchanged, if the network has
+        unconnected inputs or a delay is not a positive integer.
+        """
+        if kind_delays is None:
+            kind_delays = {}
+        device_dict = self._get_device_dict()
+        delays = {}  # {device_id: delay}
+        # fanout stores {(device_id, output_id): [Device]}
+        fanout = {}
+        for device in self.devices.devices_list:
+            for output_id in device.outputs:
+                fanout[(device.device_id, output_id)] = []
+        for device in self.devices.devices_list:
+            if device.device_kind in self.devices.gate_types or \
+               device.device_kind == self.devices.D_TYPE:
+                delay = device.delay
+                if delay is None:
+                    delay = kind_delays.get(device.device_kind, 1)
+                if delay < 1:
+                    return False
+                delays[device.device_id] = delay
+            for connected_output in device.inputs.values():
+                if connected_output is None:
+                    return False
+                (connected_id, output_id) = connected_output
+                connected_device = device_dict[connected_id]
+                fanout[(connected_device.device_id, output_id)].append(device)
+
+        self._device_dict = device_dict
+        self._delays = delays
+        self._fanout = fanout
+        max_delay = max(list(delays.values()) + [1])
+        if cycle_time is None:
+            # Sources change without delay at the start of the cycle
+            cycle_time = max(1, (self.get_logic_depth() - 1) * max_delay + 1)
+        self.cycle_time = cycle_time
+        # Events are never scheduled more than max_delay ahead, so each slot
+        # of the wheel only ever holds events for a single time
+        self._wheel = [[] for _ in range(max_delay + 1)]
+        self.timed = True
+        self.reset_timed()
+        return True
+
+    def reset_timed(self):
+        """Restart timed simulation from the current outputs.
+
+        Pending events are dropped, the time is set to zero and every gate
+        and D-type is evaluated at the start of the next cycle. This should
+        be called after Devices.cold_startup().
+        """
+        for slot in self._wheel:
+            del slot[:]
+        self._pending_events = 0
+        self.time = 0
+        self.events = []
+
+        # _projected stores {(device_id, output_id): signal}, the value each
+        # output will have once its pending events are applied
+        self._projected = {}
+        self._to_evaluate = {}  # {device_id: Device}
+        self._timed_clock_levels = {}  # {device_id: last CLK level}
+        for device in self.devices.devices_list:
+            for output_id, signal in device.outputs.items():
+                device.outputs[output_id] = self._get_level(signal)
+                self._projected[(device.device_id, output_id)] = \
+                    device.outputs[output_id]
+            if device.device_id in self._delays:
+                self._to_evaluate[device.device_id] = device
+        for device_id in self.devices.find_devices(self.devices.D_TYPE):
+            self._timed_clock_levels[device_id] = self._get_timed_input(
+                self._device_dict[device_id], self.devices.CLK_ID)
+
+    def disable_timed(self):
+        """Switch back to zero-delay simulation."""
+        self.timed = False
+
+    def _get_timed_input(self, device, input_id):
+        """Return the current level of an input in timed mode."""
+        (connected_id, output_id) = device.inputs[input_id]
+        return self._device_dict[connected_id].outputs[output_id]
+
+    def _schedule_event(self, device, output_id, signal):
+        """Schedule an output change after the delay of the device."""
+        if self._projected[(device.device_id, output_id)] == signal:
+            return
+        self._projected[(device.device_id, output_id)] = signal
+        time = self.time + self._delays[device.device_id]
+        self._wheel[time % len(self._wheel)].append(
+            (device, output_id, signal))
+        self._pending_events += 1
+
+    def _apply_event(self, device, output_id, signal):
+        """Change an output now, marking its fanout for evaluation."""
+        if device.outputs[output_id] == signal:
+            return
+        device.outputs[output_id] = signal
+        self.events.append((self.time, device.device_id, output_id, signal))
+        for sink in self._fanout[(device.device_id, output_id)]:
+            self._to_evaluate[sink.device_id] = sink
+
+    def _evaluate_timed(self, device):
+        """Evaluate a gate or D-type and schedule its output changes."""
+        if device.device_kind != self.devices.D_TYPE:
+            levels = [self._get_timed_input(device, input_id)
+                      for input_id in device.inputs]
+            self._schedule_event(device, None, self._get_gate_output(
+                device.device_kind, levels))
+            return
+
+        clock_level = self._get_timed_input(device, self.devices.CLK_ID)
+        if self._timed_clock_levels[device.device_id] == self.devices.LOW \
+           and clock_level == self.devices.HIGH:
+            device.dtype_memory = self._get_timed_input(
+                device, self.devices.DATA_ID)
+        self._timed_clock_levels[device.device_id] = clock_level
+        if self._get_timed_input(device, self.devices.SET_ID) == \
+           self.devices.HIGH:
+            device.dtype_memory = self.devices.HIGH
+        if self._get_timed_input(device, self.devices.CLEAR_ID) == \
+           self.devices.HIGH:
+            device.dtype_memory = self.devices.LOW
+        self._schedule_event(device, self.devices.Q_ID, device.dtype_memory)
+        self._schedule_event(device, self.devices.QBAR_ID,
+                             self.invert_signal(device.dtype_memory))
+
+    def _execute_timed(self):
+        """Execute one cycle of timed simulation.
+
+        Return True if no changes are pending at the end of the cycle.
+        """
+        self.events = []
+        cycle_end = self.time + self.cycle_time
+
+        # Sources change at the start of the cycle, without delay
+        for device in self.devices.devices_list:
+            new_signal = None
+            if device.device_kind == self.devices.CLOCK:
+                if device.clock_counter == device.clock_half_period:
+                    device.clock_counter = 0
+                    new_signal = self.invert_signal(device.outputs[None])
+                device.clock_counter += 1
+            elif device.device_kind == self.devices.SWITCH:
+                new_signal = device.switch_state
+            elif device.device_kind == self.devices.RC:
+                if device.current_count == 0:
+                    new_signal = self.devices.HIGH
+                elif device.current_count == device.highcount:
+                    new_signal = self.devices.LOW
+                device.current_count += 1
+            if new_signal is not None:
+                self._projected[(device.device_id, None)] = new_signal
+                self._apply_event(device, None, new_signal)
+
+        wheel_size = len(self._wheel)
+        while True:
+            slot = self.time % wheel_size
+            events = self._wheel[slot]
+            self._wheel[slot] = []
+            self._pending_events -= len(events)
+            for device, output_id, signal in events:
+                self._apply_event(device, output_id, signal)
+            to_evaluate = self._to_evaluate
+            self._to_evaluate = {}
+            for device in to_evaluate.values():
+                self._evaluate_timed(device)
+            # Skip straight to the next cycle once nothing is pending
+            if self._pending_events == 0 or self.time + 1 >= cycle_end:
+                break
+            self.time += 1
+        self.time = cycle_end
+
+        self.steady_state = self._pending_events == 0
+        self.oscillating_devices = []
+        for slot in self._wheel:
+            for device, output_id, signal in slot:
+                if device.device_id not in self.oscillating_devices:
+                    self.oscillating_devices.append(device.device_id)
+        return self.steady_state
+
+    def partition_devices(self, k):
+        """Split the gates and D-types into k regions joined by few nets.
+
+        Devices are first ordered breadth-first through their connections
+        and cut into k equal runs, then moved one at a time to a
+        neighbouring region whenever that reduces the number of cut nets
+        (outputs read in more than one region) without unbalancing the
+        regions by more than 10%. Clocks, switches and RC devices are left
+        out, since they are cheap to copy into every region. Return
+        [regions, cut_nets], where regions is a list of k lists of device
+        IDs.
+        """
+        device_dict = self._get_device_dict()
+        kinds = self.devices.gate_types + [self.devices.D_TYPE]
+        node_ids = [x.device_id for x in self.devices.devices_list
+                    if x.device_kind in kinds]
+        # nets stores {(device_id, output_id): [device_ids]}, the driver and
+        # readers of each output; node_nets stores {device_id: [net keys]}
+        nets = {}
+        node_nets = {}
+        neighbours = {}
+        for device_id in node_ids:
+            node_nets[device_id] = []
+            neighbours[device_id] = []
+        for device_id in node_ids:
+            device = device_dict[device_id]
+            for connected_output in device.inputs.values():
+                if connected_output is None:
+                    continue
+                driver = device_dict[connected_output[0]]
+                if driver.device_id not in node_nets:
+                    continue
+                key = (driver.device_id, connected_output[1])
+                if key not in nets:
+                    nets[key] = [driver.device_id]
+                    node_nets[driver.device_id].append(key)
+                nets[key].append(device_id)
+                node_nets[device_id].append(key)
+                neighbours[device_id].append(driver.device_id)
+                neighbours[driver.device_id].append(device_id)
+
+        # Breadth-first order keeps connected devices in the same run
+        order = []
+        visited = set()
+        for root_id in node_ids:
+            if root_id in visited:
+                continue
+            visited.add(root_id)
+            queue = collections.deque([root_id])
+            while queue:
+                device_id = queue.popleft()
+                order.append(device_id)
+                for neighbour_id in neighbours[device_id]:
+                    if neighbour_id not in visited:
+                        visited.add(neighbour_id)
+                        queue.append(neighbour_id)
+        region_of = {}
+        for i, device_id in enumerate(order):
+            region_of[device_id] = i * k // max(len(order), 1)
+        sizes = [0] * k
+        for region in region_of.values():
+            sizes[region] += 1
+        average_size = len(order) / k
+        max_size = max(math.ceil(average_size), int(average_size * 1.1))
+        min_size = min(int(average_size), math.ceil(average_size * 0.9))
+
+        def count_cuts(device_id):
+            return len([key for key in node_nets[device_id] if
+                        len(set(region_of[x] for x in nets[key])) > 1])
+
+        for _ in range(4):  # refinement passes
+            moved = False
+            for device_id in order:
+                current = region_of[device_id]
+                if sizes[current] <= min_size:
+                    continue
+                best_cuts = count_cuts(device_id)
+                best_region = current
+                for region in set(region_of[x] for x in
+                                  neighbours[device_id]):
+                    if region == current or sizes[region] >= max_size:
+                        continue
+                    region_of[device_id] = region
+                    cuts = count_cuts(device_id)
+                    if cuts < best_cuts:
+                        best_cuts = cuts
+                        best_region = region
+                region_of[device_id] = best_region
+                if best_region != current:
+                    sizes[current] -= 1
+                    sizes[best_region] += 1
+                    moved = True
+            if not moved:
+                break
+
+        regions = [[] for _ in range(k)]
+        for device_id in node_ids:
+            regions[region_of[device_id]].append(device_id)
+        cut_nets = len([key for key, readers in nets.items() if
+                        len(set(region_of[x] for x in readers)) > 1])
+        return [regions, cut_nets]
+
     def execute_network(self):
         """Execute all the devices in the network for one simulation cycle.
 
         Return True if successful and the network does not oscillate.
         """
+        if self.timed:
+            return self._execute_timed()
+        if self.two_phase:
+            return self._execute_two_phase()
+
         clock_devices = self.devices.find_devices(self.devices.CLOCK)
         switch_devices = self.devices.find_devices(self.devices.SWITCH)
         d_type_devices = self.devices.find_devices(self.devices.D_TYPE)
@@ -385,54 +1495,163 @@ class Network:
         xor_devices = self.devices.find_devices(self.devices.XOR)
         rc_devices = self.devices.find_devices(self.devices.RC)
 
+        if self.frozen is not None:
+            # Restore the original network as soon as a switch is toggled
+            for device_id, switch_state in \
+                    self._frozen_switch_states.items():
+                if self.devices.get_device(device_id).switch_state != \
+                   switch_state:
+                    self.unfreeze_switches()
+                    break
+        if self.frozen is not None:
+            # Skip the devices whose outputs are constant
+            [switch_devices, d_type_devices, and_devices, or_devices,
+             nand_devices, nor_devices, xor_devices] = [
+                 [x for x in device_list if x not in self.frozen]
+                 for device_list in [switch_devices, d_type_devices,
+                                     and_devices, or_devices, nand_devices,
+                                     nor_devices, xor_devices]]
+
+        if self.cone is not None:
+            # Only simulate the logic feeding the monitored outputs
+            [d_type_devices, and_devices, or_devices, nand_devices,
+             nor_devices, xor_devices] = [
+                 [x for x in device_list if x in self.cone]
+                 for device_list in [d_type_devices, and_devices, or_devices,
+                                     nand_devices, nor_devices, xor_devices]]
+
+        if self.two_state:
+            # Remember the levels before the clocks change
+            self._clock_levels = {}
+            self._data_levels = {}
+            for device_id in d_type_devices:
+                self._clock_levels[device_id] = self.get_input_signal(
+                    device_id, self.devices.CLK_ID)
+                self._data_levels[device_id] = self.get_input_signal(
+                    device_id, self.devices.DATA_ID)
+
         # This sets clock signals to RISING or FALLING, where necessary
         self.update_clocks()
 
+        device_lists = [switch_devices, d_type_devices, clock_devices,
+                        and_devices, or_devices, nand_devices, nor_devices,
+                        xor_devices, rc_devices]
+        if self.split is None:
+            groups = [device_lists]
+        else:
+            # Settle each monitored component on its own
+            groups = []
+            active_devices = set()
+            for index in self.split:
+                component = set(self.connected_components[index])
+                active_devices.update(component)
+                groups.append([[x for x in device_list if x in component]
+                               for device_list in device_lists])
+            # Clocks in skipped components still complete their edges
+            for device_id in clock_devices:
+                if device_id not in active_devices:
+                    if not self.execute_clock(device_id):
+                        return False
+
+        self.oscillating_devices = []
+        self.unsteady_components = []
+        steady_state = True
+        most_iterations = 0
+        # _settle_devices() clears the DATA levels, which every group needs
+        data_levels = self._data_levels
+        for index, group in enumerate(groups):
+            self._data_levels = data_levels
+            [status, iterations] = self._settle_devices(group)
+            if status is None:
+                return False
+            most_iterations = max(most_iterations, iterations)
+            if not status:
+                steady_state = False
+                if self.split is not None:
+                    self.unsteady_components.append(self.split[index])
+
+        # Update RC devices cycle counter
+        for device_id in rc_devices:
+            self.devices.get_device(device_id).current_count += 1
+
+        self.iteration_counts.append(most_iterations)
+        self.steady_state = steady_state
+        return steady_state
+
+    def _settle_devices(self, device_lists):
+        """Execute the given devices until they settle.
+
+        device_lists holds the switch, D-type, clock, AND, OR, NAND, NOR, XOR
+        and RC device IDs to execute, in that order. Return [status,
+        iterations]. status is True if the devices settle within the
+        iteration limit, False if not, in which case the devices still
+        changing are added to oscillating_devices, and None if a device
+        could not be executed.
+        """
+        [switch_devices, d_type_devices, clock_devices, and_devices,
+         or_devices, nand_devices, nor_devices, xor_devices,
+         rc_devices] = device_lists
+        group_ids = set()
+        for device_list in device_lists:
+            group_ids.update(device_list)
+
         # Number of iterations to wait for the signals to settle before
         # declaring the network unstable
-        iteration_limit = 20
+        iteration_limit = self.get_iteration_limit()
 
         iterations = 0
         while iterations < iteration_limit:
             iterations += 1
             self.steady_state = True
+            if iterations == iteration_limit:
+                # Remember the outputs, to report which devices still toggle
+                last_outputs = {}
+                for device in self.devices.devices_list:
+                    if device.device_id in group_ids:
+                        last_outputs[device.device_id] = dict(device.outputs)
 
             for device_id in switch_devices:  # execute switch devices
                 if not self.execute_switch(device_id):
-                    return False
+                    return [None, iterations]
             # Execute D-type devices before clocks to catch the rising edge of
             # the clock
             for device_id in d_type_devices:  # execute DTYPE devices
                 if not self.execute_d_type(device_id):
-                    return False
+                    return [None, iterations]
+            # Only D-types clocked in the first iteration sample the DATA
+            # levels from before the cycle
+            self._data_levels = None
             for device_id in clock_devices:  # complete clock executions
                 if not self.execute_clock(device_id):
-                    return False
+                    return [None, iterations]
             for device_id in and_devices:  # execute AND gate devices
                 if not self.execute_gate(device_id, self.devices.HIGH,
                                          self.devices.HIGH):
-                    return False
+                    return [None, iterations]
             for device_id in or_devices:  # execute OR gate devices
                 if not self.execute_gate(device_id, self.devices.LOW,
                                          self.devices.LOW):
-                    return False
+                    return [None, iterations]
             for device_id in nand_devices:  # execute NAND gate devices
                 if not self.execute_gate(device_id, self.devices.HIGH,
                                          self.devices.LOW):
-                    return False
+                    return [None, iterations]
             for device_id in nor_devices:  # execute NOR gate devices
                 if not self.execute_gate(device_id, self.devices.LOW,
                                          self.devices.HIGH):
-                    return False
+                    return [None, iterations]
             for device_id in xor_devices:  # execute XOR devices
                 if not self.execute_gate(device_id, None, None):
-                    return False
+                    return [None, iterations]
             for device_id in rc_devices:
                 if not self.execute_rc(device_id):
-                    return False
+                    return [None, iterations]
             if self.steady_state:
                 break
-        # Update RC devices cycle counter
-        for device_id in rc_devices:
-            self.devices.get_device(device_id).current_count += 1
-        return self.steady_state
+
+        if not self.steady_state:
+            for device in self.devices.devices_list:
+                if device.device_id in group_ids and \
+                   device.outputs != last_outputs[device.device_id]:
+                    self.oscillating_devices.append(device.device_id)
+        return [self.steady_state, iterations]
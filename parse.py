@@ -13,6 +13,10 @@ from names import Names
 from scanner import Symbol, Scanner
 
 
+class _KeywordError(Exception):
+    """Abort parsing on a keyword error when collecting diagnostics."""
+
+
 class Parser:
 
     """Parse the definition file and build the logic network.
@@ -30,24 +34,49 @@ class Parser:
     network: instance of the network.Network() class.
     monitors: instance of the monitors.Monitors() class.
     scanner: instance of the scanner.Scanner() class.
+    collect_errors: if True, errors are not printed and the program never
+                    exits. Instead, each error is recorded as a diagnostic
+                    in self.diagnostics, and parse_network() returns
+                    [success, diagnostics].
 
     Public methods
     --------------
     parse_network(self): Parses the circuit definition file.
+
+    display_error(self, error_type, stopping_symbols): Reports an error and
+                       skips symbols until a stopping symbol is found.
+
+    boilerplate_error(self): Prints the file, line and location of an error.
+
+    Public attributes
+    -----------------
+    diagnostics: A list of the errors found in collect_errors mode. Each
+                 diagnostic is a dictionary with keys 'code', 'name',
+                 'message', 'line' (1-indexed), 'column' (1-indexed) and
+                 'source' (the offending line of the definition file).
     """
 
-    def __init__(self, names, devices, network, monitors, scanner):
+    def __init__(self, names, devices, network, monitors, scanner,
+                 collect_errors=False):
         """Initialise constants."""
         self._names = names
         self._devices = devices
         self._network = network
         self._monitors = monitors
         self._scanner = scanner
+        self._collect_errors = collect_errors
 
         self._current_sym = None
         self._err_cnt = 0
+        self.diagnostics = []
 
         # Defining all error types now using names.unique_error_codes
+        error_names = ["NO_END", "NO_EOF", "NO_DEVICE",
+                       "NOT_VALID_DEVICE_TYPE", "NO_NAME", "NO_PARAMETER",
+                       "NO_CLOSE_BRACKET", "NO_PUNCTUATION", "NO_CONNECT",
+                       "NOT_VALID_OUTPUT", "NO_CONNECTION_OP", "NO_DOT",
+                       "NOT_VALID_INPUT", "NO_MONITOR", "NO_SEMI_COLON",
+                       "INPUTS_NOT_CONNECTED"]
         [self.NO_END,
          self.NO_EOF,
          self.NO_DEVICE,
@@ -63,7 +92,13 @@ class Parser:
          self.NOT_VALID_INPUT,
          self.NO_MONITOR,
          self.NO_SEMI_COLON,
-         self.INPUTS_NOT_CONNECTED] = self._names.unique_error_codes(16)
+         self.INPUTS_NOT_CONNECTED] = self._names.unique_error_codes(
+             16, error_names)
+
+        # Keyword errors are fatal: the program exits, or parsing is
+        # abandoned in collect_errors mode
+        self._keyword_errors = [self.NO_DEVICE, self.NO_END,
+                                self.NO_MONITOR, self.NO_CONNECT]
 
         # BELOW are the stopping sybols which are used to indicate where
         # parsing should continue upon finding a error.
@@ -98,7 +133,22 @@ class Parser:
         }
 
     def parse_network(self):
-        """Parse the circuit definition file."""
+        """Parse the circuit definition file.
+
+        Return True if there are no errors. In collect_errors mode, return
+        [success, diagnostics] instead.
+        """
+        if not self._collect_errors:
+            return self._parse_network()
+
+        try:
+            ret = self._parse_network()
+        except _KeywordError:
+            ret = False
+        return [ret, self.diagnostics]
+
+    def _parse_network(self):
+        """Parse the circuit definition file and return True if no errors."""
 
         ret = True  # return value, True = no errors, False = error
 
@@ -129,7 +179,10 @@ class Parser:
             self.display_error(self.INPUTS_NOT_CONNECTED,
                                self.stopping_symbols["EOF"])
         ret = network_ok and ret
-        if self._err_cnt > 0:
+        if ret:
+            # derive simulation settings from the finished network
+            self._network.finalise_network()
+        if self._err_cnt > 0 and not self._collect_errors:
             if self._err_cnt == 1:
                 print("Total of:", self._err_cnt, "error found")
             else:
@@ -162,9 +215,12 @@ class Parser:
             [status, device_kind, devices] = self._parse_device_def()
             ret = status and ret
             if ret and self._err_cnt == 0:
-                for device_id, parameter in devices.items():
+                for device_id, [parameter, delay] in devices.items():
                     error_type = self._devices.make_device(
                         device_id, device_kind, parameter)
+                    if error_type == self._devices.NO_ERROR and \
+                       delay is not None:
+                        error_type = self._devices.set_delay(device_id, delay)
                     # checking now for semantic failure
                     if error_type != self._devices.NO_ERROR:
                         # continue parsing using "BETWEEN"'s stopping symbols
@@ -236,7 +292,8 @@ class Parser:
 
     def _parse_device(self):
         """
-        Parses a specific device (ck(2)).
+        Parses a specific device (ck(2)), with an optional propagation
+        delay after the qualifier (a1(2, 3) or d1(, 3)).
 
         Will get its own initial symbol.
         Will update current_sym to next symbol.
@@ -250,23 +307,35 @@ class Parser:
         ret = True
 
         [device_name_status, device_id] = self._parse_device_name()
-        # setting default parameter value
+        # setting default parameter and delay values
         parameter = None
+        delay = None
         ret = ret and device_name_status
 
         self._current_sym = self._scanner.get_symbol()
 
         if self._current_sym.symtype == OPENPAREN:
-            # get number and closeparen
+            # get number, optional delay and closeparen
             self._current_sym = self._scanner.get_symbol()
-            if self._current_sym.symtype != NUMBER:
+            if self._current_sym.symtype == NUMBER:
+                parameter = self._current_sym.symid
+                self._current_sym = self._scanner.get_symbol()
+            elif self._current_sym.symtype != COMMA:
                 # ERROR - supposed to have a parameter
                 self.display_error(
                     self.NO_PARAMETER,
                     self.stopping_symbols["BETWEEN"])
                 return [False, None]
-            parameter = self._current_sym.symid
-            self._current_sym = self._scanner.get_symbol()
+            if self._current_sym.symtype == COMMA:
+                self._current_sym = self._scanner.get_symbol()
+                if self._current_sym.symtype != NUMBER:
+                    # ERROR - supposed to have a delay
+                    self.display_error(
+                        self.NO_PARAMETER,
+                        self.stopping_symbols["BETWEEN"])
+                    return [False, None]
+                delay = self._current_sym.symid
+                self._current_sym = self._scanner.get_symbol()
             if self._current_sym.symtype != CLOSEPAREN:
                 # Error
                 self.display_error(
@@ -276,7 +345,7 @@ class Parser:
             self._current_sym = self._scanner.get_symbol()
 
         # comma/semicolon checked in device_def
-        return [ret, {device_id: parameter}]
+        return [ret, {device_id: [parameter, delay]}]
 
     def _parse_device_name(self, getsym=True):
         """
@@ -513,91 +582,121 @@ class Parser:
         along the line an error occured.
 
         Calls boilerplate_error() which prints out generic error details,
-        then prints error specific message.
+        then prints error specific message. In collect_errors mode, nothing
+        is printed and the error is recorded in self.diagnostics instead.
         """
         # increase the error_counts
         self._err_cnt += 1
-        # display standard traceback
-        self.boilerplate_error()
-        # various syntactic errors
+        message = self._error_message(error_type)
+        if self._collect_errors:
+            self.diagnostics.append(self._make_diagnostic(error_type,
+                                                          message))
+        else:
+            # display standard traceback
+            self.boilerplate_error()
+            if message is not None:
+                print(message)
         # keyword errors are treated more seriously and hence program exits
         # upon detection
-        if error_type == self.NO_DEVICE:
-            print("KeywordError: expected keyword \"DEVICE\" at start of file")
+        if error_type in self._keyword_errors:
+            if self._collect_errors:
+                raise _KeywordError()
             exit(1)
+
+        # following deals with error recovery which skips symbols until
+        # suitable stopping symbol is found
+        while ((self._current_sym.symtype not in stopping_symbols)
+               and (self._current_sym.symid not in stopping_symbols)):
+            self._current_sym = self._scanner.get_symbol()
+
+    def _error_message(self, error_type):
+        """Return the message for error_type, or None if there is none."""
+        # various syntactic errors
+        if error_type == self.NO_DEVICE:
+            return "KeywordError: expected keyword \"DEVICE\" at start of file"
         elif error_type == self.NO_END:
-            print("KeywordError: expected keyword \"END\" at end of file")
-            exit(1)
+            return "KeywordError: expected keyword \"END\" at end of file"
         elif error_type == self.NO_MONITOR:
-            print("KeywordError: expected keyword \"MONITOR\" " +
-                  "before monitoring signals")
-            exit(1)
+            return ("KeywordError: expected keyword \"MONITOR\" " +
+                    "before monitoring signals")
         elif error_type == self.NO_CONNECT:
-            print("KeywordError: expected keyword \"CONNECT\" before " +
-                  "connections")
-            exit(1)
+            return ("KeywordError: expected keyword \"CONNECT\" before " +
+                    "connections")
         elif error_type == self.NO_EOF:
-            print("FileError: Expected definition file to end here")
+            return "FileError: Expected definition file to end here"
         elif error_type == self.NOT_VALID_DEVICE_TYPE:
-            print("DeviceError: Not a valid device type")
+            return "DeviceError: Not a valid device type"
         elif error_type == self.NO_NAME:
-            print("DeviceError: Missing device name")
+            return "DeviceError: Missing device name"
         elif error_type == self.NO_PARAMETER:
-            print("DeviceError: Missing input parameter specified")
+            return "DeviceError: Missing input parameter specified"
         elif error_type == self.NO_CLOSE_BRACKET:
-            print("DeviceError: Missing closing parentheses")
+            return "DeviceError: Missing closing parentheses"
         elif error_type == self.NO_PUNCTUATION:
-            print("FileError: Missing comma or semi-colon")
+            return "FileError: Missing comma or semi-colon"
         elif error_type == self.NOT_VALID_OUTPUT:
-            print("ConnectionError: Not a valid device output")
+            return "ConnectionError: Not a valid device output"
         elif error_type == self.NOT_VALID_INPUT:
-            print("ConnectionError: Not a valid device input")
+            return "ConnectionError: Not a valid device input"
         elif error_type == self.NO_CONNECTION_OP:
-            print("ConnectionError: Missing connection operator \"->\" ")
+            return "ConnectionError: Missing connection operator \"->\" "
         elif error_type == self.NO_DOT:
-            print("ConnectionError: Missing input operator \".\" ")
+            return "ConnectionError: Missing input operator \".\" "
         elif error_type == self.NO_SEMI_COLON:
-            print("FileError: Missing semi-colon to separate connections")
+            return "FileError: Missing semi-colon to separate connections"
 
         # Now addressing semantic errors:
         # First make_device errors
         elif error_type == self._devices.DEVICE_PRESENT:
-            print("SemanticError: Device has already been named")
+            return "SemanticError: Device has already been named"
         elif error_type == self._devices.NO_QUALIFIER:
-            print("SemanticError: Device needs an inital state")
+            return "SemanticError: Device needs an inital state"
         elif error_type == self._devices.INVALID_QUALIFIER:
-            print("SemanticError: Not a valid qualifier for device")
+            return "SemanticError: Not a valid qualifier for device"
         elif error_type == self._devices.QUALIFIER_PRESENT:
-            print("SemanticError: Device does not take a qualifier")
+            return "SemanticError: Device does not take a qualifier"
         elif error_type == self._devices.BAD_DEVICE:
-            print("SemanticError: Not a valid device")
+            return "SemanticError: Not a valid device"
 
         # Now make_connection errors
         elif error_type == self._network.DEVICE_ABSENT:
-            print("SemanticError: Input or output device has not " +
-                  "been named in DEVICES")
+            return ("SemanticError: Input or output device has not " +
+                    "been named in DEVICES")
         elif error_type == self._network.INPUT_CONNECTED:
-            print("SemanticError: Input is already in a connection")
+            return "SemanticError: Input is already in a connection"
         elif error_type == self._network.INPUT_TO_INPUT:
-            print("SemanticError: Both ports are inputs")
+            return "SemanticError: Both ports are inputs"
         elif error_type == self._network.PORT_ABSENT:
-            print("SemanticError: Invalid input/output port used")
+            return "SemanticError: Invalid input/output port used"
         elif error_type == self.INPUTS_NOT_CONNECTED and self._err_cnt == 1:
-            print("SemanticError: Not all inputs are connected")
+            return "SemanticError: Not all inputs are connected"
 
         # Now addressing monitoring errors
-        elif error_type == self._network.DEVICE_ABSENT:
-            print("SemanticError: Output device has not been named in DEVICES")
         elif error_type == self._monitors.NOT_OUTPUT:
-            print("SemanticError: Not a valid ouput to monitor")
+            return "SemanticError: Not a valid ouput to monitor"
         elif error_type == self._monitors.MONITOR_PRESENT:
-            print("SemanticError: Signal is monitored more than once")
+            return "SemanticError: Signal is monitored more than once"
+        return None
 
-        # following deals with error recovery which skips symbols until
-        # suitable stopping symbol is found
-        while ((self._current_sym.symtype not in stopping_symbols)
-               and (self._current_sym.symid not in stopping_symbols)):
-            self._current_sym = self._scanner.get_symbol()
+    def _make_diagnostic(self, error_type, message):
+        """Return a diagnostic dictionary for the error at _current_sym."""
+        if self._scanner.filelines == []:
+            line = column = source = None
+            if message is None:
+                message = "File is empty"
+        else:
+            line = self._current_sym.linenum + 1
+            column = self._current_sym.colnum
+            source = self._scanner.filelines[self._current_sym.linenum]
+            source = source.rstrip('\n')
+        return {
+            'code': error_type,
+            'name': self._names.get_error_name(error_type),
+            'message': message,
+            'line': line,
+            'column': column,
+            'source': source
+        }
 
     def boilerplate_error(self):
         """
@@ -0,0 +1,341 @@
+"""Simulate a network split into regions, one worker process per region.
+
+Used in the Logic Simulator project to spread large networks over several
+processor cores. Each worker runs the two-phase synchronous evaluation mode
+(see network.Network.enable_two_phase()) on its own region, and the outputs
+read across regions are exchanged through shared memory at every
+synchronisation point, so the traces match a single-process run exactly.
+Connected components share no signals at all, so they can also be
+simulated for a whole run in separate workers.
+
+Functions
+---------
+simulate_partitioned - runs a network split into regions and returns the
+                       traces of its monitors.
+benchmark_partitioned - compares partitioned runs with a single-process run.
+simulate_components - runs each monitored connected component in a thread
+                      or process pool and returns the traces of the monitors.
+"""
+import concurrent.futures
+import copy
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+
+class _BoundaryExchange:
+
+    """Share the outputs read across regions through shared memory.
+
+    Instances are used as network.Network.boundary_exchange in the worker
+    processes.
+
+    Parameters
+    ----------
+    buffer: the buf of a shared_memory.SharedMemory, holding one byte per
+            shared output followed by one changed flag per region.
+    barrier: a multiprocessing.Barrier shared by all the workers.
+    region_index: index of the region simulated by this worker.
+    region_count: number of regions.
+    own_outputs: [(Device, output_id, buffer index)] driven in this region.
+    other_outputs: [(Device, output_id, buffer index)] read in this region
+                   but driven in another.
+
+    Public methods
+    --------------
+    No public methods.
+    """
+
+    def __init__(self, buffer, barrier, region_index, region_count,
+                 own_outputs, other_outputs):
+        """Store the buffer layout."""
+        self.buffer = buffer
+        self.barrier = barrier
+        self.region_index = region_index
+        self.region_count = region_count
+        self.own_outputs = own_outputs
+        self.other_outputs = other_outputs
+        self.flags = len(buffer) - region_count  # index of the first flag
+
+    def __call__(self, changed):
+        """Exchange outputs and return True if any region changed."""
+        for device, output_id, index in self.own_outputs:
+            signal = device.outputs[output_id]
+            if self.buffer[index] != signal:
+                self.buffer[index] = signal
+                changed = True
+        self.buffer[self.flags + self.region_index] = changed
+        self.barrier.wait()
+        any_changed = any(self.buffer[self.flags:])
+        for device, output_id, index in self.other_outputs:
+            device.outputs[output_id] = self.buffer[index]
+        # Nobody writes again until everyone has read
+        self.barrier.wait()
+        return any_changed
+
+
+def _get_boundary(network, regions):
+    """Return the outputs read in a region other than their driver's.
+
+    Return a list of (device_id, output_id, driver region, [reader regions]).
+    """
+    devices = network.devices
+    region_of = {}
+    for region_index, region in enumerate(regions):
+        for device_id in region:
+            region_of[device_id] = region_index
+    readers = {}  # {(device_id, output_id): set of reader regions}
+    for region_index, region in enumerate(regions):
+        for device_id in region:
+            device = devices.get_device(device_id)
+            for connected_output in device.inputs.values():
+                driver = devices.get_device(connected_output[0])
+                key = (driver.device_id, connected_output[1])
+                if region_of.get(driver.device_id, region_index) != \
+                   region_index:
+                    readers.setdefault(key, set()).add(region_index)
+    return [(device_id, output_id, region_of[device_id],
+             sorted(reader_regions))
+            for (device_id, output_id), reader_regions in readers.items()]
+
+
+def _run_region(network, monitors, regions, region_index, boundary,
+                memory_name, barrier, cycles, switch_changes, result_queue):
+    """Simulate one region in a worker process and send back its traces.
+
+    Put (region_index, traces, error) on result_queue, where traces is None
+    if the network does not settle and error describes any exception
+    raised. On an exception the barrier is broken, so that the other
+    workers stop waiting for this one.
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        devices = network.devices
+        own_outputs = []
+        other_outputs = []
+        for index, (device_id, output_id, driver_region,
+                    reader_regions) in enumerate(boundary):
+            device = devices.get_device(device_id)
+            if driver_region == region_index:
+                own_outputs.append((device, output_id, index))
+            elif region_index in reader_regions:
+                other_outputs.append((device, output_id, index))
+        network.enable_two_phase(set(regions[region_index]))
+        network.boundary_exchange = _BoundaryExchange(
+            memory.buf, barrier, region_index, len(regions), own_outputs,
+            other_outputs)
+
+        # Monitors on devices outside every region (clocks, switches and RC
+        # devices) are recorded by the first region
+        region = set(regions[region_index])
+        all_regions = set().union(*regions)
+        keys = []
+        for device_id, output_id in monitors.monitors_dictionary:
+            real_id = devices.get_device(device_id).device_id
+            if real_id in region or \
+               (region_index == 0 and real_id not in all_regions):
+                keys.append((device_id, output_id))
+
+        traces = dict((key, []) for key in keys)
+        for cycle in range(cycles):
+            for switch_id, switch_state in switch_changes.get(cycle, []):
+                devices.set_switch(switch_id, switch_state)
+            if not network.execute_network():
+                result_queue.put((region_index, None, None))
+                return
+            for key in keys:
+                traces[key].append(network.get_output_signal(*key))
+        result_queue.put((region_index, traces, None))
+    except Exception as error:
+        barrier.abort()
+        result_queue.put((region_index, None,
+                          "%s: %s" % (type(error).__name__, error)))
+    finally:
+        network.boundary_exchange = None
+        memory.close()
+
+
+def simulate_partitioned(network, monitors, regions, cycles,
+                         switch_changes=None):
+    """Run the network split into regions, one worker process each.
+
+    regions is a list of lists of device IDs, as returned by
+    Network.partition_devices(). switch_changes stores
+    {cycle: [(switch_id, switch_state)]}, applied before that cycle. The
+    network, which must have no combinational loops, is not changed.
+    Return the traces {(device_id, output_id): [signals]} in monitor order,
+    or None if the network does not settle. Raise RuntimeError if a worker
+    fails or dies.
+    """
+    if switch_changes is None:
+        switch_changes = {}
+    boundary = _get_boundary(network, regions)
+    memory = shared_memory.SharedMemory(create=True,
+                                        size=len(boundary) + len(regions))
+    workers = []
+    try:
+        for index, (device_id, output_id, driver_region,
+                    reader_regions) in enumerate(boundary):
+            memory.buf[index] = network.get_output_signal(device_id,
+                                                          output_id)
+        barrier = multiprocessing.Barrier(len(regions))
+        result_queue = multiprocessing.Queue()
+        workers = [multiprocessing.Process(
+            target=_run_region,
+            args=(network, monitors, regions, region_index, boundary,
+                  memory.name, barrier, cycles, switch_changes,
+                  result_queue))
+            for region_index in range(len(regions))]
+        for worker in workers:
+            worker.start()
+        results = []
+        while len(results) < len(workers):
+            try:
+                results.append(result_queue.get(timeout=1))
+            except queue.Empty:
+                # A worker killed before sending its result never will, so
+                # release the others from the barrier and give up
+                dead = [index for index, worker in enumerate(workers)
+                        if worker.exitcode not in (None, 0)]
+                if dead:
+                    barrier.abort()
+                    raise RuntimeError("partition worker %d exited with "
+                                       "code %d" % (dead[0],
+                                                    workers[dead[0]].exitcode))
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        memory.close()
+        memory.unlink()
+
+    # Report the first failure, not the broken barriers it caused
+    errors = sorted((error.startswith(threading.BrokenBarrierError.__name__),
+                     region_index, error)
+                    for region_index, region_traces, error in results
+                    if error is not None)
+    if errors:
+        [broken, region_index, error] = errors[0]
+        raise RuntimeError("partition worker %d failed: %s"
+                           % (region_index, error))
+    traces = {}
+    for region_index, region_traces, error in results:
+        if region_traces is None:
+            return None
+        traces.update(region_traces)
+    return dict((key, traces[key]) for key in monitors.monitors_dictionary)
+
+
+def benchmark_partitioned(network, monitors, cycles, worker_counts,
+                          switch_changes=None):
+    """Compare partitioned runs with a single-process two-phase run.
+
+    Return a report dictionary with keys 'cycles', 'cores' (the number of
+    processors), 'single_seconds' and 'runs', a list of dictionaries with
+    keys 'workers', 'cut_nets', 'seconds', 'speedup' and 'matches' (True if
+    the traces equal the single-process traces), one per worker count.
+    Return None if the network has combinational loops.
+    """
+    if switch_changes is None:
+        switch_changes = {}
+    # Keep the original network at its start state for every run
+    [reference_network, reference_monitors] = copy.deepcopy(
+        [network, monitors])
+    if not reference_network.enable_two_phase():
+        return None
+    devices = reference_network.devices
+    start_time = time.perf_counter()
+    for cycle in range(cycles):
+        for switch_id, switch_state in switch_changes.get(cycle, []):
+            devices.set_switch(switch_id, switch_state)
+        if not reference_network.execute_network():
+            return None
+        reference_monitors.record_signals()
+    single_seconds = time.perf_counter() - start_time
+    reference_traces = dict(reference_monitors.monitors_dictionary)
+
+    runs = []
+    for worker_count in worker_counts:
+        [regions, cut_nets] = network.partition_devices(worker_count)
+        start_time = time.perf_counter()
+        traces = simulate_partitioned(network, monitors, regions, cycles,
+                                      switch_changes)
+        seconds = time.perf_counter() - start_time
+        runs.append({'workers': worker_count, 'cut_nets': cut_nets,
+                     'seconds': seconds,
+                     'speedup': single_seconds / seconds,
+                     'matches': traces == reference_traces})
+    return {'cycles': cycles, 'cores': os.cpu_count(),
+            'single_seconds': single_seconds, 'runs': runs}
+
+
+def _run_component(network, monitors, keys, cycles, switch_changes):
+    """Simulate the component feeding the monitors in keys.
+
+    Return its traces, or None if it does not settle.
+    """
+    for key in list(monitors.monitors_dictionary):
+        if key not in keys:
+            monitors.remove_monitor(*key)
+    network.enable_split(monitors.monitors_dictionary)
+    for cycle in range(cycles):
+        for switch_id, switch_state in switch_changes.get(cycle, []):
+            network.devices.set_switch(switch_id, switch_state)
+        if not network.execute_network():
+            return None
+        monitors.record_signals()
+    return dict(monitors.monitors_dictionary)
+
+
+def simulate_components(network, monitors, cycles, switch_changes=None,
+                        max_workers=None, use_threads=False):
+    """Run each monitored connected component in a worker.
+
+    The network is not changed; each worker simulates a copy, in split mode
+    (see network.Network.enable_split()), so unmonitored components are
+    skipped. A process pool is used unless use_threads is True.
+    switch_changes is as for simulate_partitioned(). Return the traces
+    {(device_id, output_id): [signals]} in monitor order, or None if a
+    monitored component does not settle.
+    """
+    if switch_changes is None:
+        switch_changes = {}
+    component_of = {}  # {device_id: component index}
+    for index, component in enumerate(network.get_connected_components()):
+        for device_id in component:
+            component_of[device_id] = index
+    component_keys = {}  # {component index: [monitor keys]}
+    for device_id, output_id in monitors.monitors_dictionary:
+        real_id = network.devices.get_device(device_id).device_id
+        component_keys.setdefault(component_of[real_id], []).append(
+            (device_id, output_id))
+
+    if use_threads:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+    with executor:
+        futures = []
+        for keys in component_keys.values():
+            if use_threads:
+                # Threads share memory, so each one needs its own copy
+                [task_network, task_monitors] = copy.deepcopy(
+                    [network, monitors])
+            else:  # processes receive pickled copies
+                [task_network, task_monitors] = [network, monitors]
+            futures.append(executor.submit(
+                _run_component, task_network, task_monitors, keys, cycles,
+                switch_changes))
+        results = [future.result() for future in futures]
+
+    traces = {}
+    for result in results:
+        if result is None:
+            return None
+        traces.update(result)
+    return dict((key, traces[key]) for key in monitors.monitors_dictionary)
@@ -0,0 +1,264 @@
+"""Draw monitor traces into an image and save it as a PNG file.
+
+Used in the Logic Simulator project to make pictures of the signal traces
+without wxPython or OpenGL, e.g. on a build server. The layout follows
+gui.MyGLCanvas.draw_all_signals(), and long traces are drawn from the
+coarser levels of detail of waveform.Waveform(), so the time taken depends
+on the size of the image rather than the length of the traces.
+
+Classes
+-------
+Raster - stores an RGB image and draws lines, rectangles and text on it.
+
+Functions
+---------
+render_traces - draws the traces of every monitor into a Raster.
+"""
+import struct
+import zlib
+
+from waveform import Waveform, get_tick_spacing
+
+# 3 x 5 pixel glyphs, drawn at twice this size. Lower case letters use the
+# upper case glyphs, and characters without a glyph are drawn as '?'.
+FONT = {
+    " ": ("...", "...", "...", "...", "..."),
+    "A": (".#.", "#.#", "###", "#.#", "#.#"),
+    "B": ("##.", "#.#", "##.", "#.#", "##."),
+    "C": (".##", "#..", "#..", "#..", ".##"),
+    "D": ("##.", "#.#", "#.#", "#.#", "##."),
+    "E": ("###", "#..", "##.", "#..", "###"),
+    "F": ("###", "#..", "##.", "#..", "#.."),
+    "G": (".##", "#..", "#.#", "#.#", ".##"),
+    "H": ("#.#", "#.#", "###", "#.#", "#.#"),
+    "I": ("###", ".#.", ".#.", ".#.", "###"),
+    "J": ("..#", "..#", "..#", "#.#", ".#."),
+    "K": ("#.#", "#.#", "##.", "#.#", "#.#"),
+    "L": ("#..", "#..", "#..", "#..", "###"),
+    "M": ("#.#", "###", "###", "#.#", "#.#"),
+    "N": ("##.", "#.#", "#.#", "#.#", "#.#"),
+    "O": (".#.", "#.#", "#.#", "#.#", ".#."),
+    "P": ("##.", "#.#", "##.", "#..", "#.."),
+    "Q": (".#.", "#.#", "#.#", "##.", ".##"),
+    "R": ("##.", "#.#", "##.", "#.#", "#.#"),
+    "S": (".##", "#..", ".#.", "..#", "##."),
+    "T": ("###", ".#.", ".#.", ".#.", ".#."),
+    "U": ("#.#", "#.#", "#.#", "#.#", "###"),
+    "V": ("#.#", "#.#", "#.#", "#.#", ".#."),
+    "W": ("#.#", "#.#", "###", "###", "#.#"),
+    "X": ("#.#", "#.#", ".#.", "#.#", "#.#"),
+    "Y": ("#.#", "#.#", ".#.", ".#.", ".#."),
+    "Z": ("###", "..#", ".#.", "#..", "###"),
+    "0": ("###", "#.#", "#.#", "#.#", "###"),
+    "1": (".#.", "##.", ".#.", ".#.", "###"),
+    "2": ("##.", "..#", ".#.", "#..", "###"),
+    "3": ("##.", "..#", ".#.", "..#", "##."),
+    "4": ("#.#", "#.#", "###", "..#", "..#"),
+    "5": ("###", "#..", "##.", "..#", "##."),
+    "6": (".##", "#..", "###", "#.#", "###"),
+    "7": ("###", "..#", ".#.", ".#.", ".#."),
+    "8": ("###", "#.#", "###", "#.#", "###"),
+    "9": ("###", "#.#", "###", "..#", "##."),
+    ".": ("...", "...", "...", "...", ".#."),
+    ",": ("...", "...", "...", ".#.", "#.."),
+    ":": ("...", ".#.", "...", ".#.", "..."),
+    "_": ("...", "...", "...", "...", "###"),
+    "-": ("...", "...", "###", "...", "..."),
+    "+": ("...", ".#.", "###", ".#.", "..."),
+    "=": ("...", "###", "...", "###", "..."),
+    "/": ("..#", "..#", ".#.", "#..", "#.."),
+    "(": (".#.", "#..", "#..", "#..", ".#."),
+    ")": (".#.", "..#", "..#", "..#", ".#."),
+    "!": (".#.", ".#.", ".#.", "...", ".#."),
+    "?": ("##.", "..#", ".#.", "...", ".#."),
+}
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BLUE = (0, 0, 255)
+
+
+class Raster:
+
+    """Store an RGB image and draw lines, rectangles and text on it.
+
+    Coordinates are in pixels with y upwards from the bottom of the image,
+    as on the OpenGL canvas. Anything outside the image is clipped.
+
+    Parameters
+    ----------
+    width: width of the image in pixels.
+    height: height of the image in pixels.
+
+    Public methods
+    --------------
+    set_pixel(self, x, y, colour): Sets one pixel.
+
+    fill_rect(self, x1, y1, x2, y2, colour): Fills a rectangle.
+
+    draw_line(self, x1, y1, x2, y2, colour): Draws a line.
+
+    draw_text(self, text, x, y, colour=BLACK): Draws text with its
+                                              baseline at y.
+
+    to_png(self): Returns the image as the bytes of a PNG file.
+    """
+
+    GLYPH_SCALE = 2
+    ADVANCE = 8  # pixels from one character to the next
+
+    def __init__(self, width, height):
+        """Make an image filled with white."""
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(WHITE * (width * height))
+
+    def set_pixel(self, x, y, colour):
+        """Set the pixel at (x, y) to colour, an (r, g, b) tuple."""
+        x = int(round(x))
+        y = int(round(y))
+        if 0 <= x < self.width and 0 <= y < self.height:
+            index = 3 * ((self.height - 1 - y) * self.width + x)
+            self.pixels[index:index + 3] = bytes(colour)
+
+    def fill_rect(self, x1, y1, x2, y2, colour):
+        """Fill the rectangle with corners (x1, y1) and (x2, y2)."""
+        x_low = max(0, int(round(min(x1, x2))))
+        x_high = min(self.width - 1, int(round(max(x1, x2))))
+        y_low = max(0, int(round(min(y1, y2))))
+        y_high = min(self.height - 1, int(round(max(y1, y2))))
+        if x_low > x_high:
+            return
+        row = bytes(colour) * (x_high - x_low + 1)
+        for y in range(y_low, y_high + 1):
+            index = 3 * ((self.height - 1 - y) * self.width + x_low)
+            self.pixels[index:index + len(row)] = row
+
+    def draw_line(self, x1, y1, x2, y2, colour):
+        """Draw a one pixel wide line from (x1, y1) to (x2, y2)."""
+        if round(x1) == round(x2) or round(y1) == round(y2):
+            self.fill_rect(x1, y1, x2, y2, colour)
+            return
+        steps = int(max(abs(x2 - x1), abs(y2 - y1))) + 1
+        for step in range(steps + 1):
+            self.set_pixel(x1 + (x2 - x1) * step / steps,
+                           y1 + (y2 - y1) * step / steps, colour)
+
+    def draw_text(self, text, x, y, colour=BLACK):
+        """Draw text starting at x, with its baseline at y.
+
+        Like gui.MyGLCanvas.render_text(), each new line is drawn 20 pixels
+        below the one before.
+        """
+        for line in text.split("\n"):
+            x_char = x
+            for character in line:
+                glyph = FONT.get(character.upper(), FONT["?"])
+                for row, bits in enumerate(glyph):
+                    for column, bit in enumerate(bits):
+                        if bit == "#":
+                            self.fill_rect(
+                                x_char + column * self.GLYPH_SCALE,
+                                y + (4 - row) * self.GLYPH_SCALE,
+                                x_char + (column + 1) * self.GLYPH_SCALE - 1,
+                                y + (5 - row) * self.GLYPH_SCALE - 1,
+                                colour)
+                x_char += self.ADVANCE
+            y -= 20
+
+    def to_png(self):
+        """Return the image as the bytes of a PNG file."""
+        def chunk(kind, data):
+            return (struct.pack(">I", len(data)) + kind + data +
+                    struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff))
+
+        row_bytes = 3 * self.width
+        # Each row starts with filter type 0, i.e. no filtering
+        raw = b"".join(b"\x00" + self.pixels[y * row_bytes:
+                                              (y + 1) * row_bytes]
+                       for y in range(self.height))
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 2,
+                             0, 0, 0)
+        return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) +
+                chunk(b"IDAT", zlib.compress(raw, 6)) +
+                chunk(b"IEND", b""))
+
+
+def render_traces(devices, monitors, max_width=1600):
+    """Draw the traces of every monitor into a Raster and return it.
+
+    The layout is that of gui.MyGLCanvas.draw_all_signals(), with the
+    monitors sorted by name. Cycles are 20 pixels wide unless that would
+    make the image wider than max_width, in which case they are narrowed
+    and drawn from a coarser level of detail, with fast changes filled in.
+    """
+    x_start = 30
+    y_sig_sep = 75
+    y_high_low_diff = 25
+    y_first = 90  # pixels from the top to the LOW level of the first row
+
+    mon_dict = monitors.monitors_dictionary
+    layout = sorted(mon_dict, key=lambda key: devices.get_signal_name(*key))
+    max_sig_len = max([len(x) for x in mon_dict.values()], default=0)
+    # The time axis is rounded up to a whole number of ticks, so widen the
+    # tick spacing until the cycles narrowed to fit that axis still leave
+    # the ticks 40 pixels apart. tick_sep only grows, so this stops.
+    tick_sep = get_tick_spacing(20, 40)
+    while True:
+        arrow_len = ((max_sig_len + tick_sep - 1) // tick_sep) * tick_sep
+        x_step = 20
+        if arrow_len:
+            # Leave room for the end of the time axis and its label
+            x_step = min(x_step, (max_width - x_start - 110) / arrow_len)
+        wider_tick_sep = get_tick_spacing(x_step, 40)
+        if wider_tick_sep <= tick_sep or tick_sep >= max_sig_len:
+            break
+        tick_sep = wider_tick_sep
+    width = int(x_start + arrow_len * x_step + 100)
+    height = y_first + y_sig_sep * max(0, len(layout) - 1) + 50
+    raster = Raster(width, height)
+
+    for row, key in enumerate(layout):
+        y_low = height - y_first - row * y_sig_sep
+        y_high = y_low + y_high_low_diff
+        raster.draw_text("hi", x_start - 20, y_high - 3)
+        raster.draw_text("lo", x_start - 20, y_low - 3)
+        raster.draw_text(devices.get_signal_name(*key), x_start, y_low - 18)
+
+        waveform = Waveform(devices)
+        waveform.update(mon_dict[key])
+        if not waveform.blocks:
+            continue
+        level = waveform.get_level(1 / x_step)
+
+        def to_pixels(x, y):
+            return [x_start + x * x_step, y_low + y * y_high_low_diff]
+
+        [lines, bands] = waveform.get_vertices(level)
+        for i in range(0, len(lines), 4):
+            [x1, y1, x2, y2] = lines[i:i + 4]
+            if (x1, y1) != (x2, y2):
+                raster.draw_line(*(to_pixels(x1, y1) + to_pixels(x2, y2)),
+                                 colour=BLUE)
+        band_floats = 2 * waveform.BAND_VERTICES
+        for i in range(0, len(bands), band_floats):
+            xs = bands[i:i + band_floats:2]
+            ys = bands[i + 1:i + band_floats:2]
+            if min(xs) != max(xs):
+                raster.fill_rect(*(to_pixels(min(xs), min(ys)) +
+                                   to_pixels(max(xs), max(ys))),
+                                 colour=BLUE)
+
+    # Draw the time axis above the first signal
+    if max_sig_len:
+        axis_y = height - y_first + 50
+        arrow_end = x_start - 5 + arrow_len * x_step + 20
+        raster.draw_line(x_start - 5, axis_y, arrow_end, axis_y, BLACK)
+        raster.draw_line(arrow_end - 5, axis_y + 3, arrow_end, axis_y, BLACK)
+        raster.draw_line(arrow_end - 5, axis_y - 3, arrow_end, axis_y, BLACK)
+        for i in range(0, arrow_len + 1, tick_sep):
+            tick_x = x_start + i * x_step
+            raster.draw_line(tick_x, axis_y - 3, tick_x, axis_y + 3, BLACK)
+            raster.draw_text(str(i), tick_x - 4 * len(str(i)), axis_y + 5)
+        raster.draw_text("t / cycle", arrow_end + 10, axis_y - 3)
+    return raster
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""Serve simulations of loaded circuits over a local JSON-RPC socket.
+
+Used in the Logic Simulator project to run many short simulations without
+paying for interpreter startup and parsing each time. Circuits stay loaded
+in the server between requests. Each request and response is one line of
+JSON-RPC 2.0 on a Unix socket or a localhost TCP port, and clients are
+served concurrently with asyncio. Parsing and simulation run in a process
+pool, so one long run does not hold up the other clients.
+
+Methods
+-------
+load(path): Parses a definition file and returns {'circuit': id}.
+unload(circuit): Forgets a loaded circuit.
+set_switch(circuit, switch, level): Sets a switch to 0 or 1.
+add_monitor(circuit, signal): Monitors a signal, e.g. "dtype1.Q".
+remove_monitor(circuit, signal): Removes the monitor of a signal.
+run(circuit, cycles, seed=None): Runs from a cold start, like the 'r'
+                                 command, and returns {'cycles', 'seed'}.
+continue(circuit, cycles): Continues the simulation, like the 'c' command.
+get_traces(circuit): Returns {signal name: [signal levels]}.
+
+Usage
+-----
+python3 server.py [-u <socket path> | -p <port>] [-j <jobs>]
+
+Classes
+-------
+SimulationServer - keeps circuits loaded and answers JSON-RPC requests.
+RequestError - reports a failed request as a JSON-RPC error.
+
+Functions
+---------
+load_circuit - parses a definition file.
+simulate - runs a parsed circuit for a number of cycles.
+remove_stale_socket - removes a Unix socket file nobody is listening on.
+"""
+import asyncio
+import concurrent.futures
+import contextlib
+import getopt
+import inspect
+import json
+import os
+import random
+import socket
+import stat
+import sys
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from scanner import Scanner
+from parse import Parser
+
+
+def load_circuit(path):
+    """Parse the definition file at path.
+
+    Return [success, diagnostics, network, monitors], where diagnostics is
+    as for parse.Parser.diagnostics. Raise IOError if the file cannot be
+    opened, as Scanner would exit the process.
+    """
+    open(path, mode='rt').close()
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    scanner = Scanner(path, names)
+    parser = Parser(names, devices, network, monitors, scanner,
+                    collect_errors=True)
+    [success, diagnostics] = parser.parse_network()
+    return [success, diagnostics, network, monitors]
+
+
+def simulate(network, monitors, cycles, seed=None):
+    """Run the network for the specified number of cycles.
+
+    If seed is given, start from the cold start given by seed with empty
+    traces, otherwise continue from the current state. Return [network,
+    monitors] after the run, or None if the network does not settle.
+    Runs in a worker process, so changes are only kept by the caller
+    using the returned objects.
+    """
+    if seed is not None:
+        monitors.reset_monitors()
+        network.devices.cold_startup(seed)
+        if network.timed:
+            network.reset_timed()
+    for cycle in range(cycles):
+        if not network.execute_network():
+            return None
+        monitors.record_signals()
+    return [network, monitors]
+
+
+def remove_stale_socket(path):
+    """Remove the Unix socket file at path if nobody is listening on it.
+
+    Such files are left behind when a server stops without cleaning up,
+    e.g. after a crash, and would stop a new server binding to path. Other
+    files are left alone.
+    """
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    with socket.socket(socket.AF_UNIX) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.remove(path)
+
+
+class RequestError(Exception):
+
+    """Report a failed request as a JSON-RPC error."""
+
+    def __init__(self, code, message, data=None):
+        """Store the JSON-RPC error code, message and optional data."""
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class SimulationServer:
+
+    """Keep circuits loaded and answer JSON-RPC requests about them.
+
+    Each loaded circuit has a lock, so requests for one circuit are handled
+    one at a time, in order, while requests for different circuits run
+    concurrently in the process pool.
+
+    Parameters
+    ----------
+    max_workers: number of worker processes; defaults to the number of
+                 processors.
+
+    Public methods
+    --------------
+    handle_request(self, request): Returns the JSON-RPC response to a
+                                   request dictionary, or None for a
+                                   notification.
+
+    handle_client(self, reader, writer): Answers each line sent by a client
+                                         until it disconnects.
+
+    serve(self, path=None, port=None): Listens on the Unix socket at path,
+                                       or on the localhost TCP port, until
+                                       cancelled. Port 0 picks a free port,
+                                       which is stored in self.ports.
+
+    close(self): Shuts down the process pool.
+    """
+
+    # JSON-RPC 2.0 error codes
+    PARSE_ERROR = -32700
+    INVALID_REQUEST = -32600
+    METHOD_NOT_FOUND = -32601
+    INVALID_PARAMS = -32602
+    INTERNAL_ERROR = -32603
+    SIMULATION_ERROR = -32000
+
+    def __init__(self, max_workers=None):
+        """Initialise the process pool and the table of loaded circuits."""
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+        self.circuits = {}  # circuit ID: dictionary of circuit state
+        self.next_circuit_id = 1
+        self.ports = []  # TCP ports listened on, e.g. when port is 0
+        self.methods = {
+            'load': self.load, 'unload': self.unload,
+            'set_switch': self.set_switch,
+            'add_monitor': self.add_monitor,
+            'remove_monitor': self.remove_monitor,
+            'run': self.run, 'continue': self.continue_run,
+            'get_traces': self.get_traces,
+        }
+
+    async def handle_request(self, request):
+        """Return the JSON-RPC response to the request dictionary.
+
+        Return None if the request is a notification, i.e. has no ID, even
+        if it fails, as JSON-RPC 2.0 never answers notifications.
+        """
+        request_id = None
+        notification = isinstance(request, dict) and 'id' not in request \
+            and isinstance(request.get('method'), str)
+        try:
+            if not isinstance(request, dict) or \
+                    request.get('jsonrpc') != "2.0" or \
+                    not isinstance(request.get('method'), str):
+                raise RequestError(self.INVALID_REQUEST, "Invalid request")
+            request_id = request.get('id')
+            method = self.methods.get(request['method'])
+            if method is None:
+                raise RequestError(self.METHOD_NOT_FOUND,
+                                   "Method not found")
+            params = request.get('params', {})
+            args = params if isinstance(params, list) else []
+            kwargs = params if isinstance(params, dict) else {}
+            try:
+                inspect.signature(method).bind(*args, **kwargs)
+            except TypeError:
+                params = None
+            if not isinstance(params, (list, dict)):
+                raise RequestError(self.INVALID_PARAMS, "Invalid params")
+            result = await method(*args, **kwargs)
+        except RequestError as error:
+            response = {'code': error.code, 'message': error.message}
+            if error.data is not None:
+                response['data'] = error.data
+            return None if notification else \
+                {'jsonrpc': "2.0", 'id': request_id, 'error': response}
+        except Exception as error:
+            # e.g. a worker process died, so report it and keep serving
+            return None if notification else \
+                {'jsonrpc': "2.0", 'id': request_id,
+                 'error': {'code': self.INTERNAL_ERROR,
+                           'message': "Internal error: %s" % error}}
+        if notification:
+            return None
+        return {'jsonrpc': "2.0", 'id': request_id, 'result': result}
+
+    async def handle_client(self, reader, writer):
+        """Answer each line sent by a client until it disconnects."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {'jsonrpc': "2.0", 'id': None,
+                                'error': {'code': self.PARSE_ERROR,
+                                          'message': "Parse error"}}
+                else:
+                    response = await self.handle_request(request)
+                if response is not None:
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path=None, port=None):
+        """Listen on the Unix socket at path, or the localhost TCP port.
+
+        Serve clients until cancelled. A socket file left at path by a
+        server which is no longer running is removed first.
+        """
+        if path is not None:
+            remove_stale_socket(path)
+            server = await asyncio.start_unix_server(self.handle_client,
+                                                     path)
+        else:
+            server = await asyncio.start_server(self.handle_client,
+                                                "127.0.0.1", port)
+            self.ports = [x.getsockname()[1] for x in server.sockets]
+            print("Listening on port", self.ports[0])
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        """Shut down the process pool."""
+        self.executor.shutdown()
+
+    async def call_worker(self, function, *args):
+        """Run function(*args) in the process pool and return its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    @contextlib.asynccontextmanager
+    async def lock_circuit(self, circuit_id):
+        """Hold the lock of the loaded circuit and yield its state.
+
+        The circuit is looked up again once the lock is held, since it may
+        have been unloaded while waiting for the lock.
+        """
+        circuit_state = self.get_circuit(circuit_id)
+        async with circuit_state['lock']:
+            if self.circuits.get(circuit_id) is not circuit_state:
+                raise RequestError(self.INVALID_PARAMS, "Unknown circuit")
+            yield circuit_state
+
+    def get_circuit(self, circuit_id):
+        """Return the state of the loaded circuit with circuit_id."""
+        circuit = None
+        if isinstance(circuit_id, int):
+            circuit = self.circuits.get(circuit_id)
+        if circuit is None:
+            raise RequestError(self.INVALID_PARAMS, "Unknown circuit")
+        return circuit
+
+    def get_signal(self, circuit, signal_name):
+        """Return [device_id, port_id] of the named signal in circuit."""
+        if not isinstance(signal_name, str):
+            raise RequestError(self.INVALID_PARAMS, "Invalid signal name")
+        names = circuit['network'].devices.names
+        name_strings = signal_name.split(".")
+        if len(name_strings) > 2 or \
+                None in [names.query(x) for x in name_strings]:
+            raise RequestError(self.INVALID_PARAMS, "Unknown signal")
+        device_id = names.query(name_strings[0])
+        port_id = names.query(name_strings[1]) \
+            if len(name_strings) == 2 else None
+        return [device_id, port_id]
+
+    def check_cycles(self, cycles):
+        """Raise a RequestError unless cycles is a positive integer."""
+        if not isinstance(cycles, int) or isinstance(cycles, bool) or \
+                cycles < 1:
+            raise RequestError(self.INVALID_PARAMS,
+                               "Cycles must be a positive integer")
+
+    async def load(self, path):
+        """Parse the definition file at path and keep the circuit loaded."""
+        if not isinstance(path, str):
+            raise RequestError(self.INVALID_PARAMS, "Invalid path")
+        try:
+            [success, diagnostics, network, monitors] = \
+                await self.call_worker(load_circuit, path)
+        except IOError:
+            raise RequestError(self.SIMULATION_ERROR,
+                               "Failed to open file")
+        if not success:
+            raise RequestError(self.SIMULATION_ERROR,
+                               "Definition file has errors", diagnostics)
+        circuit_id = self.next_circuit_id
+        self.next_circuit_id += 1
+        self.circuits[circuit_id] = {
+            'network': network, 'monitors': monitors, 'cycles': 0,
+            'seed': None, 'lock': asyncio.Lock()}
+        return {'circuit': circuit_id}
+
+    async def unload(self, circuit):
+        """Forget the loaded circuit."""
+        async with self.lock_circuit(circuit):
+            del self.circuits[circuit]
+        return True
+
+    async def set_switch(self, circuit, switch, level):
+        """Set the named switch in circuit to level, 0 or 1."""
+        async with self.lock_circuit(circuit) as circuit_state:
+            [switch_id, port_id] = self.get_signal(circuit_state, switch)
+            devices = circuit_state['network'].devices
+            if level not in [0, 1] or port_id is not None or \
+                    not devices.set_switch(switch_id, level):
+                raise RequestError(self.INVALID_PARAMS, "Invalid switch")
+        return True
+
+    async def add_monitor(self, circuit, signal):
+        """Monitor the named signal in circuit."""
+        async with self.lock_circuit(circuit) as circuit_state:
+            [device_id, port_id] = self.get_signal(circuit_state, signal)
+            monitors = circuit_state['monitors']
+            if monitors.make_monitor(device_id, port_id,
+                                     circuit_state['cycles']) != \
+                    monitors.NO_ERROR:
+                raise RequestError(self.INVALID_PARAMS,
+                                   "Could not make monitor")
+        return True
+
+    async def remove_monitor(self, circuit, signal):
+        """Remove the monitor of the named signal in circuit."""
+        async with self.lock_circuit(circuit) as circuit_state:
+            [device_id, port_id] = self.get_signal(circuit_state, signal)
+            if not circuit_state['monitors'].remove_monitor(device_id,
+                                                            port_id):
+                raise RequestError(self.INVALID_PARAMS,
+                                   "Could not zap monitor")
+        return True
+
+    async def run(self, circuit, cycles, seed=None):
+        """Run circuit for cycles from a cold start given by seed.
+
+        A random seed is picked if none is given. Return the cycles
+        completed and the seed, so that the run can be repeated.
+        """
+        self.check_cycles(cycles)
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        elif not isinstance(seed, int):
+            raise RequestError(self.INVALID_PARAMS,
+                               "Seed must be an integer")
+        async with self.lock_circuit(circuit) as circuit_state:
+            circuit_state['cycles'] = 0
+            circuit_state['seed'] = seed
+            return await self.run_cycles(circuit_state, cycles, seed)
+
+    async def continue_run(self, circuit, cycles):
+        """Continue running circuit for cycles."""
+        self.check_cycles(cycles)
+        async with self.lock_circuit(circuit) as circuit_state:
+            if circuit_state['cycles'] == 0:
+                raise RequestError(self.SIMULATION_ERROR,
+                                   "Nothing to continue. Run first.")
+            return await self.run_cycles(circuit_state, cycles)
+
+    async def run_cycles(self, circuit_state, cycles, seed=None):
+        """Simulate the circuit in the process pool and keep the result."""
+        result = await self.call_worker(
+            simulate, circuit_state['network'], circuit_state['monitors'],
+            cycles, seed)
+        if result is None:
+            raise RequestError(self.SIMULATION_ERROR, "Network oscillating")
+        [circuit_state['network'], circuit_state['monitors']] = result
+        circuit_state['cycles'] += cycles
+        return {'cycles': circuit_state['cycles'],
+                'seed': circuit_state['seed']}
+
+    async def get_traces(self, circuit):
+        """Return {signal name: [signal levels]} for every monitor."""
+        async with self.lock_circuit(circuit) as circuit_state:
+            devices = circuit_state['network'].devices
+            return {devices.get_signal_name(*key): list(signal_list)
+                    for key, signal_list in
+                    circuit_state['monitors'].monitors_dictionary.items()}
+
+
+def main(arg_list):
+    """Run the server with the options given in arg_list."""
+    usage_message = ("Usage: server.py [-u <socket path> | -p <port>] "
+                     "[-j <jobs>]\n"
+                     "The server listens on localhost port 8765 by default.")
+    try:
+        options, arguments = getopt.getopt(arg_list, "u:p:j:")
+        option_dict = dict(options)
+        port = int(option_dict.get("-p", 8765))
+        max_workers = int(option_dict.get("-j", os.cpu_count() or 1))
+    except (getopt.GetoptError, ValueError):
+        arguments = [None]
+        max_workers = 0
+    if arguments or max_workers < 1 or \
+            ("-u" in option_dict and "-p" in option_dict):
+        print("Error: invalid command line arguments\n")
+        print(usage_message)
+        sys.exit()
+
+    server = SimulationServer(max_workers)
+    try:
+        asyncio.run(server.serve(option_dict.get("-u"), port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+"""Sort and search signal names for the graphical user interface.
+
+Used in the Logic Simulator project so that the switch and monitor panels
+stay fast for designs with thousands of signals: names are sorted once in
+natural order, and a prefix index finds the names matching a search
+without looking at every name.
+
+Classes
+-------
+SignalIndex - stores signal names in natural order with a prefix index.
+
+Functions
+---------
+natural_key - returns the key sorting a name in natural order.
+"""
+import bisect
+import functools
+import re
+
+
+@functools.lru_cache(maxsize=None)
+def natural_key(name):
+    """Return the key which sorts name in natural order.
+
+    Runs of digits compare as numbers, so that e.g. "a2" sorts before
+    "a10", and letters compare without regard to case. Keys are cached, as
+    the same names are sorted whenever the panels are built.
+    """
+    return tuple((0, int(part), part) if part.isdigit()
+                 else (1, part.lower(), part)
+                 for part in re.split(r"(\d+)", name) if part)
+
+
+class SignalIndex:
+
+    """Store signal names in natural order with a prefix index.
+
+    Parameters
+    ----------
+    names_list: list of signal name strings.
+
+    Public methods
+    --------------
+    search(self, text): Returns the positions in self.names of the names
+                        starting with text.
+    """
+
+    def __init__(self, names_list):
+        """Sort the names and build the prefix index."""
+        self.names = sorted(names_list, key=natural_key)
+        # (lower case name, position in self.names), sorted, so that the
+        # names with a given prefix are next to each other
+        self.prefix_index = sorted((name.lower(), position)
+                                   for position, name in enumerate(self.names))
+
+    def search(self, text):
+        """Return the positions in self.names of the names starting with text.
+
+        The search ignores case, and the positions are in natural order.
+        All the positions are returned if text is empty.
+        """
+        text = text.lower()
+        if not text:
+            return list(range(len(self.names)))
+        first = bisect.bisect_left(self.prefix_index, (text,))
+        positions = []
+        for name, position in self.prefix_index[first:]:
+            if not name.startswith(text):
+                break
+            positions.append(position)
+        return sorted(positions)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Measure how long the Logic Simulator command line mode takes to start.
+
+Used in the Logic Simulator project to find and guard against slow startup,
+e.g. on build servers running many short simulations. Startup is split into
+phases: importing logsim, initialising the four inner simulator classes,
+scanning and parsing the definition file, and the cold startup. Imports are
+only timed properly in a fresh interpreter, so measure_startup() times each
+run in a new process.
+
+Usage
+-----
+python3 startup.py [-n <runs>] <file path>
+
+Functions
+---------
+time_phases - times each startup phase in this process.
+measure_startup - times each startup phase in fresh interpreters.
+"""
+import getopt
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Phases in the order they run
+PHASES = ["import", "initialise", "parse", "cold_startup"]
+
+# Modules which the command line mode must not import
+GUI_MODULES = ["wx", "gui", "OpenGL"]
+
+
+def time_phases(path):
+    """Time each startup phase of the command line mode in this process.
+
+    Return a dictionary with the seconds taken by each phase in PHASES,
+    their 'total', whether the file 'parsed' and the sorted list of
+    'modules' imported on the way. Modules already imported, e.g. in an
+    earlier call, are not imported or timed again.
+    """
+    modules_before = set(sys.modules)
+    times = [time.perf_counter()]
+
+    import logsim
+    times.append(time.perf_counter())
+
+    names = logsim.Names()
+    devices = logsim.Devices(names)
+    network = logsim.Network(names, devices)
+    monitors = logsim.Monitors(names, devices, network)
+    times.append(time.perf_counter())
+
+    scanner = logsim.Scanner(path, names)
+    parser = logsim.Parser(names, devices, network, monitors, scanner)
+    parsed = parser.parse_network()
+    times.append(time.perf_counter())
+
+    if parsed:
+        devices.cold_startup()
+    times.append(time.perf_counter())
+
+    report = {phase: times[i + 1] - times[i]
+              for i, phase in enumerate(PHASES)}
+    report['total'] = times[-1] - times[0]
+    report['parsed'] = parsed
+    report['modules'] = sorted(set(sys.modules) - modules_before)
+    return report
+
+
+def measure_startup(path, runs=5):
+    """Time each startup phase in runs fresh interpreters.
+
+    Return a dictionary with keys 'runs', 'parsed', 'modules' (see
+    time_phases()) and, for each phase in PHASES and the 'total', the
+    smallest time taken, which is the least affected by other processes.
+    """
+    code = ("import json, sys, startup; "
+            "print(json.dumps(startup.time_phases(sys.argv[1])))")
+    directory = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for run in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code, os.path.abspath(path)],
+            cwd=directory, stdout=subprocess.PIPE, check=True,
+            universal_newlines=True).stdout
+        # Parser error messages come before the result
+        results.append(json.loads(output.splitlines()[-1]))
+
+    report = {'runs': runs}
+    for phase in PHASES + ['total']:
+        report[phase] = min(result[phase] for result in results)
+    report['parsed'] = all(result['parsed'] for result in results)
+    report['modules'] = results[0]['modules']
+    return report
+
+
+def main(arg_list):
+    """Print the startup times for the file given in arg_list as JSON."""
+    usage_message = "Usage: startup.py [-n <runs>] <file path>"
+    try:
+        options, arguments = getopt.getopt(arg_list, "n:")
+        runs = int(dict(options).get("-n", 5))
+    except (getopt.GetoptError, ValueError):
+        arguments = []
+        runs = 0
+    if len(arguments) != 1 or runs < 1:
+        print("Error: one file path and a positive number of runs "
+              "required\n")
+        print(usage_message)
+        sys.exit()
+    report = measure_startup(arguments[0], runs)
+    del report['modules']
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,199 @@
+"""Sweep device qualifiers over a grid of values in parallel.
+
+Used in the Logic Simulator project to see how a circuit behaves for a range
+of clock half periods, RC highcounts or switch states. The definition file
+is parsed once; each worker process keeps a copy of the parsed network and
+only changes the swept qualifiers for each point (see
+devices.Devices.set_qualifier()).
+
+Functions
+---------
+parse_sweep - reads a sweep specification such as "ck=2,4,8;rc=1,3".
+get_points - returns every point of the grid given by the sweep axes.
+get_metrics - summarises monitor traces.
+run_point - simulates one point of the grid.
+sweep - simulates every point of the grid in a process pool.
+format_table - returns a sweep report as a text table.
+"""
+import concurrent.futures
+import copy
+import itertools
+import os
+import time
+
+# Network and monitors of the parsed definition file in this process, set
+# by _set_base()
+_base = None
+
+
+def parse_sweep(spec):
+    """Return the sweep axes given by spec as [[device_name, [values]]].
+
+    Axes are separated by ';' and each one is a device name, '=' and a
+    comma-separated list of integers, or a range such as 2:8 or 2:8:2 (the
+    end included). Raise ValueError if spec is badly formed.
+    """
+    axes = []
+    for axis in spec.split(";"):
+        if not axis.strip():
+            continue
+        if "=" not in axis:
+            raise ValueError("sweep axis needs '=': %s" % axis.strip())
+        [name, values_string] = axis.split("=", 1)
+        values = []
+        for item in values_string.split(","):
+            numbers = [int(x) for x in item.split(":")]
+            if len(numbers) == 1:
+                values.extend(numbers)
+            elif len(numbers) in [2, 3]:
+                step = numbers[2] if len(numbers) == 3 else 1
+                if step < 1:
+                    raise ValueError("sweep step must be positive")
+                values.extend(range(numbers[0], numbers[1] + 1, step))
+            else:
+                raise ValueError("bad sweep range: %s" % item)
+        if not values:
+            raise ValueError("sweep axis has no values: %s" % axis.strip())
+        axes.append([name.strip(), values])
+    if not axes:
+        raise ValueError("empty sweep")
+    return axes
+
+
+def get_points(axes):
+    """Return a list of {device_name: value} for every point of the grid."""
+    names_list = [name for name, values in axes]
+    return [dict(zip(names_list, values)) for values in
+            itertools.product(*[values for name, values in axes])]
+
+
+def get_metrics(devices, traces):
+    """Return summary metrics for traces {(device_id, output_id): [signals]}.
+
+    The result maps each signal name to a dictionary with keys
+    'first_high' (the first cycle the signal is HIGH, or None),
+    'high_cycles' (the number of cycles it is HIGH) and 'toggles' (the
+    number of changes of level). RISING counts as HIGH and FALLING as LOW.
+    """
+    levels = {devices.LOW: devices.LOW, devices.HIGH: devices.HIGH,
+              devices.RISING: devices.HIGH, devices.FALLING: devices.LOW}
+    metrics = {}
+    for (device_id, output_id), trace in traces.items():
+        trace = [levels.get(signal) for signal in trace]
+        high_cycles = [cycle for cycle, level in enumerate(trace)
+                       if level == devices.HIGH]
+        metrics[devices.get_signal_name(device_id, output_id)] = {
+            'first_high': high_cycles[0] if high_cycles else None,
+            'high_cycles': len(high_cycles),
+            'toggles': len([cycle for cycle in range(1, len(trace))
+                            if trace[cycle] != trace[cycle - 1]]),
+        }
+    return metrics
+
+
+def _set_base(network, monitors):
+    """Keep the parsed network and monitors for run_point()."""
+    global _base
+    _base = [network, monitors]
+
+
+def run_point(point, cycles, seed=0):
+    """Simulate the point {device_name: value} of the grid.
+
+    Uses the network kept by _set_base(), which is not changed. Every point
+    starts from the cold start given by seed. Return a dictionary with keys
+    'point', 'settled' and 'monitors' (see get_metrics()).
+    """
+    [network, monitors] = copy.deepcopy(_base)
+    devices = network.devices
+    for name, value in point.items():
+        device_id = devices.names.query(name)
+        devices.set_qualifier(device_id, value)
+    devices.reset_devices()
+    devices.cold_startup(seed)
+    if network.timed:
+        network.reset_timed()
+    settled = True
+    for cycle in range(cycles):
+        if not network.execute_network():
+            settled = False
+            break
+        monitors.record_signals()
+    return {'point': point, 'settled': settled,
+            'monitors': get_metrics(devices, monitors.monitors_dictionary)}
+
+
+def sweep(network, monitors, axes, cycles, seed=0, max_workers=None):
+    """Simulate every point of the grid given by axes (see parse_sweep()).
+
+    Points are shared out over a process pool; max_workers defaults to the
+    number of processors. Raise ValueError if an axis does not name a
+    clock, RC or switch, or a value is not a valid qualifier for it. Return
+    a report dictionary with keys 'axes', 'cycles', 'seed', 'seconds' and
+    'points', a list of run_point() results in grid order.
+    """
+    start_time = time.perf_counter()
+    devices = copy.deepcopy(network.devices)
+    for name, values in axes:
+        device_id = devices.names.query(name)
+        for value in values:
+            error_type = devices.set_qualifier(device_id, value)
+            if error_type == devices.BAD_DEVICE:
+                raise ValueError("%s is not a clock, RC or switch" % name)
+            elif error_type != devices.NO_ERROR:
+                raise ValueError("invalid value %d for %s" % (value, name))
+    points = get_points(axes)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers == 1 or len(points) <= 1:
+        _set_base(network, monitors)
+        results = [run_point(point, cycles, seed) for point in points]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers, initializer=_set_base,
+                initargs=(network, monitors)) as executor:
+            futures = [executor.submit(run_point, point, cycles, seed)
+                       for point in points]
+            results = [future.result() for future in futures]
+
+    return {
+        'axes': axes,
+        'cycles': cycles,
+        'seed': seed,
+        'seconds': time.perf_counter() - start_time,
+        'points': results,
+    }
+
+
+def format_table(report):
+    """Return the sweep report as a text table, one row per point.
+
+    There is a column for each swept device, then the first HIGH cycle,
+    HIGH cycle count and toggle count of each monitor. '-' marks a signal
+    that is never HIGH, and '!' a point whose network did not settle.
+    """
+    axis_names = [name for name, values in report['axes']]
+    monitor_names = []
+    if report['points']:
+        monitor_names = sorted(report['points'][0]['monitors'])
+    header = list(axis_names)
+    for monitor_name in monitor_names:
+        header += [monitor_name + ":first", monitor_name + ":high",
+                   monitor_name + ":toggles"]
+    rows = [header]
+    for result in report['points']:
+        row = [str(result['point'][name]) for name in axis_names]
+        for monitor_name in monitor_names:
+            metrics = result['monitors'][monitor_name]
+            first_high = metrics['first_high']
+            row += ["-" if first_high is None else str(first_high),
+                    str(metrics['high_cycles']), str(metrics['toggles'])]
+        if not result['settled']:
+            row[-1] += "!"
+        rows.append(row)
+    widths = [max(len(row[column]) for row in rows)
+              for column in range(len(header))]
+    return "\n".join("  ".join(item.rjust(width)
+                               for item, width in zip(row, widths))
+                     for row in rows)
@@ -155,3 +155,66 @@ def test_set_switch(new_devices):
     # Set switch Sw1 to LOW
     new_devices.set_switch(SW1_ID, new_devices.LOW)
     assert switch_object.switch_state == new_devices.LOW
+
+
+def test_set_delay(new_devices):
+    """Test if set_delay stores positive propagation delays."""
+    names = new_devices.names
+    [AND1, AND2] = names.lookup(["And1", "And2"])
+    new_devices.make_device(AND1, new_devices.AND, 2)
+
+    assert new_devices.get_device(AND1).delay is None
+    assert new_devices.set_delay(AND1, 3) == new_devices.NO_ERROR
+    assert new_devices.get_device(AND1).delay == 3
+    assert new_devices.set_delay(AND1, 0) == new_devices.INVALID_QUALIFIER
+    assert new_devices.set_delay(AND2, 1) == new_devices.BAD_DEVICE
+
+
+def test_cold_startup_seed(new_devices):
+    """Test if a seeded cold start can be repeated exactly."""
+    names = new_devices.names
+    d_type_ids = names.lookup(["D%d" % i for i in range(8)])
+    clock_ids = names.lookup(["Clk%d" % i for i in range(8)])
+    for device_id in d_type_ids:
+        new_devices.make_device(device_id, new_devices.D_TYPE)
+    for device_id in clock_ids:
+        new_devices.make_device(device_id, new_devices.CLOCK, 10)
+
+    def get_state():
+        return ([new_devices.get_device(device_id).dtype_memory
+                 for device_id in d_type_ids] +
+                [(new_devices.get_device(device_id).outputs[None],
+                  new_devices.get_device(device_id).clock_counter)
+                 for device_id in clock_ids])
+
+    new_devices.cold_startup(7)
+    state = get_state()
+    assert new_devices.seed == 7
+    new_devices.cold_startup()
+    assert get_state() == state
+    new_devices.cold_startup(8)
+    assert get_state() != state
+
+
+def test_set_qualifier(new_devices):
+    """Test if set_qualifier changes clocks, RCs and switches in place."""
+    names = new_devices.names
+    [CLK, RC, SW, AND1, MISSING] = names.lookup(["Clk", "Rc", "Sw", "And1",
+                                                 "Missing"])
+    new_devices.make_device(CLK, new_devices.CLOCK, 5)
+    new_devices.make_device(RC, new_devices.RC, 2)
+    new_devices.make_device(SW, new_devices.SWITCH, 0)
+    new_devices.make_device(AND1, new_devices.AND, 2)
+
+    assert new_devices.set_qualifier(CLK, 2) == new_devices.NO_ERROR
+    assert new_devices.get_device(CLK).clock_half_period == 2
+    assert new_devices.get_device(CLK).clock_counter < 2
+    assert new_devices.set_qualifier(RC, 7) == new_devices.NO_ERROR
+    assert new_devices.get_device(RC).highcount == 7
+    assert new_devices.set_qualifier(SW, 1) == new_devices.NO_ERROR
+    assert new_devices.get_device(SW).switch_state == new_devices.HIGH
+
+    assert new_devices.set_qualifier(CLK, 0) == new_devices.INVALID_QUALIFIER
+    assert new_devices.set_qualifier(SW, 2) == new_devices.INVALID_QUALIFIER
+    assert new_devices.set_qualifier(AND1, 3) == new_devices.BAD_DEVICE
+    assert new_devices.set_qualifier(MISSING, 1) == new_devices.BAD_DEVICE
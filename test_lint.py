@@ -0,0 +1,42 @@
+"""Test the lint module."""
+import pytest
+
+from lint import find_circuit_files, lint_file, lint_files
+
+
+def test_find_circuit_files():
+    """Test that directories are expanded into sorted definition files."""
+    file_list = find_circuit_files(["examples",
+                                    "bad_examples/bad_device.circuit"])
+    assert file_list[:4] == ["examples/1001seqdetect.circuit",
+                             "examples/8to1mux.circuit",
+                             "examples/fulladder.circuit",
+                             "examples/ripplecounter.circuit"]
+    assert file_list[-1] == "bad_examples/bad_device.circuit"
+
+
+@pytest.mark.parametrize("path, ok, error_name", [
+    ("examples/fulladder.circuit", True, None),
+    ("bad_examples/device_present.circuit", False, "DEVICE_PRESENT"),
+    ("bad_examples/no_such_file.circuit", False, None),
+])
+def test_lint_file(path, ok, error_name, capsys):
+    """Test that one file is checked without printing or exiting."""
+    result = lint_file(path)
+    assert result['path'] == path
+    assert result['ok'] == ok
+    assert result['seconds'] >= 0
+    if not ok:
+        assert result['diagnostics'][0]['name'] == error_name
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_lint_files(max_workers):
+    """Test that a report covers every file, in order."""
+    report = lint_files(["examples", "bad_examples"], max_workers)
+    paths = [result['path'] for result in report['files']]
+    assert paths == find_circuit_files(["examples", "bad_examples"])
+    assert report['total_files'] == len(paths)
+    # every example is valid, and every bad example has an error
+    assert report['failed_files'] == len(find_circuit_files(["bad_examples"]))
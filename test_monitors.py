@@ -1,4 +1,6 @@
 """Test the monitors module."""
+import io
+
 import pytest
 
 from names import Names
@@ -197,3 +199,95 @@ def test_display_signals(capsys, new_monitors):
             "Clock1: -__--__--__--__--__-" in traces)
 
     assert "" in traces  # additional empty line at the end
+
+
+def test_monitors_update_cone(new_monitors):
+    """Test that adding or removing monitors recomputes a pruned cone."""
+    names = new_monitors.names
+    network = new_monitors.network
+    [SW1_ID, SW2_ID, OR1_ID] = names.lookup(["Sw1", "Sw2", "Or1"])
+
+    new_monitors.remove_monitor(OR1_ID, None)
+    network.enable_pruning(new_monitors.monitors_dictionary)
+    assert network.cone == {SW1_ID, SW2_ID}
+
+    new_monitors.remove_monitor(SW2_ID, None)
+    assert network.cone == {SW1_ID}
+
+    new_monitors.make_monitor(OR1_ID, None)
+    assert network.cone == {SW1_ID, SW2_ID, OR1_ID}
+
+
+def test_two_state_display(capsys, new_monitors):
+    """Test that two-state traces can be displayed with edges."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID] = names.lookup(["Sw1"])
+    [LOW, HIGH, RISING, FALLING, BLANK] = [devices.LOW, devices.HIGH,
+                                           devices.RISING, devices.FALLING,
+                                           devices.BLANK]
+
+    network.enable_two_state()
+    for state in [LOW, HIGH, HIGH, LOW, LOW]:
+        devices.set_switch(SW1_ID, state)
+        assert network.execute_network()
+        new_monitors.record_signals()
+
+    trace = new_monitors.monitors_dictionary[(SW1_ID, None)]
+    assert trace == [LOW, HIGH, HIGH, LOW, LOW]
+    assert new_monitors.get_edge_trace(trace) == [LOW, RISING, HIGH,
+                                                  FALLING, LOW]
+    assert new_monitors.get_edge_trace([BLANK, HIGH]) == [BLANK, HIGH]
+
+    new_monitors.show_edges = True
+    new_monitors.display_signals()
+    out, _ = capsys.readouterr()
+    assert "Sw1: _/-\\_" in out.split("\n")
+
+
+def test_write_vcd(new_monitors):
+    """Test if traces are written as a value change dump."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID] = names.lookup(["Sw1"])
+
+    for state in [devices.LOW, devices.HIGH, devices.HIGH]:
+        devices.set_switch(SW1_ID, state)
+        network.execute_network()
+        new_monitors.record_signals()
+
+    vcd_file = io.StringIO()
+    new_monitors.write_vcd(vcd_file)
+    lines = vcd_file.getvalue().split("\n")
+    assert "$var wire 1 ! Sw1 $end" in lines
+    assert "$var wire 1 # Or1 $end" in lines
+    assert lines[lines.index("#0"):] == ["#0", "0!", "0\"", "0#", "#1",
+                                         "1!", "1#", ""]
+
+
+def test_timed_events(new_monitors):
+    """Test if timed simulation records sub-cycle events."""
+    names = new_monitors.names
+    devices = new_monitors.devices
+    network = new_monitors.network
+    [SW1_ID, OR1_ID] = names.lookup(["Sw1", "Or1"])
+    LOW = devices.LOW
+    HIGH = devices.HIGH
+
+    assert network.enable_timed({devices.OR: 2})
+    assert network.cycle_time == 3
+    network.execute_network()
+    new_monitors.record_signals()
+    devices.set_switch(SW1_ID, HIGH)
+    network.execute_network()
+    new_monitors.record_signals()
+
+    assert new_monitors.events_dictionary[(SW1_ID, None)] == [(0, LOW),
+                                                              (3, HIGH)]
+    assert new_monitors.events_dictionary[(OR1_ID, None)] == [(0, LOW),
+                                                              (5, HIGH)]
+    vcd_file = io.StringIO()
+    new_monitors.write_vcd(vcd_file)
+    assert vcd_file.getvalue().endswith("#3\n1!\n#5\n1#\n")
@@ -0,0 +1,61 @@
+"""Test the montecarlo module."""
+import json
+import subprocess
+import sys
+
+from montecarlo import run_seed, run_seeds
+
+
+def test_run_seed_repeats(parse_file):
+    """Test that a seed gives the same traces and leaves the network."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/ripplecounter.circuit")
+    traces = run_seed(network, monitors, 3, 20)
+    assert traces == run_seed(network, monitors, 3, 20)
+    assert all(len(trace) == 20 for trace in traces.values())
+    assert all(trace == [] for trace in
+               monitors.monitors_dictionary.values())
+
+
+def test_run_seeds(parse_file):
+    """Test the report on a circuit that does and does not depend on seed."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/1001seqdetect.circuit")
+    report = run_seeds(network, monitors, range(6), 20, max_workers=2)
+    assert report['seeds'] == list(range(6))
+    assert report['diverged_seeds'] == []
+    assert report['failed_seeds'] == []
+    for monitor_report in report['monitors'].values():
+        assert monitor_report['agreement_cycle'] == 0
+        assert len(monitor_report['high_counts']) == 20
+
+    # The ripple counter starts from the random D-type memories
+    [names, devices, network, monitors] = parse_file(
+        "examples/ripplecounter.circuit")
+    report = run_seeds(network, monitors, range(16), 20, max_workers=1)
+    assert report['diverged_seeds']
+    monitor_report = report['monitors']['d1.Q']
+    assert set(monitor_report['diverged_seeds']) <= \
+        set(report['diverged_seeds'])
+    assert all(0 <= count <= 16 for count in monitor_report['high_counts'])
+
+
+def test_logsim_runs_jobs():
+    """Test that logsim.py -M limits the runs to the given number of jobs."""
+    reports = []
+    for jobs in ["1", "2"]:
+        process = subprocess.run(
+            [sys.executable, "logsim.py", "-M", "3", "-n", "10", "-j", jobs,
+             "examples/ripplecounter.circuit"],
+            stdout=subprocess.PIPE, universal_newlines=True)
+        assert process.returncode in [0, 1]
+        report = json.loads(process.stdout)
+        del report['seconds']
+        reports.append(report)
+    assert reports[0] == reports[1]
+
+    process = subprocess.run(
+        [sys.executable, "logsim.py", "-M", "3", "-j", "0",
+         "examples/ripplecounter.circuit"],
+        stdout=subprocess.PIPE, universal_newlines=True)
+    assert process.stdout.startswith("Error: runs, cycles and jobs")
@@ -40,6 +40,16 @@ def test_unique_error_codes_raises_exceptions(filled_names):
         filled_names.unique_error_codes("5")
     with pytest.raises(TypeError):
         filled_names.unique_error_codes(6.3)
+    with pytest.raises(ValueError):
+        filled_names.unique_error_codes(2, ["ONLY_ONE"])
+
+
+def test_get_error_name(filled_names):
+    """Test that named error codes are recorded in the error code table"""
+    [NO_ERROR, BAD] = filled_names.unique_error_codes(2, ["NO_ERROR", "BAD"])
+    assert filled_names.get_error_name(NO_ERROR) == "NO_ERROR"
+    assert filled_names.get_error_name(BAD) == "BAD"
+    assert filled_names.get_error_name(0) is None  # declared without a name
 
 
 @pytest.mark.parametrize("name_string_list, expected_name_ID_list", [
@@ -0,0 +1,196 @@
+"""Test the netlist module."""
+import pytest
+
+from names import Names
+from devices import Devices
+from network import Network
+from monitors import Monitors
+from netlist import (build_netlist, lower_netlist, make_pass_manager,
+                     validate_netlist, remove_dead_logic, fold_constants,
+                     levelize)
+
+
+def run_traces(network, monitors, cycles):
+    """Run the network and return the recorded traces."""
+    for _ in range(cycles):
+        assert network.execute_network()
+        monitors.record_signals()
+    return dict(monitors.monitors_dictionary)
+
+
+@pytest.mark.parametrize("path", [
+    "examples/fulladder.circuit",
+    "examples/8to1mux.circuit",
+    "examples/ripplecounter.circuit",
+    "examples/1001seqdetect.circuit",
+])
+def test_build_and_lower(parse_file, path):
+    """Test that a lowered netlist matches the parsed design."""
+    [names, devices, network, monitors] = parse_file(path)
+    netlist = build_netlist(devices, monitors)
+    assert validate_netlist(netlist)
+    [new_devices, new_network, new_monitors] = lower_netlist(netlist)
+
+    assert sorted(new_devices.find_devices()) == \
+        sorted(devices.find_devices())
+    for device in devices.devices_list:
+        new_device = new_devices.get_device(device.device_id)
+        assert new_device.device_kind == device.device_kind
+        assert new_device.inputs == device.inputs
+    assert list(new_monitors.monitors_dictionary) == \
+        list(monitors.monitors_dictionary)
+
+
+def test_levelize(parse_file):
+    """Test that gates are ordered by combinational depth."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/fulladder.circuit")
+    netlist = build_netlist(devices, monitors)
+    assert levelize(netlist)
+    [or1, xor2, xor1, a] = names.lookup(["or1", "xor2", "xor1", "a"])
+    assert netlist.get_node(a).level == 0
+    assert netlist.get_node(xor1).level == 1
+    assert netlist.get_node(xor2).level == 2
+    assert netlist.get_node(or1).level == 3
+    levels = [node.level for node in netlist.nodes.values()]
+    assert levels == sorted(levels)
+
+    # Levelized lowering simulates the same as the original
+    [new_devices, new_network, new_monitors] = lower_netlist(netlist)
+    assert run_traces(new_network, new_monitors, 5) == \
+        run_traces(network, monitors, 5)
+
+
+def test_remove_dead_logic(parse_file):
+    """Test that logic not feeding a monitor is removed."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/fulladder.circuit")
+    [or1, xor2, and1, a] = names.lookup(["or1", "xor2", "and1", "a"])
+    monitors.remove_monitor(or1, None)
+    netlist = build_netlist(devices, monitors)
+    assert remove_dead_logic(netlist)
+    assert netlist.get_node(or1) is None
+    assert netlist.get_node(and1) is None
+    assert netlist.get_node(xor2) is not None
+    assert netlist.get_node(a) is not None  # switches are kept
+    assert validate_netlist(netlist)
+
+
+def test_fold_constants(parse_file):
+    """Test that gates set by fixed switches become fixed switches."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/fulladder.circuit")
+    switch_ids = devices.find_devices(devices.SWITCH)
+    netlist = build_netlist(devices, monitors, switch_ids)
+    assert fold_constants(netlist)
+    # All switches are fixed LOW, so the whole adder folds to constants
+    for node in netlist.nodes.values():
+        assert node.device_kind == devices.SWITCH
+        assert node.qualifier == devices.LOW
+        assert node.fixed
+
+    [new_devices, new_network, new_monitors] = lower_netlist(netlist)
+    assert run_traces(new_network, new_monitors, 3) == \
+        run_traces(network, monitors, 3)
+    # The folded gates cannot be set like the user's switches
+    [xor2_id, a_id] = names.lookup(["xor2", "a"])
+    assert not new_devices.set_switch(xor2_id, devices.HIGH)
+    assert not new_devices.set_switch(a_id, devices.HIGH)
+
+
+def test_fold_constants_keeps_switches(parse_file):
+    """Test that only fixed switches are folded."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/fulladder.circuit")
+    netlist = build_netlist(devices, monitors)
+    kinds = [node.device_kind for node in netlist.nodes.values()]
+    assert fold_constants(netlist)
+    assert [node.device_kind for node in netlist.nodes.values()] == kinds
+
+    # With a and b fixed LOW, the carry is LOW but the sum follows cin
+    [a_id, b_id, cin_id] = names.lookup(["a", "b", "cin"])
+    netlist = build_netlist(devices, monitors, [a_id, b_id])
+    assert fold_constants(netlist)
+    folded = sorted(names.get_name_string(node.device_id)
+                    for node in netlist.nodes.values()
+                    if node.device_kind == devices.SWITCH and node.fixed)
+    assert folded == ["a", "and1", "and2", "b", "or1", "xor1"]
+
+    [new_devices, new_network, new_monitors] = lower_netlist(netlist)
+    assert new_devices.set_switch(cin_id, devices.HIGH)
+    devices.set_switch(cin_id, devices.HIGH)
+    assert run_traces(new_network, new_monitors, 3) == \
+        run_traces(network, monitors, 3)
+
+
+def test_pass_manager(parse_file):
+    """Test that the pass manager runs and times the named passes."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/ripplecounter.circuit")
+    netlist = build_netlist(devices, monitors)
+    pass_manager = make_pass_manager(["validate", "dead", "levelize"])
+    assert pass_manager.run(netlist)
+    assert [x[0] for x in pass_manager.timings] == \
+        ["validate", "dead", "levelize"]
+
+    with pytest.raises(ValueError):
+        make_pass_manager(["nonexistent"])
+
+    # A failing pass stops the pipeline
+    pass_manager = make_pass_manager(["validate", "levelize"])
+    [d1] = names.lookup(["d1"])
+    netlist.get_node(d1).inputs[devices.DATA_ID] = None
+    assert not pass_manager.run(netlist)
+    assert [x[0] for x in pass_manager.timings] == ["validate"]
+
+
+def test_merge_duplicate_gates():
+    """Test that duplicate gates are merged and their names aliased."""
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    [SW1, SW2, SW3, AND1, AND2, OR1, OR2, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "Sw3", "And1", "And2", "Or1", "Or2", "I1", "I2"])
+    devices.make_device(SW1, devices.SWITCH, 1)
+    devices.make_device(SW2, devices.SWITCH, 1)
+    devices.make_device(SW3, devices.SWITCH, 0)
+    for gate_id in [AND1, AND2]:
+        devices.make_device(gate_id, devices.AND, 2)
+    for gate_id in [OR1, OR2]:
+        devices.make_device(gate_id, devices.OR, 2)
+    network.make_connection(SW1, None, AND1, I1)
+    network.make_connection(SW2, None, AND1, I2)
+    network.make_connection(SW2, None, AND2, I1)  # inputs swapped
+    network.make_connection(SW1, None, AND2, I2)
+    network.make_connection(AND1, None, OR1, I1)
+    network.make_connection(SW3, None, OR1, I2)
+    network.make_connection(SW3, None, OR2, I1)
+    network.make_connection(AND2, None, OR2, I2)
+    monitors.make_monitor(OR1, None)
+    monitors.make_monitor(OR2, None)
+
+    netlist = build_netlist(devices, monitors)
+    assert make_pass_manager(["strash", "validate"]).run(netlist)
+    assert netlist.aliases == {AND2: AND1, OR2: OR1}
+    assert netlist.get_node(OR2) is netlist.get_node(OR1)
+
+    [new_devices, new_network, new_monitors] = lower_netlist(netlist)
+    assert len(new_devices.find_devices()) == 5
+    assert new_devices.get_signal_name(OR2, None) == "Or2"
+    assert list(new_monitors.monitors_dictionary) == [(OR1, None),
+                                                      (OR2, None)]
+    assert "And2" in new_monitors.get_signal_names()[1]
+    assert run_traces(new_network, new_monitors, 3) == \
+        run_traces(network, monitors, 3)
+
+
+def test_lower_keeps_delays(parse_file):
+    """Test that propagation delays survive building and lowering."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/fulladder.circuit")
+    device_id = devices.find_devices(devices.XOR)[0]
+    devices.set_delay(device_id, 4)
+    netlist = build_netlist(devices, monitors)
+    [new_devices, new_network, new_monitors] = lower_netlist(netlist)
+    assert new_devices.get_device(device_id).delay == 4
@@ -1,9 +1,14 @@
 """Test the network module."""
+import random
+
 import pytest
 
 from names import Names
 from devices import Devices
 from network import Network
+from monitors import Monitors
+from scanner import Scanner
+from parse import Parser
 
 
 @pytest.fixture
@@ -373,3 +378,348 @@ def test_oscillating_network(new_network):
     network.make_connection(NOR1, None, NOR1, I1)
 
     assert not network.execute_network()
+
+
+def test_cone_pruning(new_network):
+    """Test that only the logic feeding the given outputs is simulated."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, AND1_ID, OR1_ID, NOT1_ID, I1, I2] = names.lookup(
+        ["Sw1", "And1", "Or1", "Not1", "I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 1)
+    devices.make_device(AND1_ID, devices.AND, 2)
+    devices.make_device(OR1_ID, devices.OR, 2)
+    devices.make_device(NOT1_ID, devices.NOT)
+    network.make_connection(SW1_ID, None, AND1_ID, I1)
+    network.make_connection(SW1_ID, None, AND1_ID, I2)
+    network.make_connection(SW1_ID, None, OR1_ID, I1)
+    network.make_connection(SW1_ID, None, OR1_ID, I2)
+    network.make_connection(OR1_ID, None, NOT1_ID, I1)
+
+    assert network.get_cone([(NOT1_ID, None)]) == {SW1_ID, OR1_ID, NOT1_ID}
+
+    network.enable_pruning([(AND1_ID, None)])
+    network.execute_network()
+    network.execute_network()
+    assert network.get_output_signal(AND1_ID, None) == devices.HIGH
+    # Or1 is outside the cone, so it is not simulated
+    assert network.get_output_signal(OR1_ID, None) == devices.LOW
+
+    # Growing the cone brings Or1 and Not1 up to date straight away
+    assert network.update_cone([(AND1_ID, None), (NOT1_ID, None)])
+    assert network.get_output_signal(OR1_ID, None) == devices.HIGH
+    assert network.get_output_signal(NOT1_ID, None) == devices.LOW
+
+    network.disable_pruning()
+    assert network.cone is None
+
+
+def test_freeze_switches(new_network):
+    """Test that logic fixed by switches is frozen until a switch toggles."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1_ID, SW2_ID, CL_ID, AND1_ID, XOR1_ID, D_ID, I1, I2] = names.lookup(
+        ["Sw1", "Sw2", "Clock1", "And1", "Xor1", "D1", "I1", "I2"])
+    devices.make_device(SW1_ID, devices.SWITCH, 0)
+    devices.make_device(SW2_ID, devices.SWITCH, 1)
+    devices.make_device(CL_ID, devices.CLOCK, 1)
+    devices.make_device(AND1_ID, devices.AND, 2)
+    devices.make_device(XOR1_ID, devices.XOR)
+    devices.make_device(D_ID, devices.D_TYPE)
+    network.make_connection(SW1_ID, None, AND1_ID, I1)
+    network.make_connection(CL_ID, None, AND1_ID, I2)
+    network.make_connection(AND1_ID, None, XOR1_ID, I1)
+    network.make_connection(SW2_ID, None, XOR1_ID, I2)
+    network.make_connection(XOR1_ID, None, D_ID, devices.SET_ID)
+    network.make_connection(SW1_ID, None, D_ID, devices.CLEAR_ID)
+    network.make_connection(CL_ID, None, D_ID, devices.CLK_ID)
+    network.make_connection(CL_ID, None, D_ID, devices.DATA_ID)
+
+    # Sw1 is LOW, so And1 is LOW whatever the clock, Xor1 is HIGH, and D1
+    # is held SET
+    assert network.freeze_switches() == 5
+    assert network.frozen == {SW1_ID, SW2_ID, AND1_ID, XOR1_ID, D_ID}
+    assert network.get_output_signal(D_ID, devices.Q_ID) == devices.HIGH
+    for _ in range(4):
+        assert network.execute_network()
+        assert network.get_output_signal(XOR1_ID, None) == devices.HIGH
+        assert network.get_output_signal(D_ID, devices.Q_ID) == devices.HIGH
+
+    # Toggling a switch restores the original network
+    devices.set_switch(SW2_ID, devices.LOW)
+    assert network.execute_network()
+    assert network.frozen is None
+    assert network.get_output_signal(XOR1_ID, None) == devices.LOW
+
+
+def test_find_combinational_loops(new_network):
+    """Test that loops are found unless they pass through a D-type."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [NOR1, NOR2, NOR3, SW1, D1, I1, I2] = names.lookup(
+        ["Nor1", "Nor2", "Nor3", "Sw1", "D1", "I1", "I2"])
+    devices.make_device(SW1, devices.SWITCH, 0)
+    devices.make_device(NOR1, devices.NOR, 2)
+    devices.make_device(NOR2, devices.NOR, 2)
+    devices.make_device(NOR3, devices.NOR, 1)
+    devices.make_device(D1, devices.D_TYPE)
+    # Nor1 and Nor2 form a latch
+    network.make_connection(SW1, None, NOR1, I1)
+    network.make_connection(NOR2, None, NOR1, I2)
+    network.make_connection(NOR1, None, NOR2, I1)
+    network.make_connection(SW1, None, NOR2, I2)
+    # Nor3 and D1 form a loop through a D-type
+    network.make_connection(D1, devices.Q_ID, NOR3, I1)
+    network.make_connection(NOR3, None, D1, devices.DATA_ID)
+
+    loops = network.find_combinational_loops()
+    assert [sorted(loop) for loop in loops] == [sorted([NOR1, NOR2])]
+
+
+def test_oscillating_devices(new_network):
+    """Test that the devices still toggling are reported."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [NOR1, SW1, OR1, I1, I2] = names.lookup(["Nor1", "Sw1", "Or1", "I1",
+                                             "I2"])
+    devices.make_device(NOR1, devices.NOR, 1)
+    devices.make_device(SW1, devices.SWITCH, 1)
+    devices.make_device(OR1, devices.OR, 2)
+    network.make_connection(NOR1, None, NOR1, I1)
+    network.make_connection(SW1, None, OR1, I1)
+    network.make_connection(SW1, None, OR1, I2)
+
+    assert network.find_combinational_loops() == [[NOR1]]
+    assert not network.execute_network()
+    assert network.oscillating_devices == [NOR1]
+
+
+def test_iteration_limit(new_network):
+    """Test that the settle iteration limit is derived from logic depth."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1, NOT1, NOT2, NOT3, I1] = names.lookup(["Sw1", "Not1", "Not2",
+                                                "Not3", "I1"])
+    devices.make_device(SW1, devices.SWITCH, 0)
+    for gate_id in [NOT1, NOT2, NOT3]:
+        devices.make_device(gate_id, devices.NOT)
+    network.make_connection(SW1, None, NOT1, I1)
+    network.make_connection(NOT1, None, NOT2, I1)
+    network.make_connection(NOT2, None, NOT3, I1)
+
+    # Before finalising, the default limit is used
+    assert network.get_iteration_limit() == 20
+    assert network.finalise_network() == 10
+    assert network.logic_depth == 4
+    assert network.get_iteration_limit() == 10
+
+    network.set_iteration_limit(3)
+    assert network.get_iteration_limit() == 3
+    network.set_iteration_limit()
+    assert network.get_iteration_limit() == 10
+
+    assert network.execute_network()
+    devices.set_switch(SW1, devices.HIGH)
+    assert network.execute_network()
+    assert network.iteration_counts[-1] > network.iteration_counts[0]
+
+    # Too small a limit makes the network fail to settle
+    network.set_iteration_limit(2)
+    devices.set_switch(SW1, devices.LOW)
+    assert not network.execute_network()
+
+
+def test_iteration_limit_state_machine(new_network):
+    """Test that feedback through D-type DATA inputs is not logic depth."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    # A ring of ten D-types, each driving the next through a NOT gate
+    [CK1, SW1, I1] = names.lookup(["Ck1", "Sw1", "I1"])
+    devices.make_device(CK1, devices.CLOCK, 1)
+    devices.make_device(SW1, devices.SWITCH, 0)
+    d_type_ids = names.lookup(["D%d" % i for i in range(10)])
+    not_ids = names.lookup(["Not%d" % i for i in range(10)])
+    for d_type_id, not_id in zip(d_type_ids, not_ids):
+        devices.make_device(d_type_id, devices.D_TYPE)
+        devices.make_device(not_id, devices.NOT)
+    for i, (d_type_id, not_id) in enumerate(zip(d_type_ids, not_ids)):
+        network.make_connection(CK1, None, d_type_id, devices.CLK_ID)
+        network.make_connection(SW1, None, d_type_id, devices.SET_ID)
+        network.make_connection(SW1, None, d_type_id, devices.CLEAR_ID)
+        network.make_connection(d_type_id, devices.Q_ID, not_id, I1)
+        network.make_connection(not_id, None, d_type_ids[(i + 1) % 10],
+                                devices.DATA_ID)
+
+    # The clock, a D-type and a NOT gate, however long the ring
+    assert network.finalise_network() == 8
+    assert network.logic_depth == 3
+    for _ in range(5):
+        assert network.execute_network()
+
+
+def run_example(path, mode, seed):
+    """Simulate an example with random switch changes, returning traces.
+
+    mode is None, "two_phase", "two_state" or "timed".
+    """
+    random.seed(seed)  # cold startup is random
+    names = Names()
+    devices = Devices(names)
+    network = Network(names, devices)
+    monitors = Monitors(names, devices, network)
+    scanner = Scanner(path, names)
+    parser = Parser(names, devices, network, monitors, scanner)
+    assert parser.parse_network()
+    if mode == "two_phase":
+        assert network.enable_two_phase()
+    elif mode == "two_state":
+        network.enable_two_state()
+    elif mode == "timed":
+        assert network.enable_timed()
+
+    switch_ids = devices.find_devices(devices.SWITCH)
+    switch_changes = random.Random(seed)
+    for cycle in range(60):
+        if switch_ids and cycle % 3 == 0:
+            devices.set_switch(switch_changes.choice(switch_ids),
+                               switch_changes.choice([devices.LOW,
+                                                      devices.HIGH]))
+        assert network.execute_network()
+        monitors.record_signals()
+    return dict(monitors.monitors_dictionary)
+
+
+@pytest.mark.parametrize("path", [
+    "examples/fulladder.circuit",
+    "examples/8to1mux.circuit",
+    "examples/ripplecounter.circuit",
+    "examples/1001seqdetect.circuit",
+])
+def test_two_phase_matches_default(path):
+    """Test that the two-phase mode gives the same traces as the default."""
+    for seed in range(5):
+        assert run_example(path, "two_phase", seed) == \
+            run_example(path, None, seed)
+
+
+def test_two_phase_rejects_loops(new_network):
+    """Test that the two-phase mode needs a loop-free network."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [NOR1, NOR2, SW1, I1, I2] = names.lookup(["Nor1", "Nor2", "Sw1", "I1",
+                                              "I2"])
+    devices.make_device(SW1, devices.SWITCH, 0)
+    devices.make_device(NOR1, devices.NOR, 2)
+    devices.make_device(NOR2, devices.NOR, 2)
+    network.make_connection(SW1, None, NOR1, I1)
+    network.make_connection(NOR1, None, NOR2, I1)
+    network.make_connection(SW1, None, NOR2, I2)
+
+    # Nor1 has an unconnected input
+    assert not network.enable_two_phase()
+    network.make_connection(NOR2, None, NOR1, I2)
+    assert not network.enable_two_phase()
+    assert not network.two_phase
+
+
+@pytest.mark.parametrize("path", [
+    "examples/fulladder.circuit",
+    "examples/8to1mux.circuit",
+    "examples/ripplecounter.circuit",
+    "examples/1001seqdetect.circuit",
+])
+def test_two_state_matches_default(path):
+    """Test that the two-state mode gives the same traces as the default."""
+    for seed in range(5):
+        assert run_example(path, "two_state", seed) == \
+            run_example(path, None, seed)
+
+
+def test_two_state_iterations(new_network):
+    """Test that two-state changes settle in fewer iterations."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1, NOT1, NOT2, I1] = names.lookup(["Sw1", "Not1", "Not2", "I1"])
+    devices.make_device(SW1, devices.SWITCH, 0)
+    devices.make_device(NOT1, devices.NOT)
+    devices.make_device(NOT2, devices.NOT)
+    network.make_connection(SW1, None, NOT1, I1)
+    network.make_connection(NOT1, None, NOT2, I1)
+
+    assert network.execute_network()
+    devices.set_switch(SW1, devices.HIGH)
+    assert network.execute_network()
+    four_state_iterations = network.iteration_counts[-1]
+
+    network.enable_two_state()
+    devices.set_switch(SW1, devices.LOW)
+    assert network.execute_network()
+    assert network.iteration_counts[-1] < four_state_iterations
+    assert network.get_output_signal(NOT2, None) == devices.LOW
+
+
+@pytest.mark.parametrize("path", [
+    "examples/fulladder.circuit",
+    "examples/8to1mux.circuit",
+    "examples/1001seqdetect.circuit",
+])
+def test_timed_matches_default(path):
+    """Test that timed simulation settles to the zero-delay traces.
+
+    The ripple counter is left out: its clear is released at the same time
+    as a clock edge, which the zero-delay engine orders arbitrarily.
+    """
+    for seed in range(5):
+        assert run_example(path, "timed", seed) == \
+            run_example(path, None, seed)
+
+
+def test_timed_glitch(new_network):
+    """Test that timed simulation shows a glitch through unequal paths."""
+    network = new_network
+    devices = network.devices
+    names = devices.names
+
+    [SW1, NOT1, XOR1, I1, I2] = names.lookup(["Sw1", "Not1", "Xor1", "I1",
+                                              "I2"])
+    devices.make_device(SW1, devices.SWITCH, 0)
+    devices.make_device(NOT1, devices.NOT)
+    devices.make_device(XOR1, devices.XOR)
+    network.make_connection(SW1, None, NOT1, I1)
+    network.make_connection(SW1, None, XOR1, I1)
+    network.make_connection(NOT1, None, XOR1, I2)
+    devices.set_delay(NOT1, 3)
+
+    assert network.enable_timed({devices.XOR: 2})
+    assert network.cycle_time == 7  # two gates deep, delays up to 3
+    assert network.execute_network()
+    assert network.get_output_signal(XOR1, None) == devices.HIGH
+
+    devices.set_switch(SW1, devices.HIGH)
+    assert network.execute_network()
+    # Xor1 sees the new switch level 3 time units before Not1 changes
+    assert [event for event in network.events if event[1] == XOR1] == [
+        (9, XOR1, None, devices.LOW), (12, XOR1, None, devices.HIGH)]
+    assert network.get_output_signal(XOR1, None) == devices.HIGH
+
+    # A cycle too short to settle carries the changes over
+    network.cycle_time = 2
+    devices.set_switch(SW1, devices.LOW)
+    assert not network.execute_network()
+    assert sorted(network.oscillating_devices) == sorted([NOT1, XOR1])
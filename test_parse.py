@@ -143,6 +143,10 @@ def test_parse_device_name(parser_emptyfile, filelines, correctness):
     (["and1(-1)"], False),  # minus sign not allowed in grammar
     (["and1()"], False),
     (["and1(1,"], False),
+    (["and1(1, 3)"], True),  # qualifier and propagation delay
+    (["d1(, 3)"], True),  # propagation delay only
+    (["and1(1,)"], False),
+    (["and1(,)"], False),
     (["and1 (1)"], True),
     (["and1\n", "(\n", "1\n", "\n", ")"], True),
     ([","], False),
@@ -0,0 +1,202 @@
+"""Test the partition module."""
+import random
+
+import pytest
+
+import partition
+from partition import (simulate_partitioned, benchmark_partitioned,
+                       simulate_components)
+
+
+def test_partition_devices(parse_file):
+    """Test that regions are balanced and cover the gates and D-types."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/ripplecounter.circuit")
+    [regions, cut_nets] = network.partition_devices(2)
+    d_type_ids = devices.find_devices(devices.D_TYPE)
+    assert sorted(regions[0] + regions[1]) == sorted(d_type_ids)
+    assert [len(region) for region in regions] == [2, 2]
+    # The four D-types form a chain, which is best cut once
+    assert cut_nets == 1
+
+    [regions, cut_nets] = network.partition_devices(1)
+    assert regions == [d_type_ids]
+    assert cut_nets == 0
+
+
+@pytest.mark.parametrize("path, worker_count", [
+    ("examples/8to1mux.circuit", 3),
+    ("examples/1001seqdetect.circuit", 2),
+])
+def test_simulate_partitioned(parse_file, path, worker_count):
+    """Test that partitioned runs reproduce the single-process traces."""
+    random.seed(0)  # cold startup is random
+    [names, devices, network, monitors] = parse_file(path)
+    switch_ids = devices.find_devices(devices.SWITCH)
+    switch_changes = {}
+    for cycle in range(0, 30, 3):
+        switch_changes[cycle] = [(random.choice(switch_ids),
+                                  random.choice([devices.LOW,
+                                                 devices.HIGH]))]
+
+    report = benchmark_partitioned(network, monitors, 30, [worker_count],
+                                   switch_changes)
+    [run] = report['runs']
+    assert run['workers'] == worker_count
+    assert run['cut_nets'] > 0
+    assert run['matches']
+
+    [regions, cut_nets] = network.partition_devices(worker_count)
+    traces = simulate_partitioned(network, monitors, regions, 30,
+                                  switch_changes)
+    assert list(traces) == list(monitors.monitors_dictionary)
+    # The original network is left at its start state
+    assert all(len(trace) == 0 for trace in
+               monitors.monitors_dictionary.values())
+
+
+def test_simulate_partitioned_worker_fails(parse_file, monkeypatch):
+    """Test that a failing worker raises instead of hanging the others."""
+    exchange = partition._BoundaryExchange.__call__
+
+    def failing_exchange(self, changed):
+        if self.region_index == 1:
+            raise ValueError("bad region")
+        return exchange(self, changed)
+
+    # Worker processes are forked, so they see the patched method
+    monkeypatch.setattr(partition._BoundaryExchange, "__call__",
+                        failing_exchange)
+    [names, devices, network, monitors] = parse_file(
+        "examples/ripplecounter.circuit")
+    [regions, cut_nets] = network.partition_devices(2)
+    with pytest.raises(RuntimeError, match="worker 1 failed: ValueError"):
+        simulate_partitioned(network, monitors, regions, 10)
+
+
+# Two independent counters, and an oscillating NOT gate that is not monitored
+ISLANDS = """
+DEVICE
+    CLOCK ck(1);
+    SWITCH gnd(0), gnd2(0);
+    DTYPE d1, d2, d3;
+    NOT loop;
+CONNECT
+    ck -> d1.CLK, d3.CLK;
+    gnd -> d1.SET, d1.CLEAR, d2.SET, d2.CLEAR;
+    gnd2 -> d3.SET, d3.CLEAR;
+    d1.QBAR -> d1.DATA, d2.CLK;
+    d2.QBAR -> d2.DATA;
+    d3.QBAR -> d3.DATA;
+    loop -> loop.I1;
+MONITOR
+    d3.Q, d1.Q, d2.Q
+END
+"""
+
+
+def test_split_components(parse_file, tmp_path):
+    """Test that split mode settles and skips components separately."""
+    path = tmp_path / "islands.circuit"
+    path.write_text(ISLANDS)
+    random.seed(0)
+    [names, devices, network, monitors] = parse_file(str(path))
+    [CK, GND, GND2, D1, D2, D3, LOOP] = names.lookup(
+        ["ck", "gnd", "gnd2", "d1", "d2", "d3", "loop"])
+
+    # ck joins the d1 and d3 counters into one component
+    assert network.connected_components == [[CK, GND, GND2, D1, D2, D3],
+                                            [LOOP]]
+    # The unmonitored loop makes the whole network oscillate
+    assert not network.execute_network()
+
+    random.seed(0)
+    [names, devices, network, monitors] = parse_file(str(path))
+    network.enable_split(monitors.monitors_dictionary)
+    assert network.split == [0]
+    for _ in range(8):
+        assert network.execute_network()
+        monitors.record_signals()
+    d1_trace = monitors.monitors_dictionary[(D1, devices.Q_ID)]
+    assert d1_trace[2:] == [1 - x for x in d1_trace[:-2]]
+
+    # Monitoring the loop simulates it again
+    monitors.make_monitor(LOOP, None)
+    assert network.split == [0, 1]
+    assert not network.execute_network()
+    assert network.unsteady_components == [1]
+    assert network.oscillating_devices == [LOOP]
+
+
+# A counter, and a shift register driven by a switch in another component
+SHIFT_ISLANDS = """
+DEVICE
+    CLOCK ck(1), ck2(1);
+    SWITCH gnd(0), gnd2(0), in(0);
+    DTYPE a1, b1, b2;
+CONNECT
+    ck -> a1.CLK;
+    gnd -> a1.SET, a1.CLEAR;
+    a1.QBAR -> a1.DATA;
+    ck2 -> b1.CLK, b2.CLK;
+    gnd2 -> b1.SET, b1.CLEAR, b2.SET, b2.CLEAR;
+    in -> b1.DATA;
+    b1.Q -> b2.DATA;
+MONITOR
+    a1.Q, b1.Q, b2.Q
+END
+"""
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_split_two_state(parse_file, tmp_path, seed):
+    """Test that each split component samples DATA from before the cycle."""
+    path = tmp_path / "shift.circuit"
+    path.write_text(SHIFT_ISLANDS)
+    all_traces = []
+    for split in [False, True]:
+        random.seed(seed)  # cold startup is random
+        [names, devices, network, monitors] = parse_file(str(path))
+        [A1, B1, IN] = names.lookup(["a1", "b1", "in"])
+        network.enable_two_state()
+        if split:
+            network.enable_split(monitors.monitors_dictionary)
+            # The shift register is settled after the counter
+            assert network.split == [0, 1]
+            assert A1 in network.connected_components[0]
+            assert B1 in network.connected_components[1]
+        switch_changes = random.Random(seed)
+        for cycle in range(20):
+            devices.set_switch(IN, switch_changes.choice([devices.LOW,
+                                                          devices.HIGH]))
+            assert network.execute_network()
+            monitors.record_signals()
+        all_traces.append(dict(monitors.monitors_dictionary))
+    assert all_traces[1] == all_traces[0]
+
+
+@pytest.mark.parametrize("use_threads", [False, True])
+def test_simulate_components(parse_file, tmp_path, use_threads):
+    """Test that pooled component runs match a single split run."""
+    path = tmp_path / "islands.circuit"
+    # Give each counter its own clock, making three components
+    path.write_text(ISLANDS.replace("CLOCK ck(1);", "CLOCK ck(1), ck2(2);")
+                    .replace("ck -> d1.CLK, d3.CLK;",
+                             "ck -> d1.CLK; ck2 -> d3.CLK;"))
+    random.seed(0)
+    [names, devices, network, monitors] = parse_file(str(path))
+    [GND2] = names.lookup(["gnd2"])
+    assert len(network.connected_components) == 3
+    switch_changes = {4: [(GND2, devices.HIGH)]}
+
+    traces = simulate_components(network, monitors, 12, switch_changes,
+                                 max_workers=2, use_threads=use_threads)
+
+    network.enable_split(monitors.monitors_dictionary)
+    for cycle in range(12):
+        for switch_id, switch_state in switch_changes.get(cycle, []):
+            devices.set_switch(switch_id, switch_state)
+        assert network.execute_network()
+        monitors.record_signals()
+    assert traces == dict(monitors.monitors_dictionary)
+    assert list(traces) == list(monitors.monitors_dictionary)
@@ -0,0 +1,89 @@
+"""Test the raster module."""
+import struct
+import zlib
+
+import pytest
+
+from raster import Raster, render_traces, BLUE, WHITE
+
+
+def read_png(data):
+    """Return [width, height, pixels] of an 8-bit RGB PNG file."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks = {}
+    position = 8
+    while position < len(data):
+        [length] = struct.unpack(">I", data[position:position + 4])
+        kind = data[position + 4:position + 8]
+        body = data[position + 8:position + 8 + length]
+        [crc] = struct.unpack(">I", data[position + 8 + length:
+                                         position + 12 + length])
+        assert crc == zlib.crc32(kind + body) & 0xffffffff
+        chunks[kind] = body
+        position += 12 + length
+    [width, height, depth, colour_type] = struct.unpack(
+        ">IIBB", chunks[b"IHDR"][:10])
+    assert (depth, colour_type) == (8, 2)
+    raw = zlib.decompress(chunks[b"IDAT"])
+    rows = [raw[y * (3 * width + 1) + 1:(y + 1) * (3 * width + 1)]
+            for y in range(height)]
+    return [width, height, b"".join(rows)]
+
+
+def get_pixel(raster, x, y):
+    """Return the colour of the pixel at (x, y), with y upwards."""
+    index = 3 * ((raster.height - 1 - y) * raster.width + x)
+    return tuple(raster.pixels[index:index + 3])
+
+
+def test_raster_drawing():
+    """Test lines, clipping and the PNG file."""
+    raster = Raster(20, 10)
+    raster.draw_line(2, 3, 12, 3, BLUE)
+    raster.draw_line(15, -5, 15, 50, BLUE)
+    raster.draw_text("Hi", 0, 0)
+    assert get_pixel(raster, 7, 3) == BLUE
+    assert get_pixel(raster, 7, 4) == WHITE
+    assert get_pixel(raster, 15, 9) == BLUE
+
+    [width, height, pixels] = read_png(raster.to_png())
+    assert [width, height] == [20, 10]
+    assert pixels == bytes(raster.pixels)
+
+
+def test_render_traces(parse_file):
+    """Test the layout of the traces, as on the canvas."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/ripplecounter.circuit")
+    devices.cold_startup(1)
+    for cycle in range(36):
+        assert network.execute_network()
+        monitors.record_signals()
+    raster = render_traces(devices, monitors)
+    # Four rows 75 pixels apart, 20 pixels per cycle
+    assert raster.height == 90 + 3 * 75 + 50
+    assert raster.width == 30 + 36 * 20 + 100
+
+    [D1, Q] = devices.get_signal_ids("d1.Q")
+    trace = monitors.monitors_dictionary[(D1, Q)]
+    y_low = raster.height - 90
+    for cycle, signal in enumerate(trace):
+        y = y_low + (25 if signal == devices.HIGH else 0)
+        assert get_pixel(raster, 30 + 20 * cycle + 10, y) == BLUE
+
+
+@pytest.mark.parametrize("cycles", [4000, 4001])
+def test_render_long_traces(parse_file, cycles):
+    """Test that long traces are narrowed and filled in."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/ripplecounter.circuit")
+    for cycle in range(cycles):
+        assert network.execute_network()
+        monitors.record_signals()
+    # 4001 cycles need an extra tick on the time axis
+    raster = render_traces(devices, monitors, max_width=400)
+    assert raster.width <= 400
+    # d1.Q toggles every two cycles, so its row is filled in
+    y_low = raster.height - 90
+    for y in range(y_low, y_low + 26):
+        assert get_pixel(raster, 200, y) == BLUE
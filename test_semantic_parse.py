@@ -91,3 +91,34 @@ def test_semantic_errors(bad_file, error_message, names, devices, network, monit
         assert (error_message in captured.out)
     except AttributeError:
         assert (error_message in captured[0])
+
+
+@pytest.mark.parametrize("bad_file, error_name, line_number", [
+    (device_present, "DEVICE_PRESENT", 4),
+    (inputs_not_connected, "INPUTS_NOT_CONNECTED", 18),
+    (monitor_present, "MONITOR_PRESENT", 18),
+    ("bad_examples/error_location.circuit", "NO_CONNECTION_OP", 10),
+])
+def test_collect_errors(bad_file, error_name, line_number, names, devices,
+                        network, monitors, capsys):
+    """Test that collect_errors mode records diagnostics without printing"""
+    sc = Scanner(bad_file, names)
+    parser = Parser(names, devices, network, monitors, sc,
+                    collect_errors=True)
+    [success, diagnostics] = parser.parse_network()
+    assert not success
+    assert capsys.readouterr().out == ""
+    assert diagnostics[0]['name'] == error_name
+    assert diagnostics[0]['line'] == line_number
+    assert diagnostics[0]['source'] == sc.filelines[line_number - 1].rstrip()
+
+
+def test_collect_errors_does_not_exit(names, devices, network, monitors):
+    """Test that keyword errors abandon parsing instead of exiting"""
+    sc = Scanner("/dev/null", names)
+    parser = Parser(names, devices, network, monitors, sc,
+                    collect_errors=True)
+    [success, diagnostics] = parser.parse_network()
+    assert not success
+    assert [d['name'] for d in diagnostics] == ["NO_DEVICE"]
+    assert diagnostics[0]['line'] is None
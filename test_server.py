@@ -0,0 +1,148 @@
+"""Test the server module."""
+import asyncio
+import json
+import socket
+
+from server import SimulationServer, load_circuit, simulate
+
+
+def test_simulate():
+    """Test that simulate() runs from a cold start and then continues."""
+    [success, diagnostics, network, monitors] = \
+        load_circuit("examples/fulladder.circuit")
+    assert success and diagnostics == []
+    [network, monitors] = simulate(network, monitors, 2, seed=0)
+    [network, monitors] = simulate(network, monitors, 3)
+    assert [len(x) for x in monitors.monitors_dictionary.values()] == [5, 5]
+
+
+def test_handle_request():
+    """Test loading, changing, running and reading a circuit."""
+    async def session(server):
+        async def call(method, params, request_id=1):
+            return await server.handle_request(
+                {'jsonrpc': "2.0", 'id': request_id, 'method': method,
+                 'params': params})
+
+        circuit = (await call('load', ["examples/fulladder.circuit"])
+                   )['result']['circuit']
+        assert (await call('set_switch', [circuit, "a", 1]))['result']
+        assert (await call('remove_monitor', [circuit, "or1"]))['result']
+        run = await call('run', {'circuit': circuit, 'cycles': 2,
+                                 'seed': 7})
+        assert run['result'] == {'cycles': 2, 'seed': 7}
+        assert (await call('continue', [circuit, 1]))['result'] == \
+            {'cycles': 3, 'seed': 7}
+        traces = await call('get_traces', [circuit])
+        assert traces['result'] == {"xor2": [1, 1, 1]}
+
+        errors = [
+            (await call('run', [circuit, 0]))['error']['code'],
+            (await call('set_switch', [circuit, "xor1", 1]))['error']
+            ['code'],
+            (await call('add_monitor', [circuit, "nosuch"]))['error']
+            ['code'],
+            (await call('get_traces', [circuit, 1]))['error']['code'],
+            (await call('nosuch', []))['error']['code'],
+            (await call('load', ["bad_examples/nosuch.circuit"]))
+            ['error']['code'],
+        ]
+        assert errors == [server.INVALID_PARAMS] * 4 + \
+            [server.METHOD_NOT_FOUND, server.SIMULATION_ERROR]
+        # Notifications are never answered, even when they fail
+        for method, params in [('run', [circuit, 1, 0]),
+                               ('run', [circuit, 0]), ('nosuch', [])]:
+            assert await server.handle_request(
+                {'jsonrpc': "2.0", 'method': method,
+                 'params': params}) is None
+        assert (await call('unload', [circuit]))['result']
+        assert (await call('get_traces', [circuit]))['error']['code'] == \
+            server.INVALID_PARAMS
+
+    server = SimulationServer(max_workers=2)
+    try:
+        asyncio.run(session(server))
+    finally:
+        server.close()
+
+
+def test_serve_tcp():
+    """Test that clients are answered over a TCP connection."""
+    async def session(server):
+        serve_task = asyncio.create_task(server.serve(port=0))
+        while not server.ports:
+            await asyncio.sleep(0.01)
+        reader, writer = await asyncio.open_connection("127.0.0.1",
+                                                       server.ports[0])
+        writer.write(b"not json\n")
+        writer.write(json.dumps({'jsonrpc': "2.0", 'id': "a",
+                                 'method': 'load',
+                                 'params': ["examples/fulladder.circuit"]}
+                                ).encode() + b"\n")
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in range(2)]
+        writer.close()
+        serve_task.cancel()
+        return responses
+
+    server = SimulationServer(max_workers=1)
+    try:
+        responses = asyncio.run(session(server))
+    finally:
+        server.close()
+    assert responses[0]['error']['code'] == server.PARSE_ERROR
+    assert responses[1] == {'jsonrpc': "2.0", 'id': "a",
+                            'result': {'circuit': 1}}
+
+
+def test_unload_while_waiting():
+    """Test that requests waiting for an unloaded circuit fail."""
+    async def session(server):
+        async def call(method, params):
+            return await server.handle_request(
+                {'jsonrpc': "2.0", 'id': 1, 'method': method,
+                 'params': params})
+
+        circuit = (await call('load', ["examples/ripplecounter.circuit"])
+                   )['result']['circuit']
+        return await asyncio.gather(
+            call('run', [circuit, 200, 0]), call('unload', [circuit]),
+            call('get_traces', [circuit]))
+
+    server = SimulationServer(max_workers=1)
+    try:
+        [run, unload, traces] = asyncio.run(session(server))
+    finally:
+        server.close()
+    assert run['result'] == {'cycles': 200, 'seed': 0}
+    assert unload['result']
+    assert traces['error']['code'] == server.INVALID_PARAMS
+
+
+def test_serve_removes_stale_socket(tmp_path):
+    """Test that a socket file left by a crashed server is replaced."""
+    path = str(tmp_path / "logsim.sock")
+    with socket.socket(socket.AF_UNIX) as stale:
+        stale.bind(path)  # closed without removing the file
+
+    async def session(server):
+        serve_task = asyncio.create_task(server.serve(path=path))
+        for _ in range(100):
+            try:
+                reader, writer = await asyncio.open_unix_connection(path)
+                break
+            except ConnectionRefusedError:
+                await asyncio.sleep(0.01)
+        writer.write(b'{"jsonrpc": "2.0", "id": 2, "method": "unload", '
+                     b'"params": [5]}\n')
+        response = json.loads(await reader.readline())
+        writer.close()
+        serve_task.cancel()
+        return response
+
+    server = SimulationServer(max_workers=1)
+    try:
+        response = asyncio.run(session(server))
+    finally:
+        server.close()
+    assert response['error']['code'] == server.INVALID_PARAMS
@@ -0,0 +1,22 @@
+"""Test the signalindex module."""
+from signalindex import SignalIndex, natural_key
+
+
+def test_natural_key():
+    """Test that numbers in names sort by value."""
+    names = ["a10", "a2", "B1", "a1.Q", "a1", "a1.QBAR", "a02"]
+    assert sorted(names, key=natural_key) == ["a1", "a1.Q", "a1.QBAR",
+                                              "a02", "a2", "a10", "B1"]
+
+
+def test_search():
+    """Test that prefix searches ignore case and keep natural order."""
+    index = SignalIndex(["sw10", "sw2", "d1.Q", "d1.QBAR", "Sw1", "and1"])
+    assert index.names == ["and1", "d1.Q", "d1.QBAR", "Sw1", "sw2", "sw10"]
+    assert [index.names[x] for x in index.search("sw")] == ["Sw1", "sw2",
+                                                           "sw10"]
+    assert [index.names[x] for x in index.search("SW1")] == ["Sw1", "sw10"]
+    assert [index.names[x] for x in index.search("d1.q")] == ["d1.Q",
+                                                             "d1.QBAR"]
+    assert index.search("x") == []
+    assert index.search("") == list(range(6))
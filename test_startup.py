@@ -0,0 +1,41 @@
+"""Test the startup module, and that the command line mode starts quickly."""
+import os
+
+import pytest
+
+from startup import PHASES, GUI_MODULES, measure_startup
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       "examples", "fulladder.circuit")
+
+# Generous limits, so that only a real regression makes the test fail
+IMPORT_BUDGET = 0.25  # seconds
+TOTAL_BUDGET = 0.5
+
+
+@pytest.fixture(scope="module")
+def report():
+    """Return the startup times of the full adder example."""
+    return measure_startup(EXAMPLE, runs=3)
+
+
+def test_measure_startup_phases(report):
+    """Test that every phase is timed and the file is parsed."""
+    assert report['runs'] == 3
+    assert report['parsed']
+    for phase in PHASES:
+        assert 0 <= report[phase] <= report['total']
+    assert "logsim" in report['modules']
+
+
+def test_startup_skips_unused_modules(report):
+    """Test that the command line mode imports no GUI or pool modules."""
+    for module in GUI_MODULES + ["multiprocessing", "concurrent.futures",
+                                 "netlist", "raster"]:
+        assert module not in report['modules']
+
+
+def test_startup_budget(report):
+    """Test that the command line mode starts within the time budget."""
+    assert report['import'] < IMPORT_BUDGET
+    assert report['total'] < TOTAL_BUDGET
@@ -0,0 +1,71 @@
+"""Test the sweep module."""
+import pytest
+
+from names import Names
+from devices import Devices
+from sweep import parse_sweep, get_points, get_metrics, sweep, format_table
+
+
+def test_parse_sweep():
+    """Test that lists and inclusive ranges are read."""
+    assert parse_sweep("ck=1,2,4; rc=1:7:3") == [["ck", [1, 2, 4]],
+                                                 ["rc", [1, 4, 7]]]
+    assert parse_sweep("sw=0:1") == [["sw", [0, 1]]]
+    assert get_points([["a", [1, 2]], ["b", [3]]]) == [{"a": 1, "b": 3},
+                                                       {"a": 2, "b": 3}]
+
+
+@pytest.mark.parametrize("spec", ["", "ck", "ck=", "ck=a", "ck=1:2:3:4",
+                                  "ck=1:4:0"])
+def test_parse_sweep_gives_errors(spec):
+    """Test that badly formed sweeps raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_sweep(spec)
+
+
+def test_get_metrics():
+    """Test the first HIGH cycle, HIGH count and toggle count."""
+    names = Names()
+    devices = Devices(names)
+    [SW] = names.lookup(["sw"])
+    devices.make_device(SW, devices.SWITCH, 0)
+    traces = {(SW, None): [devices.LOW, devices.RISING, devices.HIGH,
+                           devices.FALLING, devices.LOW]}
+    assert get_metrics(devices, traces) == {
+        "sw": {"first_high": 1, "high_cycles": 2, "toggles": 2}}
+
+
+def test_sweep(parse_file):
+    """Test that a sweep matches runs of separately edited networks."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/ripplecounter.circuit")
+    axes = parse_sweep("ck=1:3;rc=1,4")
+    report = sweep(network, monitors, axes, 20, seed=5, max_workers=2)
+    assert [result["point"] for result in report["points"]] == \
+        get_points(axes)
+    assert all(result["settled"] for result in report["points"])
+
+    # The parsed network is unchanged
+    [CK] = names.lookup(["ck"])
+    assert devices.get_device(CK).clock_half_period == 1
+
+    for result in report["points"]:
+        [names, devices, network, monitors] = parse_file(
+            "examples/ripplecounter.circuit")
+        for name, value in result["point"].items():
+            devices.set_qualifier(names.query(name), value)
+        devices.cold_startup(5)
+        for cycle in range(20):
+            assert network.execute_network()
+            monitors.record_signals()
+        assert result["monitors"] == get_metrics(
+            devices, monitors.monitors_dictionary)
+
+    table = format_table(report).split("\n")
+    assert len(table) == 7
+    assert table[0].split()[:3] == ["ck", "rc", "d1.Q:first"]
+
+    with pytest.raises(ValueError):
+        sweep(network, monitors, parse_sweep("d1=1"), 5)
+    with pytest.raises(ValueError):
+        sweep(network, monitors, parse_sweep("ck=0"), 5)
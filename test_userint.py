@@ -0,0 +1,70 @@
+"""Test the userint module."""
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from userint import UserInterface
+
+
+@pytest.fixture
+def user_interface(parse_file):
+    """Return a UserInterface for the full adder, without printed traces."""
+    [names, devices, network, monitors] = parse_file(
+        "examples/fulladder.circuit")
+    devices.seed = 0
+    return UserInterface(names, devices, network, monitors,
+                         show_traces=False)
+
+
+def test_run_script(user_interface, capsys):
+    """Test that a script runs without prompts or traces."""
+    failed_commands = user_interface.run_script(
+        ["# set a and run", "s a 1", "", "r 2", "s b 1", "c 3"])
+    assert failed_commands == []
+    output = capsys.readouterr().out
+    assert "#: " not in output
+    assert "xor2" not in output
+
+    results = user_interface.get_results()
+    assert results['cycles'] == 5
+    assert results['seed'] == 0
+    assert results['traces'] == {"xor2": [1, 1, 0, 0, 0],
+                                 "or1": [0, 0, 1, 1, 1]}
+
+
+def test_run_script_failures(user_interface):
+    """Test that failed commands are returned and 'q' ends the script."""
+    failed_commands = user_interface.run_script(
+        ["c 2", "r 1", "s nosuch 1", "x", "m or1", "q", "z"])
+    assert failed_commands == [[1, "c 2"], [3, "s nosuch 1"], [4, "x"],
+                               [5, "m or1"]]
+    assert user_interface.get_results()['cycles'] == 1
+
+
+def test_run_script_message_file(user_interface, capsys):
+    """Test that messages can be kept off standard output."""
+    user_interface.message_file = io.StringIO()
+    assert user_interface.run_script(["s a 1", "r 2", "m nosuch"]) == \
+        [[3, "m nosuch"]]
+    assert capsys.readouterr().out == ""
+    messages = user_interface.message_file.getvalue()
+    assert "Running for 2 cycles" in messages
+    assert "Error! Unknown name." in messages
+
+
+def test_batch_json_output():
+    """Test that logsim.py -b -d - writes only the results to stdout."""
+    process = subprocess.run(
+        [sys.executable, "logsim.py", "-c", "examples/fulladder.circuit",
+         "-b", "-", "-d", "-", "-r", "1"], input="s a 1\nr 3\nz nosuch\n",
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    assert process.returncode == 1
+    assert json.loads(process.stdout) == {
+        'cycles': 3, 'seed': 1,
+        'traces': {"xor2": [1, 1, 1], "or1": [0, 0, 0]},
+        'failed_commands': [[3, "z nosuch"]]}
+    assert "Cold start seed: 1" in process.stderr
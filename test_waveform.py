@@ -0,0 +1,140 @@
+"""Test the waveform module."""
+import pytest
+
+from names import Names
+from devices import Devices
+from waveform import Waveform, get_visible_range, get_tick_spacing
+
+
+@pytest.fixture
+def devices():
+    """Return a new instance of the Devices class."""
+    return Devices(Names())
+
+
+def get_lines(waveform, level=0):
+    """Return the lines of a level which draw something."""
+    vertices = list(waveform.get_vertices(level)[0])
+    lines = []
+    for i in range(0, len(vertices), 4):
+        [x1, y1, x2, y2] = vertices[i:i + 4]
+        if (x1, y1) != (x2, y2):
+            lines.append((x1, y1, x2, y2))
+    return lines
+
+
+def get_bands(waveform, level):
+    """Return the [x_start, x_end] of the bands of a level."""
+    vertices = list(waveform.get_vertices(level)[1])
+    bands = []
+    for i in range(0, len(vertices), 12):
+        triangle = vertices[i:i + 12]
+        if len(set(triangle[0::2])) > 1:
+            bands.append([min(triangle[0::2]), max(triangle[0::2])])
+    return bands
+
+
+def test_update(devices):
+    """Test that cycles become horizontal segments joined by edges."""
+    waveform = Waveform(devices)
+    signal_list = [devices.LOW, devices.HIGH, devices.BLANK,
+                   devices.RISING]
+    waveform.update(signal_list)
+    assert len(waveform.get_vertices(0)[0]) == 2 * Waveform.LINE_VERTICES * 4
+    assert get_lines(waveform) == [(0, 0, 1, 0), (1, 0, 1, 1),
+                                   (1, 1, 2, 1), (3, 0, 4, 1)]
+
+
+def test_update_appends(devices):
+    """Test that only new cycles are added, unless the list is replaced."""
+    waveform = Waveform(devices)
+    signal_list = [devices.LOW, devices.HIGH, devices.HIGH]
+    waveform.update(signal_list)
+    for level in range(len(waveform.blocks)):
+        waveform.get_vertices(level)
+    waveform.first_changed = [len(blocks) for blocks in waveform.blocks]
+    signal_list.extend([devices.FALLING, devices.LOW])
+    waveform.update(signal_list)
+    # The last block of each level above 0 may change
+    assert waveform.first_changed == [3, 1, 0, 0]
+
+    whole = Waveform(devices)
+    whole.update(list(signal_list))
+    assert waveform.blocks == whole.blocks
+    for level in range(len(whole.blocks)):
+        assert waveform.get_vertices(level) == whole.get_vertices(level)
+
+    # The monitors were reset
+    waveform.update([devices.HIGH])
+    assert get_lines(waveform) == [(0, 1, 1, 1)]
+    assert len(waveform.blocks) == 1
+
+
+def test_levels(devices):
+    """Test the blocks, bands and choice of level of detail."""
+    waveform = Waveform(devices)
+    waveform.update([devices.LOW, devices.HIGH] * 4 +
+                    [devices.HIGH] * 4 + [devices.BLANK] * 4)
+    assert [len(blocks) for blocks in waveform.blocks] == [16, 8, 4, 2, 1]
+    assert waveform.blocks[2] == [(0, 1, 0, 1), (0, 1, 0, 1),
+                                  (1, 1, 1, 1), None]
+    assert waveform.blocks[4] == [(0, 1, 0, 1)]
+
+    # Fast toggling is filled in, steady levels are lines
+    assert get_bands(waveform, 2) == [[0, 4], [4, 8]]
+    assert get_lines(waveform, 2) == [(4, 1, 4, 0), (8, 1, 12, 1)]
+    assert get_bands(waveform, 0) == []
+
+    assert waveform.get_level(0.1) == 0
+    assert waveform.get_level(1) == 0
+    assert waveform.get_level(5) == 2
+    assert waveform.get_level(1000) == 4
+
+
+def test_last_block_ends_with_trace(devices):
+    """Test that a partly filled last block is drawn only to the end."""
+    waveform = Waveform(devices)
+    signal_list = [devices.LOW] * 4 + [devices.HIGH]
+    waveform.update(signal_list)
+    assert [len(blocks) for blocks in waveform.blocks] == [5, 3, 2, 1]
+    # The unpaired last cycle is promoted, but still ends at x = 5
+    assert get_lines(waveform, 1)[-2:] == [(4, 0, 4, 1), (4, 1, 5, 1)]
+    assert get_lines(waveform, 2)[-1] == (4, 1, 5, 1)
+    assert get_bands(waveform, 3) == [[0, 5]]
+
+    # It grows as cycles are added
+    signal_list.extend([devices.HIGH, devices.HIGH])
+    waveform.update(signal_list)
+    assert get_lines(waveform, 2)[-1] == (4, 1, 7, 1)
+
+
+def test_get_blocks(devices):
+    """Test the blocks covering a range of cycles."""
+    waveform = Waveform(devices)
+    waveform.update([devices.LOW] * 10)
+    assert waveform.get_blocks(0, 3, 7) == [3, 7]
+    assert waveform.get_blocks(2, 3, 7) == [0, 2]
+    assert waveform.get_blocks(2, 8, 100) == [2, 3]
+    assert waveform.get_blocks(1, 20, 30) == [5, 5]
+
+
+@pytest.mark.parametrize("args, expected", [
+    # Cycles 20 wide from x = 30, on a screen from 0 to 100
+    ((30, 20, 0, 20, 0, 100, 50), [0, 4]),
+    ((30, 20, 0, 20, 500, 600, 50), [23, 29]),
+    ((30, 20, 0, 20, 2000, 2100, 50), [50, 50]),
+    ((30, 20, 0, 20, -200, -100, 50), [0, 0]),
+    # Rows 75 apart drawn downwards, each from 18 below to 25 above
+    ((420, -75, -18, 25, 0, 600, 10), [0, 6]),
+    ((420, -75, -18, 25, -300, 0, 10), [6, 10]),
+])
+def test_get_visible_range(args, expected):
+    """Test that only items overlapping the screen are returned."""
+    assert get_visible_range(*args) == expected
+
+
+@pytest.mark.parametrize("pixels_per_cycle, expected", [
+    (20, 2), (40, 1), (100, 1), (10, 5), (5, 10), (1, 50), (0.01, 5000)])
+def test_get_tick_spacing(pixels_per_cycle, expected):
+    """Test that ticks are at least 40 pixels apart."""
+    assert get_tick_spacing(pixels_per_cycle, 40) == expected
@@ -1,12 +1,14 @@
 """Implement the interactive command line user interface.
 
 Used in the Logic Simulator project to enable the user to enter commands
-to run the simulation or adjust the network properties.
+to run the simulation or adjust the network properties. The same commands
+can also be run from a script, without prompts.
 
 Classes:
 --------
 UserInterface - reads and parses user commands.
 """
+import random
 
 
 class UserInterface:
@@ -24,12 +26,24 @@ class UserInterface:
     devices: instance of the devices.Devices() class.
     network: instance of the network.Network() class.
     monitors: instance of the monitors.Monitors() class.
+    show_traces: if False, the traces are not printed after each run.
+    message_file: file the command messages are printed to, e.g. sys.stderr
+                  to keep them apart from the traces. Defaults to standard
+                  output.
 
     Public methods:
     ---------------
     command_interface(self): Reads in the commands and calls the corresponding
                              functions.
 
+    run_script(self, lines): Runs the commands in lines without prompts and
+                             returns the commands which failed.
+
+    execute_command(self, command): Calls the function for the command and
+                                    returns True if it succeeded.
+
+    get_results(self): Returns the simulation results as a dictionary.
+
     get_line(self): Prints a prompt for the user and updates the user entry.
 
     read_command(self): Returns the first non-whitespace character.
@@ -64,16 +78,26 @@ class UserInterface:
     run_command(self): Runs the simulation from scratch.
 
     continue_command(self): Continues a previously run simulation.
+
+    print_message(self, *args): Prints a message to the message file.
     """
 
-    def __init__(self, names, devices, network, monitors):
+    def __init__(self, names, devices, network, monitors, show_traces=True,
+                 message_file=None):
         """Initialise variables."""
         self.names = names
         self.devices = devices
         self.monitors = monitors
         self.network = network
+        self.show_traces = show_traces
+        self.message_file = message_file  # None means standard output
 
         self.cycles_completed = 0  # number of simulation cycles completed
+        self.last_seed = None  # cold start seed of the last run
+
+        # Seed given on the command line for every run, or None to pick a
+        # new seed for each run
+        self.seed = devices.seed
 
         self.character = ""  # current character
         self.line = ""  # current string entered by the user
@@ -81,34 +105,86 @@ class UserInterface:
 
     def command_interface(self):
         """Read the command entered and call the corresponding function."""
-        print("Logic Simulator: interactive command line user interface.\n"
-              "Enter 'h' for help.")
+        self.print_message(
+            "Logic Simulator: interactive command line user interface.\n"
+            "Enter 'h' for help.")
         self.get_line()  # get the user entry
         command = self.read_command()  # read the first character
         while command != "q":
-            if command == "h":
-                self.help_command()
-            elif command == "s":
-                self.switch_command()
-            elif command == "m":
-                self.monitor_command()
-            elif command == "z":
-                self.zap_command()
-            elif command == "r":
-                self.run_command()
-            elif command == "c":
-                self.continue_command()
-            else:
-                print("Invalid command. Enter 'h' for help.")
+            self.execute_command(command)
             self.get_line()  # get the user entry
             command = self.read_command()  # read the first character
 
+    def run_script(self, lines):
+        """Run the commands in lines, an iterable of strings, without prompts.
+
+        Blank lines and lines starting with '#' are skipped, and the script
+        stops at a 'q' command. Return a list of [line number, line] for the
+        commands which failed.
+        """
+        failed_commands = []
+        for line_number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            self.cursor = 0
+            self.line = line
+            command = self.read_command()
+            if command == "q":
+                break
+            if not self.execute_command(command):
+                failed_commands.append([line_number, line])
+        return failed_commands
+
+    def execute_command(self, command):
+        """Call the function for the command character.
+
+        Return True if the command succeeded.
+        """
+        if command == "h":
+            return self.help_command()
+        elif command == "s":
+            return self.switch_command()
+        elif command == "m":
+            return self.monitor_command()
+        elif command == "z":
+            return self.zap_command()
+        elif command == "r":
+            return self.run_command()
+        elif command == "c":
+            return self.continue_command()
+        else:
+            self.print_message("Invalid command. Enter 'h' for help.")
+            return False
+
+    def get_results(self):
+        """Return the simulation results as a dictionary.
+
+        The dictionary has keys 'cycles' (the number of cycles completed),
+        'seed' (the cold start seed of the last run) and 'traces', which
+        maps each monitor name to its list of recorded signal levels
+        (devices.LOW, devices.HIGH, etc.).
+        """
+        traces = {}
+        for (device_id, output_id), signal_list in \
+                self.monitors.monitors_dictionary.items():
+            monitor_name = self.devices.get_signal_name(device_id, output_id)
+            traces[monitor_name] = list(signal_list)
+        return {'cycles': self.cycles_completed, 'seed': self.last_seed,
+                'traces': traces}
+
     def get_line(self):
-        """Print prompt for the user and update the user entry."""
+        """Print prompt for the user and update the user entry.
+
+        The end of the input, e.g. of a pipe, is read as a 'q' command.
+        """
         self.cursor = 0
-        self.line = input("#: ")
-        while self.line == "":  # if the user enters a blank line
+        try:
             self.line = input("#: ")
+            while self.line == "":  # if the user enters a blank line
+                self.line = input("#: ")
+        except EOFError:
+            self.line = "q"
 
     def read_command(self):
         """Return the first non-whitespace character."""
@@ -134,7 +210,7 @@ class UserInterface:
         self.skip_spaces()
         name_string = ""
         if not self.character.isalpha():  # the string must start with a letter
-            print("Error! Expected a name.")
+            self.print_message("Error! Expected a name.")
             return None
         while self.character.isalnum():
             name_string = "".join([name_string, self.character])
@@ -152,7 +228,7 @@ class UserInterface:
         else:
             name_id = self.names.query(name_string)
         if name_id is None:
-            print("Error! Unknown name.")
+            self.print_message("Error! Unknown name.")
         return name_id
 
     def read_signal_name(self):
@@ -180,7 +256,7 @@ class UserInterface:
         self.skip_spaces()
         number_string = ""
         if not self.character.isdigit():
-            print("Error! Expected a number.")
+            self.print_message("Error! Expected a number.")
             return None
         while self.character.isdigit():
             number_string = "".join([number_string, self.character])
@@ -189,59 +265,72 @@ class UserInterface:
 
         if upper_bound is not None:
             if number > upper_bound:
-                print("Number out of range.")
+                self.print_message("Number out of range.")
                 return None
 
         if lower_bound is not None:
             if number < lower_bound:
-                print("Number out of range.")
+                self.print_message("Number out of range.")
                 return None
 
         return number
 
     def help_command(self):
-        """Print a list of valid commands."""
-        print("User commands:")
-        print("r N       - run the simulation for N cycles")
-        print("c N       - continue the simulation for N cycles")
-        print("s X N     - set switch X to N (0 or 1)")
-        print("m X       - set a monitor on signal X")
-        print("z X       - zap the monitor on signal X")
-        print("h         - help (this command)")
-        print("q         - quit the program")
+        """Print a list of valid commands. Return True."""
+        self.print_message("User commands:")
+        self.print_message("r N       - run the simulation for N cycles")
+        self.print_message("c N       - continue the simulation for N cycles")
+        self.print_message("s X N     - set switch X to N (0 or 1)")
+        self.print_message("m X       - set a monitor on signal X")
+        self.print_message("z X       - zap the monitor on signal X")
+        self.print_message("h         - help (this command)")
+        self.print_message("q         - quit the program")
+        return True
 
     def switch_command(self):
-        """Set the specified switch to the specified signal level."""
+        """Set the specified switch to the specified signal level.
+
+        Return True if successful.
+        """
         switch_id = self.read_name()
         if switch_id is not None:
             switch_state = self.read_number(0, 1)
             if switch_state is not None:
+                device = self.devices.get_device(switch_id)
                 if self.devices.set_switch(switch_id, switch_state):
-                    print("Successfully set switch.")
+                    self.print_message("Successfully set switch.")
+                    return True
+                elif device is not None and device.fixed:
+                    self.print_message("Error! Switch is fixed.")
                 else:
-                    print("Error! Invalid switch.")
+                    self.print_message("Error! Invalid switch.")
+        return False
 
     def monitor_command(self):
-        """Set the specified monitor."""
+        """Set the specified monitor. Return True if successful."""
         monitor = self.read_signal_name()
         if monitor is not None:
             [device, port] = monitor
             monitor_error = self.monitors.make_monitor(device, port,
                                                        self.cycles_completed)
             if monitor_error == self.monitors.NO_ERROR:
-                print("Successfully made monitor.")
+                self.print_message("Successfully made monitor.")
+                return True
             else:
-                print("Error! Could not make monitor.")
+                self.print_message("Error! Could not make monitor.")
+        return False
 
     def zap_command(self):
-        """Remove the specified monitor."""
+        """Remove the specified monitor. Return True if successful."""
         monitor = self.read_signal_name()
         if monitor is not None:
             [device, port] = monitor
             if self.monitors.remove_monitor(device, port):
-                print("Successfully zapped monitor")
+                self.print_message("Successfully zapped monitor")
+                return True
             else:
-                print("Error! Could not zap monitor.")
+                self.print_message("Error! Could not zap monitor.")
+        return False
 
     def run_network(self, cycles):
         """Run the network for the specified number of simulation cycles.
@@ -252,30 +341,54 @@ class UserInterface:
             if self.network.execute_network():
                 self.monitors.record_signals()
             else:
-                print("Error! Network oscillating.")
+                self.print_message("Error! Network oscillating.")
+                oscillating_names = [
+                    self.names.get_name_string(device_id)
+                    for device_id in self.network.oscillating_devices]
+                self.print_message("Devices still changing:",
+                                   ", ".join(oscillating_names))
                 return False
-        self.monitors.display_signals()
+        if self.show_traces:
+            self.monitors.display_signals()
         return True
 
     def run_command(self):
-        """Run the simulation from scratch."""
+        """Run the simulation from scratch. Return True if successful."""
         self.cycles_completed = 0
         cycles = self.read_number(0, None)
 
         if cycles is not None:  # if the number of cycles provided is valid
             self.monitors.reset_monitors()
-            print("".join(["Running for ", str(cycles), " cycles"]))
-            self.devices.cold_startup()
+            self.print_message("".join(["Running for ", str(cycles),
+                                        " cycles"]))
+            seed = self.seed
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            # The seed lets the run be repeated with logsim.py -r
+            self.print_message("Cold start seed:", seed)
+            self.last_seed = seed
+            self.devices.cold_startup(seed)
+            if self.network.timed:
+                self.network.reset_timed()
             if self.run_network(cycles):
                 self.cycles_completed += cycles
+                return True
+        return False
 
     def continue_command(self):
-        """Continue a previously run simulation."""
+        """Continue a previously run simulation. Return True if successful."""
         cycles = self.read_number(0, None)
         if cycles is not None:  # if the number of cycles provided is valid
             if self.cycles_completed == 0:
-                print("Error! Nothing to continue. Run first.")
+                self.print_message("Error! Nothing to continue. Run first.")
             elif self.run_network(cycles):
                 self.cycles_completed += cycles
-                print(" ".join(["Continuing for", str(cycles), "cycles.",
-                                "Total:", str(self.cycles_completed)]))
+                self.print_message(" ".join(
+                    ["Continuing for", str(cycles), "cycles.", "Total:",
+                     str(self.cycles_completed)]))
+                return True
+        return False
+
+    def print_message(self, *args):
+        """Print a message to the message file."""
+        print(*args, file=self.message_file)
@@ -0,0 +1,243 @@
+"""Build the vertices used to draw signal traces on the canvas.
+
+Used in the Logic Simulator project so that the graphical user interface
+can keep the drawing of each monitor in vertex buffers, adding only the
+cycles recorded since the last frame instead of drawing every cycle again.
+Zoomed out views are drawn from coarser levels of detail, so that the
+number of vertices drawn depends on the screen width and not on the length
+of the trace.
+
+Classes
+-------
+Waveform - stores the vertices of one signal trace at every level of detail.
+
+Functions
+---------
+get_visible_range - returns the evenly spaced items which are on screen.
+get_tick_spacing - returns the number of cycles between time axis ticks.
+"""
+import math
+from array import array
+
+
+def get_visible_range(origin, spacing, low, high, view_low, view_high,
+                      count):
+    """Return [first, stop] of the items i in range(count) on screen.
+
+    Item i covers origin + i * spacing + low to origin + i * spacing + high
+    along one axis, and the screen covers view_low to view_high. spacing
+    may be negative, e.g. for rows drawn downwards. The items on screen are
+    found without looking at every item, so it takes constant time.
+    """
+    if spacing > 0:
+        lowest = (view_low - origin - high) / spacing
+        highest = (view_high - origin - low) / spacing
+    else:
+        lowest = (view_high - origin - low) / spacing
+        highest = (view_low - origin - high) / spacing
+    first = min(max(0, math.ceil(lowest)), count)
+    stop = min(max(first, math.floor(highest) + 1), count)
+    return [first, stop]
+
+
+def get_tick_spacing(pixels_per_cycle, min_pixels):
+    """Return the number of cycles between ticks on the time axis.
+
+    This is the smallest of 1, 2, 5, 10, 20, 50, ... cycles which puts the
+    ticks at least min_pixels apart, so the number of tick labels on screen
+    is limited by its width however far the view is zoomed out.
+    """
+    spacing = 1
+    while spacing * pixels_per_cycle < min_pixels:
+        for factor in [2, 5, 10]:
+            if spacing * factor * pixels_per_cycle >= min_pixels:
+                return spacing * factor
+        spacing *= 10
+    return spacing
+
+
+class Waveform:
+
+    """Store the vertices of one signal trace at every level of detail.
+
+    Level k summarises the trace in blocks of 2**k cycles, like the levels
+    of a mipmap. Each block is stored as [start, end, low, high]: the level
+    at its start and end, and the lowest and highest level within it, with
+    LOW and HIGH as 0 and 1. Blocks of only BLANK cycles are None. Level
+    k + 1 is built from pairs of blocks of level k. The vertices of a level
+    are only built once it is drawn.
+
+    The vertices are x, y pairs in units where cycle c runs from x = c to
+    x = c + 1 and LOW and HIGH are at y = 0 and y = 1, so the canvas only
+    has to translate and scale them. For every block, lines[k] has
+    LINE_VERTICES vertices for GL_LINES: the vertical edge from the end of
+    the previous block, then the segment across the block. bands[k] has
+    BAND_VERTICES vertices for GL_TRIANGLES, filling the blocks of levels
+    above 0 in which the signal changes. The last block of a level ends
+    at the end of the trace, even if it covers fewer than 2**k cycles.
+    Lines and bands which are not needed have all their vertices at the
+    same point, so that they draw nothing.
+
+    Parameters
+    ----------
+    devices: instance of the devices.Devices() class.
+
+    Public methods
+    --------------
+    update(self, signal_list): Adds the blocks of any new cycles in
+                               signal_list.
+
+    get_level(self, cycles_per_pixel): Returns the coarsest level whose
+                                       blocks are no wider than a pixel.
+
+    get_blocks(self, level, first_cycle, stop_cycle): Returns the range of
+                                       blocks of level covering the cycles.
+
+    get_vertices(self, level): Returns the line and band vertices of level,
+                               building any which are missing.
+    """
+
+    LINE_VERTICES = 4
+    BAND_VERTICES = 6
+
+    def __init__(self, devices):
+        """Initialise an empty trace."""
+        self.devices = devices
+        self.signal_list = None  # list the blocks were built from
+        self.cycles = 0
+        self.blocks = []  # list of blocks of each level
+        self.lines = []  # array of float x, y pairs for each level
+        self.bands = []
+        # Number of blocks of each level whose vertices have been built
+        self.vertex_blocks = []
+        # Index of the first block of each level changed since the canvas
+        # last uploaded that level
+        self.first_changed = []
+
+    def update(self, signal_list):
+        """Add the blocks of the cycles of signal_list not yet stored.
+
+        Everything is built again if signal_list is not the list used
+        before, or has become shorter, as happens when the monitors are
+        reset. The last block of each level above 0 may change as cycles
+        are added, so it is built again too. Vertices are only built when
+        a level is drawn, see get_vertices().
+        """
+        if signal_list is not self.signal_list or \
+                len(signal_list) < self.cycles:
+            self.signal_list = signal_list
+            self.cycles = 0
+            self.blocks = []
+            self.lines = []
+            self.bands = []
+            self.vertex_blocks = []
+            self.first_changed = []
+        if len(signal_list) == self.cycles:
+            return
+
+        levels = {self.devices.LOW: (0, 0, 0, 0),
+                  self.devices.HIGH: (1, 1, 1, 1),
+                  self.devices.RISING: (0, 1, 0, 1),
+                  self.devices.FALLING: (1, 0, 0, 1)}
+        new_blocks = [levels.get(signal)
+                      for signal in signal_list[self.cycles:]]
+        first_block = self.cycles
+        self.cycles = len(signal_list)
+
+        level = 0
+        while True:
+            if level == len(self.blocks):
+                self.blocks.append([])
+                self.lines.append(array('f'))
+                self.bands.append(array('f'))
+                self.vertex_blocks.append(0)
+                self.first_changed.append(0)
+            self._set_blocks(level, first_block, new_blocks)
+            blocks = self.blocks[level]
+            if len(blocks) == 1:
+                break
+            # Pair up the changed blocks for the next level
+            first_block = first_block // 2
+            merge = self._merge
+            new_blocks = [merge(blocks[i], blocks[i + 1])
+                          for i in range(2 * first_block, len(blocks) - 1, 2)]
+            if len(blocks) % 2:
+                new_blocks.append(blocks[-1])
+            level += 1
+
+    def get_level(self, cycles_per_pixel):
+        """Return the coarsest level whose blocks are no wider than a pixel.
+
+        cycles_per_pixel is the number of cycles shown in one pixel of the
+        screen. Drawing this level takes about one block per pixel.
+        """
+        level = 0
+        while level + 1 < len(self.blocks) and \
+                2 ** (level + 1) <= cycles_per_pixel:
+            level += 1
+        return level
+
+    def get_blocks(self, level, first_cycle, stop_cycle):
+        """Return [first, stop] of the blocks of level covering the cycles.
+
+        The blocks cover cycles first_cycle to stop_cycle - 1.
+        """
+        width = 2 ** level
+        first_block = min(first_cycle // width, len(self.blocks[level]))
+        stop_block = min(-(-stop_cycle // width), len(self.blocks[level]))
+        return [first_block, max(first_block, stop_block)]
+
+    def get_vertices(self, level):
+        """Return [lines, bands] of level, building any missing vertices."""
+        blocks = self.blocks[level]
+        first_block = self.vertex_blocks[level]
+        width = 2 ** level
+        lines = []
+        bands = []
+        empty_band = [0, 0] * self.BAND_VERTICES
+        for index in range(first_block, len(blocks)):
+            block = blocks[index]
+            x = index * width
+            # The last block may cover fewer cycles than the others
+            x_next = min(x + width, self.cycles)
+            if block is None:
+                lines.extend([x, 0] * self.LINE_VERTICES)
+                bands.extend([x, 0] * self.BAND_VERTICES)
+                continue
+            [start, end, low, high] = block
+            last_block = blocks[index - 1] if index else None
+            last_end = start if last_block is None else last_block[1]
+            if level == 0 or low == high:
+                lines.extend([x, last_end, x, start, x, start, x_next, end])
+                empty_band[0::2] = [x] * self.BAND_VERTICES
+                bands.extend(empty_band)
+            else:
+                # The signal changes faster than can be shown
+                lines.extend([x, last_end, x, start, x, start, x, start])
+                bands.extend([x, low, x_next, low, x_next, high,
+                              x, low, x_next, high, x, high])
+        self.lines[level].extend(lines)
+        self.bands[level].extend(bands)
+        self.vertex_blocks[level] = len(blocks)
+        return [self.lines[level], self.bands[level]]
+
+    def _merge(self, first, second):
+        """Return the block covering the blocks first and second."""
+        if first is None:
+            return second
+        elif second is None:
+            return first
+        return (first[0], second[1],
+                first[2] if first[2] < second[2] else second[2],
+                first[3] if first[3] > second[3] else second[3])
+
+    def _set_blocks(self, level, first_block, new_blocks):
+        """Replace the blocks of level from first_block with new_blocks."""
+        del self.blocks[level][first_block:]
+        self.blocks[level].extend(new_blocks)
+        if first_block < self.vertex_blocks[level]:
+            self.vertex_blocks[level] = first_block
+            del self.lines[level][2 * self.LINE_VERTICES * first_block:]
+            del self.bands[level][2 * self.BAND_VERTICES * first_block:]
+        self.first_changed[level] = min(self.first_changed[level],
+                                        first_block)